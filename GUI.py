@@ -84,6 +84,11 @@ class PlottingEnvironment_Canvas(FigureCanvas):
         self.empty = True
         self.draw()
 
+    # rendering of the figure, recorded as "plot" stage when timings are recorded (see tracer in python_analysis_skript.py)
+    def draw(self):
+        with tracer.span("draw", "plot"):
+            FigureCanvas.draw(self)
+
     def show(self):
         self.draw()
 
@@ -153,6 +158,7 @@ class PlottingEnvironment_Canvas(FigureCanvas):
         self.axes.set_xscale(scale[0])
         self.draw()
 
+    @traced("plot_data", "plot")
     def plot_data(self, x, y, scale, overwrite, yerror=None, xerror=None, xlabel="", ylabel="", label="", marker="", linestyle='-',
                   alpha=1, color=None, lastplot=False, absolute=None, ylim=None, sci=True):
         # global plot_in_abs
@@ -346,6 +352,9 @@ class MyTableWidget(QWidget):
         self.root_layout = QVBoxLayout(self.root_widget)
         self.setAcceptDrops(True) # for drag&drop files into filelists
         self.platform = platform.system()
+        self.directory_watchers = {}  # tab: (DirectoryWatcher, QTimer) of the watch mode, see toggle_directory_watch()
+        self.results_database_path = f"{os.getcwd()}/transistor_analysis_results.sqlite"
+        self.results_store = None  # ResultsStore, opened on first use by store_results()
 
         # Initialize tab screen
         self.tabs = QTabWidget()
@@ -393,6 +402,9 @@ class MyTableWidget(QWidget):
             self.tab1_remove_file_from_list_button.clicked.connect(self.remove_transistoranalysis_item)
             self.tab1_empty_filelist_button = QPushButton('Empty List')
             self.tab1_empty_filelist_button.clicked.connect(self.empty_file_list)
+            self.tab1_watch_directory_button = QPushButton('Watch Directory', checkable=True,
+                                                           toolTip="Add new measurement files of a directory as soon as they are written and analyze them")
+            self.tab1_watch_directory_button.toggled.connect(lambda checked: self.toggle_directory_watch("tab1", checked))
 
             # the program is not displaying whole paths but solely filenames. for reading the data, the whole
             # path is needed, so they have to be stored in combination -> this dictionary holds the references and
@@ -407,6 +419,7 @@ class MyTableWidget(QWidget):
             self.tab1_filelist_buttons.addWidget(self.tab1_choose_files_button)
             self.tab1_filelist_buttons.addWidget(self.tab1_empty_filelist_button)
             self.tab1_filelist_buttons.addWidget(self.tab1_remove_file_from_list_button)
+            self.tab1_filelist_buttons.addWidget(self.tab1_watch_directory_button)
             self.tab1_filelist_layout.addLayout(self.tab1_filelist_buttons)
             self.tab1_filelist_layout.addWidget(self.tab1_file_list)
             self.tab1_file_selection_layout.addLayout(self.tab1_filelist_layout)
@@ -618,6 +631,9 @@ class MyTableWidget(QWidget):
             self.tab1_analyzebutton.clicked.connect(self.analyze_transfer_data)
             self.tab1_linear_fit_data_for_export = pd.DataFrame()
             self.tab1_saturation_fit_data_for_export = pd.DataFrame()
+            # last analysis object and the files it was read from, used for incremental re-analysis (see analyze_transfer_data)
+            self.tab1_transistor_analysis = None
+            self.tab1_transistor_analysis_source = None
             self.tab1_export_layout = QHBoxLayout()
             self.tab1_export_filename = QLineEdit(placeholderText="Enter Filename for Export")
             self.tab1_export_data_button = QPushButton('Export Data / Results')
@@ -841,10 +857,17 @@ class MyTableWidget(QWidget):
             self.tab3_file_remove_button.clicked.connect(self.remove_TLM_file)
             self.tab3_file_empty_button = QPushButton('Empty List')
             self.tab3_file_empty_button.clicked.connect(self.empty_TLM_file_list)
+            self.tab3_watch_directory_button = QPushButton('Watch Directory', checkable=True,
+                                                           toolTip="Add all measurement files of a directory (also the ones written later on) and update the TLM")
+            self.tab3_watch_directory_button.toggled.connect(lambda checked: self.toggle_directory_watch("tab3", checked))
             # the program is not displaying whole paths but solely filenames. for reading the data, the whole
             # path is needed, so they have to be stored in combination -> this dictionary holds the references and
             # the QListWidget shows the files included in TLM analysis in a clean fashion
             self.tab3_file_paths = {}  # filename:path
+            # devices (read files) of the last TLM, reused by the next one if files and settings did not change
+            self.tab3_tlm_devices, self.tab3_tlm_devices_source, self.tab3_tlm_devices_mtime = {}, None, {}
+            # the last TLM itself, updated device by device if only the file list changes (see analyze_TLM)
+            self.tab3_tlm, self.tab3_tlm_settings = None, None
             self.tab3_filelist = QListWidget(minimumHeight=25, maximumHeight=80, minimumWidth=50)
             self.tab3_filelist.currentRowChanged.connect(self.read_columnnames)
             self.tab3_file_selection_layout = QVBoxLayout()
@@ -852,6 +875,7 @@ class MyTableWidget(QWidget):
             self.tab3_file_selection_buttons.addWidget(self.tab3_file_button)
             self.tab3_file_selection_buttons.addWidget(self.tab3_file_empty_button)
             self.tab3_file_selection_buttons.addWidget(self.tab3_file_remove_button)
+            self.tab3_file_selection_buttons.addWidget(self.tab3_watch_directory_button)
             self.tab3_file_selection_layout.addLayout(self.tab3_file_selection_buttons)
             self.tab3_file_selection_layout.addWidget(self.tab3_filelist)
 
@@ -901,6 +925,21 @@ class MyTableWidget(QWidget):
             self.tab3_fitsetup.addWidget(self.tab3_analysis_smoothing_factor, 6, 1,
                                          alignment=QtCore.Qt.AlignRight)
 
+            # robust TLM regression and automatic rejection of outlier devices (see TLM_Analysis.contactresistance)
+            self.tab3_regression_methods = {"Least Squares": "ols", "Huber": "huber", "Theil-Sen": "theilsen",
+                                            "RANSAC": "ransac"}
+            self.tab3_analysis_regression = QComboBox()
+            self.tab3_analysis_regression.addItems(list(self.tab3_regression_methods))
+            self.tab3_analysis_reject_outliers = QCheckBox('Reject Outlier Devices', checked=False,
+                                                           toolTip="""<p>Devices whose RW deviates from the (robust) TLM fit at
+                                                           most overdrive voltages are left out of the whole TLM.</p>""")
+            self.tab3_fitsetup.addWidget(QLabel('TLM Regression:',
+                                                toolTip="""<p>Huber, Theil-Sen and RANSAC fits are less sensitive to single
+                                                bad devices than least squares.</p>"""),
+                                         7, 0, alignment=QtCore.Qt.AlignRight)
+            self.tab3_fitsetup.addWidget(self.tab3_analysis_regression, 7, 1, alignment=QtCore.Qt.AlignRight)
+            self.tab3_fitsetup.addWidget(self.tab3_analysis_reject_outliers, 8, 0, 1, 2, alignment=QtCore.Qt.AlignRight)
+
             # setup the results section
             self.tab3_resultlayout = QGridLayout()
             self.tab3_result_plot_all_transfercurves_checkbox = QCheckBox('Plot all Transfer Curves',checked=True)
@@ -1242,7 +1281,12 @@ class MyTableWidget(QWidget):
                                                              (measured from the L for which the least overdrive voltages exist) are averaged.</p>""")
             self.tab4_tab3_result_limit_plot_xrange = QCheckBox("Limit TLM plot?",checked=True,
                                                                 toolTip="""<p>If this is chosen, the TLM plot will never look super messed up, but L<sub>0</sub> and L<sub>1/2</sub> will not be always visible in the shown range.</p>""")
+            self.tab4_set_tab1_refine_satfit = QCheckBox("Refine Saturation Fit", checked=True,
+                                                         toolTip="""<p>The saturation fit window is found with straight lines through sqrt(I<sub>D</sub>).
+                                                         If this is chosen, the final window is fitted with the quadratic model as well (slower, but the
+                                                         least squares result of I<sub>D</sub> instead of sqrt(I<sub>D</sub>)).</p>""")
             self.tab4_tab1settings.addWidget(self.tab4_set_tab1_plotdata_absolute,    3, 0, 1, 4)
+            self.tab4_tab1settings.addWidget(self.tab4_set_tab1_refine_satfit,        3, 4, 1, 2)
             self.tab4_tab1settings.addWidget(self.tab4_set_tab1_oor_avg_window_label, 4, 0, 1, 3)
             self.tab4_tab1settings.addWidget(self.tab4_set_tab1_oor_avg_window,       4, 3, 1, 1)
             # add RcW averaging value to tab1settings even though it should be tab3settings, because it fits there visually
@@ -1314,6 +1358,19 @@ class MyTableWidget(QWidget):
 
             self.tab4_tab1settings.addWidget(self.tab4_show_L_correct_db_path,        12, 1, 1, 2)
             self.tab4_tab1settings.addWidget(self.tab4_automatic_Lcorrect,            12, 3, 1, 1)
+
+            # results of every analysis can be written to a local database, so that they can later be queried by
+            # sample, die, W, L, T... (see ResultsStore in python_analysis_skript.py)
+            self.tab4_show_results_database_path = QLineEdit(readOnly=True, toolTip=f"{self.results_database_path}",
+                                                             placeholderText=f"{self.results_database_path}")
+            self.tab4_store_results = QCheckBox("Active",toolTip="<p>Results of all analyses are written to the results database together with the "
+                                                                 "sample, die, W, L and temperature given in the filename.</p>")
+            self.tab4_change_results_database_path = QPushButton("Results database", toolTip="<p>Click to change.</p>")
+            self.tab4_change_results_database_path.clicked.connect(self.change_results_database_path)
+
+            self.tab4_tab1settings.addWidget(self.tab4_change_results_database_path,  13, 0, 1, 1)
+            self.tab4_tab1settings.addWidget(self.tab4_show_results_database_path,    13, 1, 1, 2)
+            self.tab4_tab1settings.addWidget(self.tab4_store_results,                 13, 3, 1, 1)
             #print(self.default_L_correct_db)
 
 
@@ -1326,6 +1383,32 @@ class MyTableWidget(QWidget):
             self.tab4_settings_overview.addWidget(QLabel("<h4>Settings File Content</h4>"))
             self.tab4_settings_overview.addWidget(self.tab4_show_settings_filecontent)
 
+            # timings of the analysis stages (file reading, smoothing, window search, fits, regressions, plotting) of
+            # all analyses run while recording is active, see tracer in python_analysis_skript.py
+            self.tab4_record_timings = QCheckBox("Record", toolTip="<p>Record how long the stages of all analyses take "
+                                                                   "(reading files, smoothing, fit window search, fits, TLM regression, plotting).</p>")
+            self.tab4_record_timings.toggled.connect(self.toggle_timings)
+            self.tab4_timings_grouping = QComboBox(maximumWidth=100, toolTip="<p>Sum up the timings per stage or per "
+                                                                             "single step of the analysis.</p>")
+            self.tab4_timings_grouping.addItem("Stage")
+            self.tab4_timings_grouping.addItem("Step")
+            self.tab4_timings_grouping.currentIndexChanged.connect(self.update_timings_panel)
+            self.tab4_refresh_timings_button = QPushButton("Refresh")
+            self.tab4_refresh_timings_button.clicked.connect(self.update_timings_panel)
+            self.tab4_clear_timings_button = QPushButton("Clear")
+            self.tab4_clear_timings_button.clicked.connect(self.clear_timings)
+            self.tab4_export_timings_button = QPushButton("Export", toolTip="<p>Save the recorded timings as Chrome trace "
+                                                                            "(.json, open in chrome://tracing or ui.perfetto.dev) or the table as .csv</p>")
+            self.tab4_export_timings_button.clicked.connect(self.export_timings)
+            self.tab4_timings_table = QTableWidget(editTriggers=QAbstractItemView.NoEditTriggers)
+            self.tab4_timings_buttons = QHBoxLayout()
+            for w_ in [self.tab4_record_timings, self.tab4_timings_grouping, self.tab4_refresh_timings_button,
+                       self.tab4_clear_timings_button, self.tab4_export_timings_button]:
+                self.tab4_timings_buttons.addWidget(w_)
+            self.tab4_settings_overview.addWidget(QLabel("<h4>Timings</h4>"))
+            self.tab4_settings_overview.addLayout(self.tab4_timings_buttons)
+            self.tab4_settings_overview.addWidget(self.tab4_timings_table)
+
             # adding the setting for different tabs in the main settings gridlayout
             # defining the settings export
             self.tab4_mainlayout.addLayout(self.tab4_tab1settings,                      0, 0, 1, 2)
@@ -1531,8 +1614,13 @@ class MyTableWidget(QWidget):
             self.tab5_fitsetup_chooseFit_checkbox = QCheckBox("Fit transit frequency? (choose fit range for calculation)")
             self.tab5_fitsetup_chooseFit_checkbox.setChecked(True)
 
+            self.tab5_fitsetup_autoRange_checkbox = QCheckBox("Find fit range automatically (-20 dB/dec region)",
+                                                              toolTip="The given f<sub>min</sub>, f<sub>max</sub> are ignored if checked")
+            self.tab5_fitsetup_autoRange_checkbox.setChecked(False)
+
             self.tab5_fitsetup_layout.addWidget(self.tab5_fitsetup_chooseFit_checkbox)
             self.tab5_fitsetup_layout.addLayout(self.tab5_fitsetup_fTbounds_layout)
+            self.tab5_fitsetup_layout.addWidget(self.tab5_fitsetup_autoRange_checkbox)
 
 
             # setup the results section
@@ -1552,6 +1640,9 @@ class MyTableWidget(QWidget):
 
             self.tab5_sparam_analyze_button = QPushButton('Execute S-Parameter Analysis')
             self.tab5_sparam_analyze_button.clicked.connect(self.analyze_sparam)
+            self.tab5_sparam_bias_sweep_button = QPushButton('Analyze All Files (Bias Sweep)',
+                                                             toolTip="f_T and f_max of all files in the list versus the bias given in the filenames (e.g. ..._VGS-1.5_VDS-2.s2p)")
+            self.tab5_sparam_bias_sweep_button.clicked.connect(self.analyze_sparam_bias_sweep)
 
             self.tab5_leftside_interactive_layout.addLayout(self.tab5_file_selection_layout)
             self.tab5_leftside_interactive_layout.addLayout(self.tab5_estimate_fT_layout)
@@ -1559,19 +1650,23 @@ class MyTableWidget(QWidget):
             self.tab5_leftside_interactive_layout.addLayout(self.tab5_fitsetup_layout)
             self.tab5_leftside_interactive_layout.addLayout(self.tab5_result_layout)
             self.tab5_leftside_interactive_layout.addWidget(self.tab5_sparam_analyze_button)
+            self.tab5_leftside_interactive_layout.addWidget(self.tab5_sparam_bias_sweep_button)
 
             ##########################################################################
             # setup the graphing tabwidget where all the fit results are plotted (right side of the window)
             self.tab5_sparam_plot_tabs = QTabWidget()
             self.tab5_sparam_plot_tab_allSxx = QWidget()
             self.tab5_sparam_plot_tab_h21 = QWidget()
+            self.tab5_sparam_plot_tab_bias = QWidget()
 
             self.tab5_sparam_plot_tabs.addTab(self.tab5_sparam_plot_tab_h21, 'h21')
             self.tab5_sparam_plot_tabs.addTab(self.tab5_sparam_plot_tab_allSxx, 'Sxx')
+            self.tab5_sparam_plot_tabs.addTab(self.tab5_sparam_plot_tab_bias, 'Bias Sweep')
 
 
             self.tab5_sparam_plot_tab_h21.layout = QVBoxLayout(self.tab5_sparam_plot_tab_h21)
             self.tab5_sparam_plot_tab_allSxx.layout = QVBoxLayout(self.tab5_sparam_plot_tab_allSxx)
+            self.tab5_sparam_plot_tab_bias.layout = QVBoxLayout(self.tab5_sparam_plot_tab_bias)
 
             canvas_width, canvas_height, canvas_dpi, canvas_min_height, canvas_min_width = 4, 3, 100, 300, 300
 
@@ -1593,6 +1688,15 @@ class MyTableWidget(QWidget):
             self.tab5_sparam_plot_tab_allSxx.layout.addWidget(self.tab5_plot_canvas_allSxx,
                                                               alignment=QtCore.Qt.AlignLeft)
 
+            self.tab5_plot_canvas_bias = PlottingEnvironment_Canvas(self.tab5, width=canvas_width,
+                                                                    height=canvas_height, dpi=canvas_dpi)
+            self.tab5_plot_canvas_bias.setMinimumHeight(canvas_min_height)
+            self.tab5_plot_canvas_bias.setMinimumWidth(canvas_min_width)
+            self.tab5_toolbar_bias = NavigationToolbar(self.tab5_plot_canvas_bias, self)
+            self.tab5_sparam_plot_tab_bias.layout.addWidget(self.tab5_toolbar_bias, alignment=QtCore.Qt.AlignLeft)
+            self.tab5_sparam_plot_tab_bias.layout.addWidget(self.tab5_plot_canvas_bias,
+                                                            alignment=QtCore.Qt.AlignLeft)
+
             self.tab5_complete_layout.addLayout(self.tab5_leftside_interactive_layout)
             self.tab5_complete_layout.addWidget(self.vline())
             self.tab5_complete_layout.addWidget(self.tab5_sparam_plot_tabs)
@@ -1708,6 +1812,9 @@ class MyTableWidget(QWidget):
             self.tab6_arrhenius_select_direction_layout.addWidget(self.tab6_arrhenius_select_direction_fwd,alignment=QtCore.Qt.AlignLeft)
             self.tab6_arrhenius_select_direction_layout.addWidget(self.tab6_arrhenius_select_direction_back,alignment=QtCore.Qt.AlignLeft)
             self.tab6_arrhenius_select_direction_layout.addWidget(self.tab6_arrhenius_select_direction_mean,alignment=QtCore.Qt.AlignLeft)
+            self.tab6_arrhenius_joint_fit_checkbox = QCheckBox("Joint Fit", checked=False,
+                                                               toolTip="Fit all temperatures at once with a shared activation energy instead of one TLM per temperature")
+            self.tab6_arrhenius_select_direction_layout.addWidget(self.tab6_arrhenius_joint_fit_checkbox,alignment=QtCore.Qt.AlignLeft)
 
             self.tab6_arrhenius_analyze_button = QPushButton('Execute Arrhenius Analysis')
             self.tab6_arrhenius_analyze_button.clicked.connect(self.analyze_arrhenius)
@@ -1894,23 +2001,30 @@ class MyTableWidget(QWidget):
 
             self.tab7_inverter_analyze_button = QPushButton('Execute Inverter Analysis')
             self.tab7_inverter_analyze_button.clicked.connect(self.analyze_inverter)
+            self.tab7_inverter_family_button = QPushButton('Analyze All Files (V_DD Sweep)',
+                                                           toolTip="Largest square (butterfly) noise margin, gain and trip point of all loaded files vs. V_DD")
+            self.tab7_inverter_family_button.clicked.connect(self.analyze_inverter_family)
 
             self.tab7_leftside_interactive_layout.addLayout(self.tab7_file_selection_layout)
             self.tab7_leftside_interactive_layout.addLayout(self.tab7_fitsetup)
             self.tab7_leftside_interactive_layout.addLayout(self.tab7_result_layout)
             self.tab7_leftside_interactive_layout.addWidget(self.tab7_inverter_analyze_button)
+            self.tab7_leftside_interactive_layout.addWidget(self.tab7_inverter_family_button)
 
             ##########################################################################
             # setup the graphing tabwidget where all the fit results are plotted (right side of the window)
             self.tab7_inverter_plot_tabs = QTabWidget()
             self.tab7_inverter_plot_Vinout = QWidget()
             self.tab7_inverter_plot_deriv = QWidget()
+            self.tab7_inverter_plot_family = QWidget()
 
             self.tab7_inverter_plot_tabs.addTab(self.tab7_inverter_plot_Vinout, 'V_out(V_in)')
             self.tab7_inverter_plot_tabs.addTab(self.tab7_inverter_plot_deriv, 'Derivative')
+            self.tab7_inverter_plot_tabs.addTab(self.tab7_inverter_plot_family, 'V_DD Sweep')
 
             self.tab7_inverter_plot_Vinout.layout = QVBoxLayout(self.tab7_inverter_plot_Vinout)
             self.tab7_inverter_plot_deriv.layout = QVBoxLayout(self.tab7_inverter_plot_deriv)
+            self.tab7_inverter_plot_family.layout = QVBoxLayout(self.tab7_inverter_plot_family)
 
             canvas_width, canvas_height, canvas_dpi, canvas_min_height, canvas_min_width = 4, 3, 100, 300, 300
 
@@ -1934,6 +2048,16 @@ class MyTableWidget(QWidget):
             self.tab7_inverter_plot_deriv.layout.addWidget(self.tab7_plot_canvas_inverter_deriv,
                                                            alignment=QtCore.Qt.AlignLeft)
 
+            self.tab7_plot_canvas_inverter_family = PlottingEnvironment_Canvas(self.tab7, width=canvas_width,
+                                                                               height=canvas_height, dpi=canvas_dpi)
+            self.tab7_plot_canvas_inverter_family.setMinimumHeight(canvas_min_height)
+            self.tab7_plot_canvas_inverter_family.setMinimumWidth(canvas_min_width)
+            self.tab7_toolbar_inverter_family = NavigationToolbar(self.tab7_plot_canvas_inverter_family, self)
+            self.tab7_inverter_plot_family.layout.addWidget(self.tab7_toolbar_inverter_family,
+                                                            alignment=QtCore.Qt.AlignLeft)
+            self.tab7_inverter_plot_family.layout.addWidget(self.tab7_plot_canvas_inverter_family,
+                                                            alignment=QtCore.Qt.AlignLeft)
+
             self.tab7_complete_layout.addLayout(self.tab7_leftside_interactive_layout)
             self.tab7_complete_layout.addWidget(self.tab7_inverter_plot_tabs)
             self.tab7.layout.addLayout(self.tab7_complete_layout)
@@ -1956,6 +2080,7 @@ class MyTableWidget(QWidget):
         initialize_tab7()
         # settings tab should be initialized last. reason: it changes variables that have to be introduced before
         initialize_tab4()
+        self.tabs.currentChanged.connect(lambda i: self.update_timings_panel() if self.tabs.widget(i) is self.tab4 else None)
 
         self.root_layout.addWidget(self.tabs)
         self.setLayout(self.root_layout)
@@ -1975,6 +2100,8 @@ class MyTableWidget(QWidget):
                                               "sswfit": self.tab4_tab1settings_sswfit_usefixed_xrange.isChecked()},
                          "datafile_preset": self.tab4_set_datapreset.currentItem().text(),
                          "L_correction":{"active":self.tab4_automatic_Lcorrect.isChecked(),"database":self.default_L_correct_db},
+                         "results_database":{"active":self.tab4_store_results.isChecked(),"path":self.results_database_path},
+                         "record_timings":self.tab4_record_timings.isChecked(),
                          "custom_columns":{"names":self.tab4_set_custom_column_names.text(),
                                            "skiprows":self.tab4_set_custom_skiprows.value()},
                          "execute_mTLM":self.tab4_execute_mTLM.isChecked(),
@@ -2016,14 +2143,18 @@ class MyTableWidget(QWidget):
                          "linestyles":{'tab1':self.tab1_choose_linestyle.currentIndex(),
                                        'tab7':self.tab7_results_choose_linestyle.currentIndex()},
                          "tab1_onOffRatio_avgWindow": self.tab4_set_tab1_oor_avg_window.value(),
+                         "tab1_refine_satfit": self.tab4_set_tab1_refine_satfit.isChecked(),
                          "tab3_rcw_avgWindow": self.tab4_set_tab3_rcw_avg_window.value(),
+                         "tab3_regression": {"method": self.tab3_analysis_regression.currentText(),
+                                             "reject_outliers": self.tab3_analysis_reject_outliers.isChecked()},
                          "tab3_TLM_xmin_auto": self.tab4_set_TLM_xmin_automatic.isChecked(),
                          "default_tab": self.tab4_default_tab.currentText(),
                          "tab5_fitsetup":{"fT_fit_min": self.tab5_fitsetup_fTbounds_min.value(),
                                           "fT_fit_min_magnitude": self.tab5_fitsetup_fTbounds_min_magnitude.currentIndex(),
                                           "fT_fit_max": self.tab5_fitsetup_fTbounds_max.value(),
                                           "fT_fit_max_magnitude": self.tab5_fitsetup_fTbounds_max_magnitude.currentIndex(),
-                                          "fT_fit_bool": self.tab5_fitsetup_chooseFit_checkbox.isChecked()
+                                          "fT_fit_bool": self.tab5_fitsetup_chooseFit_checkbox.isChecked(),
+                                          "fT_fit_auto": self.tab5_fitsetup_autoRange_checkbox.isChecked()
                                           },
                          "tab5_estimate_settings":{
                                             "formula":self.tab5_estimate_fT_formula_choice.currentIndex(),
@@ -2129,6 +2260,7 @@ class MyTableWidget(QWidget):
             self.tab3_carrier_type_button.setChecked(settings_dict["carrier_typeP"]["tab3"])
             self.tab6_carrier_type_button.setChecked(settings_dict["carrier_typeP"]["tab6"])
             self.tab4_set_tab1_oor_avg_window.setValue(settings_dict["tab1_onOffRatio_avgWindow"])
+            self.tab4_set_tab1_refine_satfit.setChecked(settings_dict.get("tab1_refine_satfit", True))
             self.tab4_set_tab3_rcw_avg_window.setValue(settings_dict["tab3_rcw_avgWindow"])
             self.tab4_set_TLM_xmin_automatic.setChecked(settings_dict["tab3_TLM_xmin_auto"])
 
@@ -2165,8 +2297,16 @@ class MyTableWidget(QWidget):
                 print(f'Corrected L database could not be read...please check.')
                 print(e)
 
+            results_database = settings_dict.get("results_database", {})
+            self.tab4_store_results.setChecked(results_database.get("active", False))
+            self.set_results_database_path(results_database.get("path", self.results_database_path))
+            self.tab4_record_timings.setChecked(settings_dict.get("record_timings", False))
+
             self.tab1_analysis_smoothing_factor.setValue(settings_dict["smoothing_factors"]["tab1"])
             self.tab3_analysis_smoothing_factor.setValue(settings_dict["smoothing_factors"]["tab3"])
+            regression = settings_dict.get("tab3_regression", {})
+            self.tab3_analysis_regression.setCurrentText(regression.get("method", "Least Squares"))
+            self.tab3_analysis_reject_outliers.setChecked(regression.get("reject_outliers", False))
             self.tab6_analysis_smoothing_factor.setValue(settings_dict["smoothing_factors"]["tab6"])
             self.tab7_analysis_smoothing_factor.valueChanged.disconnect()
             self.tab7_analysis_smoothing_factor.setValue(settings_dict["smoothing_factors"]["tab7"])
@@ -2182,6 +2322,7 @@ class MyTableWidget(QWidget):
             self.tab5_fitsetup_fTbounds_max_magnitude.setCurrentIndex(
                 settings_dict["tab5_fitsetup"]["fT_fit_max_magnitude"])
             self.tab5_fitsetup_chooseFit_checkbox.setChecked(settings_dict["tab5_fitsetup"]["fT_fit_bool"])
+            self.tab5_fitsetup_autoRange_checkbox.setChecked(settings_dict["tab5_fitsetup"].get("fT_fit_auto", False))
 
             self.tab5_estimate_fT_formula_choice.setCurrentIndex(settings_dict["tab5_estimate_settings"]["formula"])
             self.tab5_estimate_fT_RcW.setText(settings_dict["tab5_estimate_settings"]["RcW"])
@@ -2278,6 +2419,7 @@ class MyTableWidget(QWidget):
         else:
             oor_region = 'sat'
         oor_avg_window = int(self.tab4_set_tab1_oor_avg_window.text())
+        sat_refine = self.tab4_set_tab1_refine_satfit.isChecked()
         if self.tab1_results_choose_vth_regime.isChecked():
             vth_region = 'sat'
         else:
@@ -2305,22 +2447,38 @@ class MyTableWidget(QWidget):
 
         # initialize the object that contains all the data and the method to analyze them. they are NOT called within
         # the __init__() method, with exception for the determination of the threshold voltage (for overdrive data)
-        t = TransistorAnalysis(W,
-                               L,
-                               c_,
-                               filenames=filenames_,
-                               filetype=ft_,
-                               carrier_type=carrier_type,
-                               fd=fd_,
-                               sd=sd_,
-                               smoothing=sm_,
-                               V_DS=VDS,
-                               manualFitRange=mfr,
-                               ss_region=ss_region,
-                               oor_region=oor_region,
-                               oor_avg=oor_avg_window,
-                               column_settings=col_sett_
-                               )
+        # if only fit parameters changed since the last run (same files, preset, carrier type), the previous object is
+        # kept and updated instead: the files are not read again and only the analysis stages downstream of the changed
+        # parameter are redone (smoothing -> derivatives -> window selection -> fit), the rest comes from its cache
+        try:
+            source_ = (tuple((k, v, os.path.getmtime(v)) for k, v in filenames_.items() if v),
+                       ft_, carrier_type, tuple(col_sett_.items()))
+        except OSError:
+            source_ = None
+        if (source_ is not None) and (source_ == self.tab1_transistor_analysis_source):
+            t = self.tab1_transistor_analysis.update_parameters(W=W, L=L, C_ox=c_, fd=fd_, sd=sd_, smoothing=sm_,
+                                                                V_DS=VDS, manualFitRange=mfr, ss_region=ss_region,
+                                                                oor_region=oor_region, oor_avg=oor_avg_window,
+                                                                sat_refine=sat_refine)
+        else:
+            t = TransistorAnalysis(W,
+                                   L,
+                                   c_,
+                                   filenames=filenames_,
+                                   filetype=ft_,
+                                   carrier_type=carrier_type,
+                                   fd=fd_,
+                                   sd=sd_,
+                                   smoothing=sm_,
+                                   V_DS=VDS,
+                                   manualFitRange=mfr,
+                                   ss_region=ss_region,
+                                   oor_region=oor_region,
+                                   oor_avg=oor_avg_window,
+                                   column_settings=col_sett_,
+                                   sat_refine=sat_refine
+                                   )
+            self.tab1_transistor_analysis, self.tab1_transistor_analysis_source = t, source_
 
         # if the value of fd/sd is changed, the analysis will be run from anew. this would be fatal and lead to an
         # infinite loop to prevent this, the button action has to be revoked, the value changed and afterwards
@@ -2697,6 +2855,7 @@ class MyTableWidget(QWidget):
 
         self.tab1_analysis_first_derivative_threshold_input.valueChanged.connect(self.analyze_transfer_data)
         self.tab1_analysis_second_derivative_threshold_input.valueChanged.connect(self.analyze_transfer_data)
+        self.store_results(t)
 
         # don't show an empty plot when analysis is run (can happen if the user doesn't deliberately plot the dataset)
         if self.tab1_plot_canvas_dataset.empty and l_ != "None" and self.tab1_plotting_tabs.currentIndex() == 0: self.tab1_plotting_tabs.setCurrentIndex(
@@ -2877,11 +3036,44 @@ class MyTableWidget(QWidget):
                          "skiprows": self.tab4_set_custom_skiprows.value()} if ft_ == "Custom" else {"names": None,
                                                                                                      "skiprows": None}
             L_correction = self.L_correct if self.tab3_automatic_Lcorrect.isChecked() else None
-
-            t = TLM_Analysis(c, filenames=f, filetype=ft_, carrier_type=carrier_type, smoothing=sm_, V_DS=VDS,
-                             fd=self.tab3_analysis_first_derivative_threshold_input.value(),
-                             sd=self.tab3_analysis_second_derivative_threshold_input.value(),
-                             manualFitRange=mfr, fitRestriction=tlm_dir, column_settings=col_sett_,L_correct=L_correction)
+            regression = self.tab3_regression_methods[self.tab3_analysis_regression.currentText()]
+            reject_outliers = self.tab3_analysis_reject_outliers.isChecked()
+
+            # files that were already read for the last TLM (same preset, carrier type, columns, L-correction and
+            # unchanged on disk) are not read again, e.g. when the TLM is updated for new files in watch mode
+            source_ = (ft_, carrier_type, tuple(col_sett_.items()), L_correction is not None, tlm_dir)
+            fd, sd = self.tab3_analysis_first_derivative_threshold_input.value(), self.tab3_analysis_second_derivative_threshold_input.value()
+            # a different regression method gives a new TLM (from the devices read so far, incl. rejected ones), so that
+            # outliers are rejected again with that method
+            settings_ = (source_, c, sm_, VDS, fd, sd, mfr, regression, reject_outliers)
+            t = self.tab3_tlm
+            if t is not None and settings_ == self.tab3_tlm_settings:
+                # only the file list has changed (e.g. an outlier was removed): the last TLM is updated device by
+                # device, only added or re-measured files are read and fitted (see TLM_Analysis.add_device). devices
+                # rejected as outliers stay out unless they were measured again
+                for f_ in [f_ for f_ in t.devices if f_ not in f]: t.remove_device(f_)
+                for f_ in f:
+                    mtime_ = os.path.getmtime(f_) if os.path.exists(f_) else None
+                    if mtime_ == self.tab3_tlm_devices_mtime.get(f_) and f_ in t.rejected_devices: continue
+                    if f_ not in t.devices or mtime_ != self.tab3_tlm_devices_mtime.get(f_): t.add_device(f_)
+            else:
+                devices_ = None
+                if source_ == self.tab3_tlm_devices_source:
+                    devices_ = {}
+                    for f_, d_ in self.tab3_tlm_devices.items():
+                        try:
+                            if os.path.getmtime(f_) == self.tab3_tlm_devices_mtime.get(f_): devices_[f_] = d_
+                        except OSError:
+                            continue
+
+                t = TLM_Analysis(c, filenames=f, filetype=ft_, carrier_type=carrier_type, smoothing=sm_, V_DS=VDS,
+                                 fd=fd, sd=sd,
+                                 manualFitRange=mfr, fitRestriction=tlm_dir, column_settings=col_sett_,L_correct=L_correction,
+                                 devices=devices_, regression=regression, reject_outliers=reject_outliers,
+                                 prefetch=8)  # the data is often on a cloud synced share, read the files concurrently
+            self.tab3_tlm, self.tab3_tlm_settings = t, settings_
+            self.tab3_tlm_devices, self.tab3_tlm_devices_source = t.devices, source_
+            self.tab3_tlm_devices_mtime = {f_: os.path.getmtime(f_) for f_ in t.devices if os.path.exists(f_)}
             self.tab3_result_show_TLM_VDS.setText(f"{t.VDS:.3f}")
             saveplots = self.tab3_result_save_all_plots_checkbox.isChecked()
 
@@ -2933,6 +3125,12 @@ class MyTableWidget(QWidget):
                 print_exc()
 
             o, r, err, bestfitdata, allRWs, l_0, Rc0W, mu0, mu0err, rs_sheet, rs_sheet_err, all_Vths, all_SSws = t.contactresistance()
+            if t.rejected_devices:
+                # rejected devices are kept (with their mtime) for the next TLM, so they are not read again
+                self.tab3_tlm_devices = {**t.devices, **{f_: d_["device"] for f_, d_ in t.rejected_devices.items()}}
+                self.tab3_tlm_devices_mtime = {f_: os.path.getmtime(f_) for f_ in self.tab3_tlm_devices if os.path.exists(f_)}
+                self.print_useroutput("Rejected outlier devices: " + ", ".join(os.path.basename(f_) for f_ in t.rejected_devices),
+                                      self.tab3_useroutput)
             transferdata = t.get_transfer_curves()
             self.tab3_tlm_overdrivedata_for_export = pd.DataFrame(
                 {"Vg-Vth [V]": o, "RcW [Ωm]": r, "RcW-err [Ωm]": err, "µ0 [cm²/Vs]": mu0})
@@ -3115,6 +3313,8 @@ class MyTableWidget(QWidget):
             self.TLM_mu0 = muintr
             self.TLM_mu0err = err_mu0
             self.TLM_Rsh = np.mean(rs_sheet[hl - 3:hl + 3]) / 1000 #kQ/sq
+            self.store_results(t, (o, r, err, bestfitdata, allRWs, l_0, Rc0W, mu0, mu0err, rs_sheet, rs_sheet_err,
+                                   all_Vths, all_SSws))
 
             self.print_useroutput(f"TLM analysis ended successfully. Runtime: {time.time() - t0:.4f}s",
                                   self.tab3_useroutput)
@@ -3139,8 +3339,7 @@ class MyTableWidget(QWidget):
         d_dict = {}
 
         for filepath_ in self.tab3_file_paths.values():
-            m = re.match('.*[_#]?W(?P<W>[\d.]+)[_#]*L(?P<L>[\d.]+).*', filepath_)
-            l__ = float(m.group('L'))
+            l__ = parse_filename_metadata(filepath_)["L"]
 
             try:
                 if l__ in d_dict.keys(): continue
@@ -3227,6 +3426,7 @@ class MyTableWidget(QWidget):
                                   self.tab5_useroutput)
             print("Bounds given for the fT fit of the S parameters are not valid. Check: is f_max < f_min?")
             return False
+        if self.tab5_fitsetup_autoRange_checkbox.isChecked(): bounds_ = "auto"
 
 
         # execute analysis and plot results
@@ -3247,9 +3447,10 @@ class MyTableWidget(QWidget):
                                                ylabel=r"$h_{21}$ (dB)", absolute=False,
                                                linestyle='-', marker=" ", lastplot=False)
 
-        if fit_bool:
-            fTresults = d.calculate_fT()
-
+        fTresults = d.calculate_fT() if fit_bool else None
+        if fit_bool and fTresults is None:
+            self.print_useroutput("Transit frequency could not be determined. Please check the fit range.", self.tab5_useroutput)
+        if fTresults is not None:
             self.tab5_plot_canvas_h21.plot_data(fTresults["xfitdata"], 20 * np.log10(fTresults["yfitdata"]),
                                             scale=['log', 'linear'], overwrite=False,
                                             label="Fit Data", xlabel=r"Frequency $f$ (Hz)",
@@ -3261,6 +3462,9 @@ class MyTableWidget(QWidget):
                                             ylabel=r"$h_{21}$ (dB)", absolute=False,
                                             linestyle='-', marker=" ", lastplot=False)
 
+            if bounds_ == "auto":
+                self.print_useroutput(f"Fit range found: {fTresults['fitbounds'][0]:.2e} Hz to {fTresults['fitbounds'][1]:.2e} Hz",
+                                      self.tab5_useroutput)
             self.tab5_result_fT.setText(f"{fTresults['fT']:.2e}")
             self.tab5_result_fT.setToolTip(f"{fTresults['errors']['fT']:.2e}")
             self.tab5_result_decay_slope.setText(f"{fTresults['fitslope']:.2f}")
@@ -3297,9 +3501,63 @@ class MyTableWidget(QWidget):
 
         self.print_useroutput(f"S-parameter analysis ended successfully. Runtime: {1000*(time.time() - t0):.1f}ms",
                               self.tab5_useroutput)
+        self.store_results(d, fTresults)
         print(f"[{time.strftime('%H:%M:%S')}] S-parameter analysis complete.")
         return True
 
+    # tab5 method: fT and fmax of all files in the list (one file per bias point), plotted versus V_GS for each V_DS
+    def analyze_sparam_bias_sweep(self):
+        t0 = time.time()
+
+        if len(self.tab5_file_paths.keys()) == 0:
+            self.print_useroutput("No data given for S-parameter analysis. Please select data files.",self.tab5_useroutput)
+            return False
+
+        min_mag_txt = self.tab5_fitsetup_fTbounds_min_magnitude.currentText()
+        max_mag_txt = self.tab5_fitsetup_fTbounds_max_magnitude.currentText()
+        magnitude = {"Hz": 1, "kHz": 1e3, "MHz": 1e6}
+        bounds_ = [self.tab5_fitsetup_fTbounds_min.value() * magnitude[min_mag_txt],
+                   self.tab5_fitsetup_fTbounds_max.value() * magnitude[max_mag_txt]]
+        if bounds_[1] <= bounds_[0]:
+            self.print_useroutput("Bounds given for the fit are not valid. Check: is f_max < f_min?",
+                                  self.tab5_useroutput)
+            return False
+        if self.tab5_fitsetup_autoRange_checkbox.isChecked(): bounds_ = "auto"
+
+        def progress(filename, done, total):
+            self.print_useroutput(f"Read {done}/{total} S-parameter files", self.tab5_useroutput)
+            QApplication.processEvents()
+
+        try:
+            sweep = SparameterBiasSweep(filenames=[i for i in self.tab5_file_paths.values() if i.lower().endswith(".s2p")],
+                                        fTbounds=bounds_, progress_callback=progress)
+            results = sweep.calculate_fT_fmax()
+
+            VDS_ = np.unique(results["VDS"])
+            # files without V_GS in the name are plotted against their position in the list
+            x_ = np.where(np.isnan(results["VGS"]), np.arange(len(results["VGS"])), results["VGS"])
+            for i, vds in enumerate(VDS_):
+                idx = np.flatnonzero((results["VDS"] == vds) | (np.isnan(vds) & np.isnan(results["VDS"])))
+                idx = idx[np.argsort(x_[idx])]
+                for key, label in [("fT", r"$f_T$"), ("fmax", r"$f_{max}$")]:
+                    self.tab5_plot_canvas_bias.plot_data(x_[idx], results[key][idx], scale=['linear', 'log'],
+                                                         overwrite=(i == 0 and key == "fT"),
+                                                         label=f"{label}, V_DS={vds:.2f} V" if not np.isnan(vds) else label,
+                                                         xlabel=r"Gate-Source Voltage $V_{GS}$ (V)", ylabel=r"Frequency (Hz)",
+                                                         linestyle='-', marker="o" if key == "fT" else "s",
+                                                         lastplot=(i == len(VDS_) - 1 and key == "fmax"))
+            for f_, vgs_, vds_, fT_, fmax_ in zip(results["filenames"], results["VGS"], results["VDS"], results["fT"], results["fmax"]):
+                print(f"{os.path.basename(f_)}: V_GS={vgs_:.2f} V, V_DS={vds_:.2f} V, fT = {fT_:.2e} Hz, fmax = {fmax_:.2e} Hz")
+        except:
+            print_exc()
+            self.print_useroutput("S-parameter bias sweep analysis failed. Please check the data files.", self.tab5_useroutput)
+            return False
+        self.store_results(sweep, results)
+
+        self.print_useroutput(f"S-parameter bias sweep of {len(sweep.filenames)} files ended successfully. "
+                              f"Runtime: {1000 * (time.time() - t0):.1f}ms", self.tab5_useroutput)
+        return True
+
     # tab5 method to estimate the transit frequency based on the TFT characteristics
     def estimate_fT(self):
         try:
@@ -3346,10 +3604,23 @@ class MyTableWidget(QWidget):
             #mfr = self.get_manual_fit_regions()
 
             a = Arrhenius(c_ox=c_, filenames=f, filetype=ft_, carrier_type=carrier_type, smoothing=sm_,
-                          fitRestriction=direction_,column_settings=col_sett_)
-
-            arrhenius_dict, temps, rcws, mu0s,\
-                    (xfit, yfit, (const, barrier), (const_err, barrier_err)) = a.analyze_temperatureDependent_TLM()
+                          fitRestriction=direction_,column_settings=col_sett_, prefetch=8)
+
+            # the temperatures are analyzed in parallel; show which ones are done so far
+            def arrhenius_progress(t, n_done, n_total):
+                self.print_useroutput(f"Arrhenius analysis: T={t:.0f} K done ({n_done}/{n_total})", self.tab6_useroutput)
+                QApplication.processEvents()
+
+            if self.tab6_arrhenius_joint_fit_checkbox.isChecked():
+                results = a.analyze_temperatureDependent_joint(progress_callback=arrhenius_progress)
+                # the joint fit needs the data of at least two temperatures
+                if results is None:
+                    self.print_useroutput("Arrhenius analysis failed: at least two temperatures with usable data are needed. Please check the selected files.",
+                                          self.tab6_useroutput)
+                    return False
+            else:
+                results = a.analyze_temperatureDependent_TLM(progress_callback=arrhenius_progress)
+            arrhenius_dict, temps, rcws, mu0s, (xfit, yfit, (const, barrier), (const_err, barrier_err)) = results
 
 
 
@@ -3471,9 +3742,103 @@ class MyTableWidget(QWidget):
 
         self.print_useroutput(f"Inverter analysis ended successfully. Runtime: {1000 * (time.time() - t0):.1f}ms",
                               self.tab7_useroutput)
+        self.store_results(d, data)
         print(f"[{time.strftime('%H:%M:%S')}] Inverter analysis complete.")
         return True
 
+    # tab7-method to analyze all loaded files at once (e.g. a V_DD sweep): butterfly noise margin and gain vs V_DD
+    def analyze_inverter_family(self):
+        t0 = time.time()
+
+        if len(self.tab7_file_paths.keys()) == 0:
+            self.print_useroutput("No data given for Inverter analysis. Please select data files.",self.tab7_useroutput)
+            return False
+
+        try:
+            sm_bool = self.tab7_analysis_smooth_bool.isChecked()
+            fam = InverterFamilyAnalysis(filenames=list(self.tab7_file_paths.values()),
+                                         filetype=self.datafile_preset,
+                                         smooth_factor=self.tab7_analysis_smoothing_factor.value() if sm_bool else None)
+
+            ls = self.tab7_results_choose_linestyle.currentText()
+            m,l = self.resolve_linestyle(ls)
+            directions = ["fwd", "bwd"] if any(d.bwd_available for d in fam.inverters) else ["fwd"]
+            for i, direction in enumerate(directions):
+                nm = fam.get_butterfly_noise_margins(direction)
+                self.tab7_plot_canvas_inverter_family.plot_data(nm["V_DD"], nm["snm"], scale=['linear', 'linear'],
+                                                                overwrite=(i == 0), label=f"SNM {direction}",
+                                                                xlabel=r"V_DD (V)", ylabel=r"static noise margin (V)",
+                                                                linestyle=l, marker=m, sci=False,
+                                                                lastplot=(i == len(directions) - 1))
+                for f_, v_, snm_ in zip(fam.filenames, nm["V_DD"], nm["snm"]):
+                    print(f"{os.path.basename(f_)}: V_DD={v_:.2f} V, SNM ({direction}) = {snm_:.3f} V")
+        except:
+            print_exc()
+            self.print_useroutput("Inverter family analysis failed. Please check the data files.", self.tab7_useroutput)
+            return False
+
+        self.print_useroutput(f"Inverter family analysis of {len(fam.filenames)} files ended successfully. "
+                              f"Runtime: {1000 * (time.time() - t0):.1f}ms", self.tab7_useroutput)
+        return True
+
+    # watch mode for tab1 and tab3: the files of a directory are added to the file list as soon as they are completely
+    # written (see DirectoryWatcher) and the analysis is updated - tab1 analyzes the newest lin/sat files, tab3 the TLM of
+    # all files. tab1 only takes files written after the start, tab3 also the ones that are already there.
+    # the directory is polled by a QTimer, so everything runs in the GUI thread
+    def toggle_directory_watch(self, tab, checked):
+        button = self.tab1_watch_directory_button if tab == "tab1" else self.tab3_watch_directory_button
+        if not checked:
+            if tab in self.directory_watchers:
+                watcher, timer = self.directory_watchers.pop(tab)
+                timer.stop()
+                print(f"[{time.strftime('%H:%M:%S')}] Stopped watching {watcher.directory}.")
+            button.setText('Watch Directory')
+            return True
+
+        default_directory = self.default_directory_tab1 if tab == "tab1" else self.default_directory_tab3
+        choose_default_path = default_directory if os.path.exists(default_directory) else os.getcwd()
+        directory = QFileDialog.getExistingDirectory(self, 'Select directory to watch for new measurement files',
+                                                     f"{choose_default_path}")
+        if not directory:
+            button.blockSignals(True); button.setChecked(False); button.blockSignals(False)
+            return False
+
+        watcher = DirectoryWatcher(directory, settle_time=2., extensions=FileIndex.transfer_extensions,
+                                   include_existing=(tab == "tab3"))
+        timer = QtCore.QTimer(self)
+        timer.timeout.connect(lambda: self.poll_directory_watch(tab))
+        timer.start(1000)
+        self.directory_watchers[tab] = (watcher, timer)
+        button.setText(f'Watching {os.path.basename(directory)}')
+        print(f"[{time.strftime('%H:%M:%S')}] Watching {directory} for new measurement files.")
+        return True
+
+    def poll_directory_watch(self, tab):
+        watcher, timer = self.directory_watchers[tab]
+        new = [f_.replace("\\", "/") for f_ in watcher.poll()]  # the file lists expect "/" as separator
+        if not new: return False
+
+        try:
+            if tab == "tab1":
+                self.choose_files(filelist=new)
+                # the newest file of each regime is chosen for the analysis
+                for f_ in new:
+                    regime = parse_filename_metadata(f_)["regime"]
+                    combobox = {"lin": self.tab1_analysis_choose_lin_data_combobox,
+                                "sat": self.tab1_analysis_choose_sat_data_combobox}.get(regime)
+                    if combobox is not None and (idx := combobox.findText(f_.split('/')[-1])) >= 0:
+                        combobox.setCurrentIndex(idx)
+                self.analyze_transfer_data()
+            else:
+                # only the linear transfer sweeps are devices of the TLM, saturation files etc. are left out
+                new = [f_ for f_ in new if is_TLM_file(f_)]
+                if not new: return False
+                self.choose_filesTLM(filelist=new)
+                if len(self.tab3_file_paths) >= 2: self.analyze_TLM()
+        except:
+            print_exc()
+        return True
+
     ##############
     # changing some settings
     ##############
@@ -3545,6 +3910,79 @@ class MyTableWidget(QWidget):
         self.tab4_show_L_correct_db_path.setPlaceholderText(str(self.default_L_correct_db))
         self.tab4_show_L_correct_db_path.setToolTip(str(self.default_L_correct_db))
 
+    # changing the path of the database the analysis results are written to. a new file is created if it does not exist
+    def change_results_database_path(self):
+        path, _ = QFileDialog.getSaveFileName(self, 'Select results database', self.results_database_path,
+                                              "SQLite Database (*.sqlite; *.db);;All Files (*)",
+                                              options=QFileDialog.DontConfirmOverwrite)
+        if path: self.set_results_database_path(path)
+
+    def set_results_database_path(self, path):
+        if path != self.results_database_path and self.results_store is not None:
+            self.results_store.close()
+            self.results_store = None
+        self.results_database_path = path
+        self.tab4_show_results_database_path.setPlaceholderText(str(path))
+        self.tab4_show_results_database_path.setToolTip(str(path))
+
+    # writing the results of an analysis to the results database (if active). results that are already given (e.g. the
+    # tuple of TLM_Analysis.contactresistance()) are passed on so that nothing is fitted twice. errors are only reported,
+    # the analysis itself must not fail because of the database
+    def store_results(self, analysis, results=None, **metadata):
+        if not self.tab4_store_results.isChecked(): return 0
+        try:
+            if self.results_store is None: self.results_store = ResultsStore(self.results_database_path)
+            n = self.results_store.add(analysis, results, **metadata)
+            print(f"[{time.strftime('%H:%M:%S')}] {n} results written to {self.results_database_path}.")
+            return n
+        except:
+            print_exc()
+            print(f"Results could not be written to {self.results_database_path}.")
+            return 0
+
+    # recording of the timings of the analysis stages (see tracer in python_analysis_skript.py). the panel in the
+    # settings tab shows the summary; it is updated when the settings tab is opened or with the refresh button
+    def toggle_timings(self, checked):
+        if checked: tracer.enable()
+        else: tracer.disable()
+        self.update_timings_panel()
+
+    def timings_summary(self):
+        return tracer.summary("category" if self.tab4_timings_grouping.currentText() == "Stage" else "name")
+
+    def update_timings_panel(self):
+        try:
+            summary = self.timings_summary()
+            self.tab4_timings_table.clear()
+            self.tab4_timings_table.setRowCount(len(summary))
+            self.tab4_timings_table.setColumnCount(len(summary.columns))
+            self.tab4_timings_table.setHorizontalHeaderLabels([str(c) for c in summary.columns])
+            self.tab4_timings_table.setVerticalHeaderLabels([str(i) for i in summary.index])
+            for i, row in enumerate(summary.itertuples(index=False)):
+                for j, value in enumerate(row):
+                    self.tab4_timings_table.setItem(i, j, QTableWidgetItem(f"{value:.0f}" if j == 0 else f"{value:.1f}"))
+            self.tab4_timings_table.resizeColumnsToContents()
+        except:
+            print_exc()
+
+    def clear_timings(self):
+        tracer.clear()
+        self.update_timings_panel()
+
+    def export_timings(self):
+        path, file_filter = QFileDialog.getSaveFileName(self, 'Export timings', f"{self.default_directory_savefig}/timings.json",
+                                                        "Chrome Trace (*.json);;Summary Table (*.csv)")
+        if not path: return False
+        try:
+            if path.endswith(".csv") or file_filter.startswith("Summary"): self.timings_summary().to_csv(path)
+            else: tracer.write_chrome_trace(path)
+            self.print_useroutput(f"Timings exported to {path}", self.tab4_outputline)
+            return True
+        except:
+            print_exc()
+            self.print_useroutput("Timings could not be exported.", self.tab4_outputline)
+            return False
+
     ####################
     # handling files and parameters stored in the individual tabs: adding or removing files, clearing results sections etc
     ####################
@@ -3669,6 +4107,8 @@ class MyTableWidget(QWidget):
         self.tab1_plot_canvas_ssw.clear()
         self.tab1_plot_canvas_muvglin.clear()
         self.tab1_plot_canvas_muvgsat.clear()
+        self.tab1_transistor_analysis = None
+        self.tab1_transistor_analysis_source = None
 
         # if the value of fd/sd is changed, the analysis will be run from anew. to prevent this, the button action
         # has to be revoked, the value changed and afterwards the button action can be restored
@@ -3707,6 +4147,8 @@ class MyTableWidget(QWidget):
     def empty_TLM_file_list(self):
         self.tab3_filelist.clear()
         self.tab3_file_paths = {}
+        self.tab3_tlm_devices, self.tab3_tlm_devices_source, self.tab3_tlm_devices_mtime = {}, None, {}
+        self.tab3_tlm, self.tab3_tlm_settings = None, None
         self.empty_TLM_results()
         self.tab3_analysis_first_derivative_threshold_input.setValue(0)
         self.tab3_analysis_second_derivative_threshold_input.setValue(0)
@@ -3718,6 +4160,8 @@ class MyTableWidget(QWidget):
         del self.tab3_file_paths[f_]
         self.tab3_filelist.takeItem(self.tab3_filelist.currentRow())
         print(f"[{time.strftime('%H:%M:%S')}] Dataset {f_} has been removed from the TLM list.")
+        # if there are results, they are updated right away; only the removed device is taken out of the regressions
+        if self.tab3_tlm is not None and len(self.tab3_file_paths) >= 2: self.analyze_TLM()
 
     # tab3-method to reset all analysis results, both graphs and numeric values
     def empty_TLM_results(self):
@@ -3917,28 +4361,17 @@ class MyTableWidget(QWidget):
     def determine_transistor_characteristics(self):
         l_ = self.tab1_analysis_choose_lin_data_combobox.currentText()
         s_ = self.tab1_analysis_choose_sat_data_combobox.currentText()
-        # determination of channel width and length
-        try:
-            m_lin = re.match('.*[_#]?W(?P<W>[\d.]+)[_#]*?L(?P<L>[\d.]+).*', l_)
-            length_lin = float(m_lin.group('L'))
-            width_lin = float(m_lin.group('W'))
-        except:
-            length_lin = None;
-            width_lin = None
-        try:
-            m_sat = re.match('.*[_#]?W(?P<W>[\d.]+)[_#]*?L(?P<L>[\d.]+).*', s_)
-            length_sat = float(m_sat.group('L'))
-            width_sat = float(m_sat.group('W'))
-        except:
-            length_sat = None;
-            width_sat = None
+        # determination of channel width and length (the filename patterns are shared with the analysis classes)
+        meta_lin, meta_sat = parse_filename_metadata(l_), parse_filename_metadata(s_)
+        length_lin, width_lin = meta_lin["L"], meta_lin["W"]
+        length_sat, width_sat = meta_sat["L"], meta_sat["W"]
 
         # determination of V_DS for the linear
         VDS = None
         if l_ != "None":
             try:  # assume labview
-                m_vds = re.match('.*Vds(?P<VDS>[+\-\d.]+).*', l_)
-                VDS = float(m_vds.group('VDS'))  # if m_vds is not None else None
+                VDS = meta_lin["VDS"]
+                if VDS is None: raise ValueError
             except:
                 try:  # assume sweepme
                     d = pd.read_table(self.tab1_file_paths_dictionary[l_],
@@ -1,5 +1,6 @@
 #### should d be insulator thickness or depletion width?!?!
 import numpy as np
+import functools
 
 def mobility_lin(V_g, V_d, Z, L, C_ox, mu_eff, V_th):
     """
@@ -26,6 +27,40 @@ def mobility_sat_simplified(V_g, mu_eff, V_th, Z, L, C_ox=0.5):
     return Z / (2 * M * L) * mu_eff * C_ox * (V_g - V_th)**2
 
 
+def _line_fit(x, y):
+    # least squares line y = a*x + b in closed form, (nan, nan) if x does not vary
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    dx = x - x.mean()
+    Sxx = np.sum(dx**2)
+    if not Sxx > 0: return np.nan, np.nan
+    a = np.sum(dx * (y - y.mean())) / Sxx
+    return a, y.mean() - a * x.mean()
+
+
+def mobility_lin_guess(V_g, I_d, V_d, Z, L, C_ox):
+    """
+    initial guess (mu_eff, V_th) for fitting mobility_lin to the datapoints (V_g, I_d), from a line through the data:
+    the model is linear in V_g with slope Z/L*mu_eff*C_ox*V_d and zero at V_g = V_th + V_d/2, so this is already the
+    least squares solution. returns None if the line is degenerate (curve_fit then starts from its default p0)
+    """
+    a, b = _line_fit(V_g, I_d)
+    if not (np.isfinite(a) and np.isfinite(b)) or a == 0 or V_d == 0: return None
+    return np.array([a * L / (Z * C_ox * V_d), -b / a - V_d / 2])
+
+
+def mobility_sat_guess(V_g, I_d, Z, L, C_ox=0.5):
+    """
+    initial guess (mu_eff, V_th) for fitting mobility_sat_simplified to the datapoints (V_g, I_d), from a line through
+    sqrt(|I_d|): its slope squared is Z/(2L)*|mu_eff|*C_ox and it is zero at V_th. the sign of mu_eff is the sign of
+    the current (the model is a parabola). returns None if the line is degenerate (curve_fit then starts from its
+    default p0)
+    """
+    I_d = np.asarray(I_d, dtype=float)
+    a, b = _line_fit(V_g, np.sqrt(np.abs(I_d)))
+    if not (np.isfinite(a) and np.isfinite(b)) or a == 0: return None
+    return np.array([np.sign(np.sum(I_d)) * a**2 * 2 * L / (Z * C_ox), -b / a])
+
+
 def gaussian(x, s=.1, mu=0):
     return 1 / (np.sqrt(2 * np.pi) * s) * np.exp(-(x - mu)**2 / (2 * s**2))
 
@@ -41,12 +76,23 @@ def gaussian_2ndderiv(x, s=.1, mu=0):
                    (2 * s**2)) / s**2) / (np.sqrt(2 * np.pi) * s)
 
 
-def smoothing(array, gauss_s=.25,lim=5,pts=59):
-    #pts=len(array)//3
+@functools.lru_cache(maxsize=64)
+def gaussian_kernel(order=0, gauss_s=.25, lim=5, pts=59):
+    """
+    gaussian (order 0) or its first or second derivative on pts points between -lim and lim, as used by smoothing(),
+    first_derivative() and second_derivative(). the kernels only depend on these parameters and are cached; the returned
+    arrays are shared and therefore read-only
+    """
     x = np.linspace(-lim, lim, pts)
+    kernel = [gaussian, gaussian_1stderiv, gaussian_2ndderiv][order](x, s=gauss_s)
+    kernel.setflags(write=False)
+    return kernel
+
 
+def smoothing(array, gauss_s=.25,lim=5,pts=59):
+    #pts=len(array)//3
     # calculate first order deriv.
-    sm = gaussian(x, s=gauss_s)
+    sm = gaussian_kernel(0, gauss_s, lim, pts)
     y_conv = np.convolve(array, sm/sm.sum(), mode="same") # division by sm.sum() needed to normalize the gaussian. not needed for the derivatives for some reason since the integral over them vanishes?
     return y_conv
 
@@ -59,10 +105,8 @@ def first_derivative(array, gauss_s=.25, lim=5,pts=59):
     gaussian is defined) and thus influences the convoluted data. the initial values were found a good compromise
     between smoothening the data and including too much noise in the application for identification of linear regimes
     """
-    x = np.linspace(-lim, lim, pts)
-
     # calculate first order deriv.
-    sm = gaussian_1stderiv(x, s=gauss_s)
+    sm = gaussian_kernel(1, gauss_s, lim, pts)
     y_conv = np.convolve(array, sm, mode="same")
     return y_conv
 
@@ -76,14 +120,26 @@ def second_derivative(array, gauss_s=.25, lim=5,pts=59):
     gaussian is defined) and thus influences the convoluted data. the initial values were found a good compromise
     between smoothening the data and including too much noise in the application for identification of linear regimes
     """
-    x = np.linspace(-lim, lim, pts)
-
     # calculate second order deriv.
-    sm = gaussian_2ndderiv(x, s=gauss_s)
+    sm = gaussian_kernel(2, gauss_s, lim, pts)
     y_conv = np.convolve(array, sm/sm.sum(), mode="same")
     return y_conv
 
 
+def one_side_gradient(y, x):
+    """
+    absolute one-sided difference quotient |dy/dx| between each point and the next one, along the last axis (works for
+    a single curve or a 2d array with one curve per row). np.gradient uses the centered gradient, which cuts the gain
+    of "perfect" inverters (only one point with high gain) in half. the last point of each curve has no right neighbour
+    and is nan (as is inf from repeated x values) so the result keeps the shape of the input
+    """
+    y, x = np.asarray(y, dtype=float), np.asarray(x, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dydx = np.abs(np.diff(y, axis=-1) / np.diff(x, axis=-1))
+    dydx[np.isinf(dydx)] = np.nan  # np.max() will treat inf as highest value - replace with nan
+    return np.concatenate((dydx, np.full(dydx.shape[:-1] + (1,), np.nan)), axis=-1)
+
+
 
 def mobility_sat(V_g, mu_eff, V_th, C_ox = 0.5, N_A = 1, q = 1.602e-19, eps_s = 3, ptype=True):
     """
@@ -192,4 +248,61 @@ def current_density_SCL(V, mu, eps_i, d):
     eps_i is the insulator permitivitty
     E is electric field in the insulator (V/nm) for voltage V over insulator thickness d
     """
-    return (9 * eps_i * mu * V**2) / (8 * d**3)
\ No newline at end of file
+    return (9 * eps_i * mu * V**2) / (8 * d**3)
+
+# two-port parameter conversions for arrays of shape (..., 2, 2), e.g. (n_freq, 2, 2) or (n_bias, n_freq, 2, 2).
+# closed-form expressions for two ports with the same (real) reference impedance Z0 at both ports, see e.g.
+# Frickey, IEEE Trans. Microwave Theory Tech. 42, 205 (1994). the frequency axes are not looped over
+def s_to_z(S, Z0=50):
+    S11, S12, S21, S22 = S[..., 0, 0], S[..., 0, 1], S[..., 1, 0], S[..., 1, 1]
+    d = (1 - S11) * (1 - S22) - S12 * S21
+    Z = np.empty(np.shape(S), dtype=complex)
+    Z[..., 0, 0] = ((1 + S11) * (1 - S22) + S12 * S21) / d
+    Z[..., 0, 1] = 2 * S12 / d
+    Z[..., 1, 0] = 2 * S21 / d
+    Z[..., 1, 1] = ((1 - S11) * (1 + S22) + S12 * S21) / d
+    return Z0 * Z
+
+
+def s_to_y(S, Z0=50):
+    S11, S12, S21, S22 = S[..., 0, 0], S[..., 0, 1], S[..., 1, 0], S[..., 1, 1]
+    d = (1 + S11) * (1 + S22) - S12 * S21
+    Y = np.empty(np.shape(S), dtype=complex)
+    Y[..., 0, 0] = ((1 - S11) * (1 + S22) + S12 * S21) / d
+    Y[..., 0, 1] = -2 * S12 / d
+    Y[..., 1, 0] = -2 * S21 / d
+    Y[..., 1, 1] = ((1 + S11) * (1 - S22) + S12 * S21) / d
+    return Y / Z0
+
+
+def s_to_h(S, Z0=50):
+    S11, S12, S21, S22 = S[..., 0, 0], S[..., 0, 1], S[..., 1, 0], S[..., 1, 1]
+    d = (1 - S11) * (1 + S22) + S12 * S21
+    H = np.empty(np.shape(S), dtype=complex)
+    H[..., 0, 0] = Z0 * ((1 + S11) * (1 + S22) - S12 * S21) / d
+    H[..., 0, 1] = 2 * S12 / d
+    H[..., 1, 0] = -2 * S21 / d  # current gain h21
+    H[..., 1, 1] = ((1 - S11) * (1 - S22) - S12 * S21) / d / Z0
+    return H
+
+
+# normalized z (Z/Z0) or y (Y*Z0) to S, needed for touchstone files that contain Z or Y parameters
+def z_to_s(z):
+    I = np.eye(2)
+    return np.linalg.solve((z + I).swapaxes(-1, -2), (z - I).swapaxes(-1, -2)).swapaxes(-1, -2)
+
+
+def y_to_s(y):
+    I = np.eye(2)
+    return np.linalg.solve((I + y).swapaxes(-1, -2), (I - y).swapaxes(-1, -2)).swapaxes(-1, -2)
+
+
+def mason_unilateral_gain(S):
+    """
+    Mason's unilateral power gain U of two-ports given as S-parameter arrays of shape (..., 2, 2), calculated from the
+    Y-parameters (reference impedance cancels): U = |Y21 - Y12|^2 / (4 (Re Y11 Re Y22 - Re Y12 Re Y21)).
+    it decays with -20 dB/dec and the frequency where U = 1 is the maximum oscillation frequency f_max
+    """
+    Y = s_to_y(S, 1)
+    Y11, Y12, Y21, Y22 = Y[..., 0, 0], Y[..., 0, 1], Y[..., 1, 0], Y[..., 1, 1]
+    return np.abs(Y21 - Y12)**2 / (4 * (Y11.real * Y22.real - Y12.real * Y21.real))
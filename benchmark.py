@@ -0,0 +1,417 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# benchmarks of the analysis hot paths on synthetic devices. the transfer curves are generated from the same model
+# functions the analysis fits (mobility_lin, mobility_sat_simplified) with a subthreshold exponential, contact
+# resistance, hysteresis and noise, and are written in the SweepMe!, LabVIEW and Goettingen formats, so the whole path
+# from reading the files to the TLM/Arrhenius results is timed. run it from the repository directory:
+#   python benchmark.py                                    # full suite, results in benchmark_<date>_<time>.json
+#   python benchmark.py --quick --output new.json          # smaller suite, e.g. before each commit
+#   python benchmark.py --compare old.json                 # exit code 1 if a benchmark got slower than the tolerance
+#   python benchmark.py --quick --trace trace.json         # time per analysis stage (io, smoothing, fit, ...) as well
+# the json contains the timings (min/median/mean of the repeats, per device for the multi-device benchmarks) together
+# with the versions of python, numpy, scipy and pandas and the git commit, so runs of different versions can be compared
+import os
+import sys
+import io
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import numpy as np
+import pandas as pd
+import scipy
+
+from analysis_function_definitions import mobility_lin, mobility_sat_simplified
+from python_analysis_skript import TransistorAnalysis, TLM_Analysis, Arrhenius, InverterAnalysis, SparameterAnalysis, \
+    DevicePopulation, SweepArchive, tracer
+
+
+C_OX = .65  # µF/cm², as in the GUI
+formats = ["SweepMe!", "LabVIEW", "Goettingen"]
+
+
+# gate voltage sweep from the off to the on state and back (n_points in total, the turning point is included once)
+def gate_sweep(n_points, V_off=1., V_on=-3.):
+    fwd = np.linspace(V_off, V_on, n_points // 2 + 1)
+    return np.concatenate((fwd, fwd[::-1][1 + (n_points % 2 == 0):]))
+
+
+# synthetic transfer curve of a p- (or n-) type transistor, currents with the measured sign. the gate overdrive voltage
+# goes smoothly into the subthreshold regime (softplus with the subthreshold swing ss in V/dec), above threshold the
+# current is the one of mobility_lin/mobility_sat_simplified. in the linear regime the contact resistance RcW (Ohm m) is
+# in series with the channel. the back sweep is shifted by the hysteresis. W, L in µm and C_ox in µF/cm², as in the
+# analysis classes
+def synthetic_transfer(L, W=100., C_ox=C_OX, mu=1., V_th=-1., V_DS=-.1, regime="lin", n_points=121, carrier_type="p",
+                       ss=.1, hysteresis=.05, RcW=1., I_off=1e-12, noise=2e-13, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    f = -1 if carrier_type == "p" else 1
+    Z, L_, C = W * 1e-6, L * 1e-6, C_ox * 1e-6
+
+    V_g = gate_sweep(n_points, V_off=-f * 1., V_on=f * 3.)
+    V_th_ = V_th + f * hysteresis * (np.arange(len(V_g)) >= n_points // 2)
+
+    # the saturation current goes with the square of the overdrive voltage, so its softplus is half as steep
+    n_vt = ss / np.log(10) * (2 if regime == "sat" else 1)
+    V_ov = n_vt * np.logaddexp(0, f * (V_g - V_th_) / n_vt)
+    if regime == "lin":
+        I_channel = mobility_lin(V_th_ + f * V_ov + V_DS / 2, V_DS, Z, L_, C, mu, V_th_)
+        I = I_channel / (1 + I_channel * RcW / (Z * np.abs(V_DS)))
+    else:
+        I = mobility_sat_simplified(V_th_ + f * V_ov, mu, V_th_, Z, L_, C)
+
+    I_d = f * (np.abs(I) + I_off) + rng.normal(0, noise, len(V_g))
+    I_g = rng.normal(0, noise, len(V_g))
+    V_d = np.full(len(V_g), float(V_DS))
+    return V_g, V_d, I_d, I_g
+
+
+def write_table(filename, header, columns, trailing_separator=False):
+    with open(filename, "w") as datafile:
+        datafile.write("\n".join(header) + "\n")
+        np.savetxt(datafile, np.column_stack(columns), delimiter="\t", fmt="%.12g",
+                   newline="\t\n" if trailing_separator else "\n")
+
+
+# one transfer curve in one of the data presets of TransistorAnalysis, in the column order it expects
+def write_transfer(filename, filetype, regime, V_g, V_d, I_d, I_g):
+    t = .1 * np.arange(len(V_g))
+    r = regime
+    if filetype == "SweepMe!":
+        names = ["Time elapsed", "Timestamp", f"{r}_source Voltage", f"{r}_source Current", f"{r}_drain Voltage",
+                 f"{r}_drain Current", f"{r}_gate Voltage", f"{r}_gate Current"]
+        write_table(filename, ["\t".join(names), "\t".join(["s", "", "V", "A", "V", "A", "V", "A"]), "\t" * 7],
+                    [t, 1.6e9 + t, 0 * t, -I_d - I_g, V_d, I_d, V_g, I_g])
+    elif filetype == "LabVIEW":
+        # LabVIEW files contain the derived curves as well, they are not used by the analysis
+        names = ["V_GS", "t", "I_DS", "I_GS", "abs(I_DS)", "abs(I_GS)", "sqrt(abs(I_DS))", "dI_DS/dV_GS", "d2I_DS/dV_GS2"]
+        d1 = np.gradient(I_d, V_g)
+        write_table(filename, ["\t".join(names), "\t".join(["V", "s", "A", "A", "A", "A", "A^0.5", "A/V", "A/V^2"])],
+                    [V_g, t, I_d, I_g, np.abs(I_d), np.abs(I_g), np.sqrt(np.abs(I_d)), d1, np.gradient(d1, V_g)])
+    elif filetype == "Goettingen":
+        write_table(filename, ["GOETTINGEN transfer measurement", "synthetic data", "",
+                               "\t".join(["V_D (V)", "V_G (V)", "I_D (A)", "I_G (A)", "t (s)"])],
+                    [V_d, V_g, I_d, I_g, t], trailing_separator=True)
+    else:
+        raise ValueError(f"Unknown data preset {filetype}")
+
+
+# filename in the naming convention that parse_filename_metadata() understands, with the extension of the preset.
+# goettingen files are recognized by "GOETT" in the name and carry the gate number in front of the temperature
+def transfer_filename(directory, filetype, sample, W, L, regime, index=0, V_DS=-.1, T=None):
+    name = f"{sample}_W{W:g}_L{L:g}_Vds{V_DS:g}_{regime}_{index}"
+    if T is not None: name += f"_G{index + 1}_T{int(T)}" if filetype == "Goettingen" else f"_T{int(T)}"
+    if filetype == "Goettingen": name += "_GOETT"
+    return os.path.join(directory, name + (".dat" if filetype == "LabVIEW" else ".txt"))
+
+
+# channel lengths of the devices of a TLM: n_devices devices, the lengths are repeated if there are more devices than
+# lengths (several devices per channel length)
+def TLM_lengths(n_devices, lengths=(5, 10, 20, 40, 80, 160)):
+    return [lengths[i % len(lengths)] for i in range(n_devices)]
+
+
+# writes the lin (and sat) files of a set of devices and returns [(L, {"lin": file, "sat": file or None})]. with
+# activation_energy (meV) the mobility is thermally activated, for the Arrhenius analysis
+def write_devices(directory, filetype, lengths, n_points, rng, sample="BM01", W=100., T=None, activation_energy=30.,
+                  sat=False):
+    mu = 1. if T is None else np.exp(-activation_energy / (8.6173e-2 * T)) / np.exp(-activation_energy / (8.6173e-2 * 300))
+    devices = []
+    for i, L in enumerate(lengths):
+        mu_ = mu * rng.normal(1, .03)
+        V_th = -1. + rng.normal(0, .05)
+        files = {"lin": None, "sat": None}
+        for regime in (["lin", "sat"] if sat else ["lin"]):
+            V_DS = -.1 if regime == "lin" else -1.
+            files[regime] = transfer_filename(directory, filetype, sample, W, L, regime, index=i, V_DS=V_DS, T=T)
+            write_transfer(files[regime], filetype, regime,
+                           *synthetic_transfer(L, W=W, mu=mu_, V_th=V_th, V_DS=V_DS, regime=regime, n_points=n_points,
+                                               rng=rng))
+        devices.append((L, files))
+    return devices
+
+
+# inverter transfer curve (fwd and bwd sweep of V_in) in the SweepMe! preset of InverterAnalysis
+def write_inverter(filename, n_points, V_DD=2., gain=20., hysteresis=.05, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    V_in = gate_sweep(n_points, V_off=0., V_on=V_DD)
+    shift = hysteresis * V_DD * (np.arange(len(V_in)) >= n_points // 2)
+    V_out = V_DD / (1 + np.exp(gain / V_DD * (V_in - .45 * V_DD - shift))) + rng.normal(0, 1e-3, len(V_in))
+    t = .1 * np.arange(len(V_in))
+    zeros = np.zeros(len(V_in))
+    write_table(filename, ["\t".join(["Time elapsed", "Timestamp", "gnd Voltage", "gnd Current", "dd Voltage",
+                                      "dd Current", "out Voltage", "out Current", "in Voltage", "in Current"]),
+                           "\t".join(["s", "", "V", "A", "V", "A", "V", "A", "V", "A"]), "\t" * 9],
+              [t, 1.6e9 + t, zeros, zeros, zeros + V_DD, zeros + 1e-9, V_out, zeros, V_in, zeros])
+
+
+# S-parameters of the small signal equivalent circuit of a transistor (gm, Cgs, Cgd, gds) as touchstone file (RI, GHz)
+def write_touchstone(filename, n_points, gm=1e-4, C_gs=1e-12, C_gd=2e-13, g_ds=1e-6, Z0=50.):
+    f = np.logspace(5, 9, n_points)
+    w = 2 * np.pi * f
+    Y = np.zeros((n_points, 2, 2), dtype=complex)
+    Y[:, 0, 0], Y[:, 0, 1] = 1j * w * (C_gs + C_gd), -1j * w * C_gd
+    Y[:, 1, 0], Y[:, 1, 1] = gm - 1j * w * C_gd, g_ds + 1j * w * C_gd
+    S = (np.eye(2) - Y * Z0) @ np.linalg.inv(np.eye(2) + Y * Z0)
+    columns = [f / 1e9]
+    for i, j in [(0, 0), (1, 0), (0, 1), (1, 1)]: columns += [S[:, i, j].real, S[:, i, j].imag]
+    with open(filename, "w") as datafile:
+        datafile.write("! synthetic 2-port\n# GHz S RI R 50\n")
+        np.savetxt(datafile, np.column_stack(columns), delimiter=" ", fmt="%.12g")
+
+
+# runs setup() and then measure(setup result) repeats times, only measure is timed. the output of the analysis (it
+# prints a lot) is suppressed. measure returns whether the analysis gave a result, a benchmark that got faster because
+# it fails is then recognized in the json
+def timeit(measure, setup=None, repeats=3):
+    times, ok = [], True
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            arg = setup() if setup is not None else None
+            start = time.perf_counter()
+            result = measure(arg) if setup is not None else measure()
+            times.append(time.perf_counter() - start)
+        ok = ok and (result is not None) and (result is not False)
+    return {"min": float(np.min(times)), "median": float(np.median(times)), "mean": float(np.mean(times)),
+            "repeats": repeats, "ok": bool(ok)}
+
+
+def transistor_benchmarks(directory, points, repeats, rng):
+    results = []
+    for filetype in formats:
+        for n in points:
+            (L, files), = write_devices(directory, filetype, [20], n, rng, sample=f"TA{n}", sat=True)
+
+            def read():
+                return TransistorAnalysis(100., L, C_OX, filenames=files, filetype=filetype, V_DS=-.1)
+
+            results.append({"benchmark": "TransistorAnalysis", "format": filetype, "points": n, "devices": 1,
+                            **timeit(lambda: read().linear_sweep, repeats=repeats)})
+            if filetype != "SweepMe!": continue
+
+            # the fits are timed on fresh objects, i.e. including the smoothed data and derivatives they need
+            for method in ["fit_mobility_lin", "fit_mobility_sat", "subthreshold_swing"]:
+                results.append({"benchmark": method, "format": filetype, "points": n, "devices": 1,
+                                **timeit(lambda t: getattr(t, method)(), setup=read, repeats=repeats)})
+            # saturation fit with the closed form lines through sqrt(Id) only, i.e. without the curve_fit refinement
+            results.append({"benchmark": "fit_mobility_sat_linearized", "format": filetype, "points": n, "devices": 1,
+                            **timeit(lambda t: t.update_parameters(sat_refine=False).fit_mobility_sat(), setup=read,
+                                     repeats=repeats)})
+    return results
+
+
+def TLM_benchmarks(directory, points, device_counts, repeats, rng, direction="fwd"):
+    results = []
+    for n in points:
+        for count in device_counts:
+            files = [f["lin"] for L, f in write_devices(directory, "SweepMe!", TLM_lengths(count), n, rng,
+                                                        sample=f"TLM{n}N{count}")]
+
+            def build(**kwargs):
+                return TLM_Analysis(C_OX, filenames=files, filetype="SweepMe!", fitRestriction=direction, **kwargs)
+
+            # robust regression of all overdrive voltages, including the check for outlier devices
+            def build_robust():
+                return build(regression="huber", reject_outliers=True)
+
+            for benchmark, measure, setup in [("TLM_Analysis", lambda: build().measurements, None),
+                                              ("contactresistance", lambda tlm: tlm.contactresistance(), build),
+                                              ("contactresistance_robust", lambda tlm: tlm.contactresistance(), build_robust),
+                                              ("Vgdependent_mobility", lambda tlm: tlm.Vgdependent_mobility(), build)]:
+                r_ = timeit(measure, setup=setup, repeats=repeats)
+                r_["per_device"] = r_["median"] / count
+                results.append({"benchmark": benchmark, "format": "SweepMe!", "points": n, "devices": count, **r_})
+            # the same files read from a sweep archive instead of parsing the text files
+            with contextlib.redirect_stdout(io.StringIO()):
+                archive = SweepArchive.convert(os.path.join(directory, f"TLM{n}N{count}.tsa"), files)
+            r_ = timeit(lambda: build(archive=archive).measurements, repeats=repeats)
+            r_["per_device"] = r_["median"] / count
+            results.append({"benchmark": "TLM_Analysis", "format": "archive", "points": n, "devices": count, **r_})
+            archive.close()
+            # the files read concurrently ahead of the analysis (on a local disk this only shows the overhead)
+            r_ = timeit(lambda: build(prefetch=8).measurements, repeats=repeats)
+            r_["per_device"] = r_["median"] / count
+            results.append({"benchmark": "TLM_Analysis", "format": "prefetch", "points": n, "devices": count, **r_})
+    return results
+
+
+def Arrhenius_benchmarks(directory, points, temperatures, device_counts, repeats, rng, workers=1, direction="fwd"):
+    results = []
+    for n in points:
+        for count in device_counts:
+            files = []
+            for T in temperatures:
+                files += [f["lin"] for L, f in write_devices(directory, "SweepMe!", TLM_lengths(count), n, rng,
+                                                             sample=f"AR{n}N{count}", T=T)]
+
+            def build():
+                return Arrhenius(c_ox=C_OX, filenames=files, filetype="SweepMe!", fitRestriction=direction)
+
+            for benchmark, method in [("Arrhenius_TLM", "analyze_temperatureDependent_TLM"),
+                                      ("Arrhenius_joint", "analyze_temperatureDependent_joint")]:
+                r_ = timeit(lambda a: getattr(a, method)(workers=workers), setup=build, repeats=repeats)
+                r_["per_device"] = r_["median"] / (count * len(temperatures))
+                results.append({"benchmark": benchmark, "format": "SweepMe!", "points": n,
+                                "devices": count * len(temperatures), "temperatures": len(temperatures),
+                                "workers": workers, **r_})
+    return results
+
+
+def inverter_benchmarks(directory, points, repeats, rng):
+    results = []
+    for n in points:
+        filename = os.path.join(directory, f"INV{n}_inverter.txt")
+        write_inverter(filename, n, rng=rng)
+
+        def analyze():
+            inverter = InverterAnalysis(filename=filename, filetype="SweepMe!")
+            return inverter.get_characteristics()
+
+        results.append({"benchmark": "InverterAnalysis", "format": "SweepMe!", "points": n, "devices": 1,
+                        **timeit(analyze, repeats=repeats)})
+    return results
+
+
+def sparameter_benchmarks(directory, frequency_points, repeats):
+    results = []
+    for n in frequency_points:
+        filename = os.path.join(directory, f"SP{n}.s2p")
+        write_touchstone(filename, n)
+
+        def analyze():
+            return SparameterAnalysis(filename=filename, fTbounds="auto").calculate_fT()
+
+        results.append({"benchmark": "SparameterAnalysis", "format": "touchstone", "points": n, "devices": 1,
+                        **timeit(analyze, repeats=repeats)})
+    return results
+
+
+# statistics of a lot of devices: synthetic results (scattered around the model values, some outliers) grouped by
+# sample, W/L and temperature
+def population_benchmarks(population_sizes, repeats, rng):
+    results = []
+    for n in population_sizes:
+        table = pd.DataFrame({"sample": rng.choice([f"PO{k:02d}" for k in range(8)], n), "W": 100.,
+                              "L": rng.choice(TLM_lengths(6), n).astype(float), "T": rng.choice([250., 300.], n)})
+        for quantity, value, scatter in [("mu_lin", 1., .1), ("vth_lin", -1., .05), ("reliability_lin", .8, .05),
+                                         ("mu_sat", 1.2, .1), ("vth_sat", -1.1, .05), ("ssw_lin", 120., 10.),
+                                         ("oor_sat", 6., .3)]:
+            table[quantity] = rng.normal(value, scatter, n)
+            table.loc[rng.random(n) < .01, quantity] = value + 20 * scatter
+        population = DevicePopulation(table)
+
+        def analyze():
+            return population.summary(), population.outliers(), population.correlations()
+
+        results.append({"benchmark": "DevicePopulation", "format": "table", "points": len(population.quantities),
+                        "devices": n, **timeit(analyze, repeats=repeats)})
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except:
+        commit = None
+    return {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "commit": commit, "python": platform.python_version(),
+            "numpy": np.__version__, "scipy": scipy.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "processor": platform.processor(), "cpu_count": os.cpu_count()}
+
+
+def run(points=(121, 241, 481), device_counts=(6, 12, 24, 48), temperatures=(200, 250, 300, 350),
+        frequency_points=(201, 1601, 12801), population_sizes=(500, 5000), repeats=5, seed=0, workers=1,
+        data_directory=None):
+    rng = np.random.default_rng(seed)
+    settings = {"points": list(points), "device_counts": list(device_counts), "temperatures": list(temperatures),
+                "frequency_points": list(frequency_points), "population_sizes": list(population_sizes),
+                "repeats": repeats, "seed": seed, "workers": workers}
+    with (contextlib.nullcontext(data_directory) if data_directory is not None else tempfile.TemporaryDirectory()) as d:
+        os.makedirs(d, exist_ok=True)
+        results = []
+        for name, bench in [("TransistorAnalysis", lambda: transistor_benchmarks(d, points, repeats, rng)),
+                            ("TLM", lambda: TLM_benchmarks(d, points, device_counts, repeats, rng)),
+                            ("Arrhenius", lambda: Arrhenius_benchmarks(d, points[:1], temperatures, device_counts[:1],
+                                                                       repeats, rng, workers=workers)),
+                            ("Inverter", lambda: inverter_benchmarks(d, points, repeats, rng)),
+                            ("S-parameters", lambda: sparameter_benchmarks(d, frequency_points, repeats)),
+                            ("Population", lambda: population_benchmarks(population_sizes, repeats, rng))]:
+            print(f"{name} ...", flush=True)
+            results += bench()
+    return {"environment": environment(), "settings": settings, "results": results}
+
+
+# benchmark results of the same case (benchmark, format, number of points and devices) in two runs
+def result_key(r):
+    return (r["benchmark"], r["format"], r["points"], r["devices"])
+
+
+# compares the medians with a previous run; returns the rows (key, old, new, ratio, regression)
+def compare(old, new, tolerance=.25):
+    previous = {result_key(r): r for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        if (o := previous.get(result_key(r))) is None: continue
+        ratio = r["median"] / o["median"] if o["median"] > 0 else np.inf
+        rows.append((result_key(r), o["median"], r["median"], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def print_results(results):
+    print(f"{'benchmark':<29}{'format':<12}{'points':>7}{'devices':>8}{'median / s':>12}{'per device / s':>16}  ok")
+    for r in results:
+        per_device = f"{r['per_device']:.4g}" if "per_device" in r else ""
+        print(f"{r['benchmark']:<29}{r['format']:<12}{r['points']:>7}{r['devices']:>8}{r['median']:>12.4g}"
+              f"{per_device:>16}  {'yes' if r['ok'] else 'NO'}")
+
+
+def print_comparison(rows, tolerance):
+    print(f"\n{'benchmark':<29}{'format':<12}{'points':>7}{'devices':>8}{'old / s':>11}{'new / s':>11}{'new/old':>9}")
+    for (benchmark, filetype, n, count), old, new, ratio, regression in rows:
+        print(f"{benchmark:<29}{filetype:<12}{n:>7}{count:>8}{old:>11.4g}{new:>11.4g}{ratio:>9.2f}"
+              + (f"  slower than the tolerance of {100*tolerance:.0f}%" if regression else ""))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks of the transistor analysis on synthetic data.")
+    parser.add_argument("--output", default=None, help="json file for the results (default: benchmark_<date>_<time>.json)")
+    parser.add_argument("--compare", default=None, help="json file of a previous run to compare the medians with")
+    parser.add_argument("--tolerance", type=float, default=.25, help="relative slowdown counted as regression (default .25)")
+    parser.add_argument("--quick", action="store_true", help="fewer sweep lengths, devices and repeats")
+    parser.add_argument("--points", type=int, nargs="+", default=None, help="datapoints per transfer curve")
+    parser.add_argument("--devices", type=int, nargs="+", default=None, help="devices per TLM")
+    parser.add_argument("--repeats", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes of the Arrhenius analysis")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", default=None, help="keep the synthetic data files in this directory")
+    parser.add_argument("--trace", default=None, help="record the analysis stages and write them as Chrome trace to this "
+                                                      "file (the recording itself adds a little to the timings)")
+    args = parser.parse_args()
+
+    kwargs = dict(points=(121,), device_counts=(6,), temperatures=(250, 300), frequency_points=(1601,), repeats=2) \
+        if args.quick else {}
+    if args.points is not None: kwargs["points"] = tuple(args.points)
+    if args.devices is not None: kwargs["device_counts"] = tuple(args.devices)
+    if args.repeats is not None: kwargs["repeats"] = args.repeats
+
+    if args.trace is not None: tracer.enable(clear=True)
+    report = run(seed=args.seed, workers=args.workers, data_directory=args.data, **kwargs)
+    print_results(report["results"])
+    if args.trace is not None:
+        tracer.disable()
+        report["stages"] = tracer.summary("category").to_dict(orient="index")
+        print("\n" + tracer.summary("category").round(2).to_string())
+        print(f"Trace written to {tracer.write_chrome_trace(args.trace)}")
+
+    output = args.output if args.output is not None else time.strftime("benchmark_%Y%m%d_%H%M%S.json")
+    with open(output, "w") as jsonfile:
+        json.dump(report, jsonfile, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare is not None:
+        with open(args.compare, "r") as jsonfile:
+            rows = compare(json.load(jsonfile), report, tolerance=args.tolerance)
+        print_comparison(rows, args.tolerance)
+        if any(r[-1] for r in rows): sys.exit(1)
@@ -1,11 +1,25 @@
 import numpy as np
 import pandas as pd
 pd.options.mode.chained_assignment = None  # default='warn'; used to suppress SettingWithCopyWarning (df[idx] vs df.loc[:,idx])
-from scipy.optimize import curve_fit
+from scipy import optimize
+from scipy import sparse
+import scipy.sparse.linalg
 try:from analysis_function_definitions import *
 except: print("Could not import the functions module (analysis_function_definitions.py). Please place it in the same directory as GUI.py")
 
 import re
+import os
+import io
+import json
+import sqlite3
+import hashlib
+import functools
+import contextlib
+import collections
+import asyncio
+import concurrent.futures
+import threading
+import time
 from traceback import print_exc
 
 
@@ -14,23 +28,1194 @@ import warnings
 warnings.simplefilter('ignore', (UserWarning, RuntimeWarning))
 
 
+# timing of the stages of the analysis: file reading and preset detection ("io"), smoothing, fit window search, each
+# curve_fit ("fit"), TLM/Arrhenius regressions and, in the GUI, plotting. it shows whether a slow run is spent in I/O,
+# fitting or rendering. recording is off by default, a span then only costs the check of tracer.enabled. from scripts:
+#   tracer.enable()
+#   tlm = TLM_Analysis(...); tlm.contactresistance()
+#   print(tracer.summary("category"))       # calls, total and self time per stage (or per span name with "name")
+#   tracer.write_chrome_trace("trace.json")  # open in chrome://tracing or https://ui.perfetto.dev
+# spans of one thread are nested, the self time of a span is its duration without the spans inside it (e.g. the self
+# time of fit_mobility_lin is the window search, the fits themselves are curve_fit spans). analyses that run in worker
+# processes (Arrhenius with workers > 1, SparameterBiasSweep.read_files) are not recorded
+class Tracer():
+    def __init__(self, max_events=1000000):
+        self.enabled = False
+        # (name, category, thread id, start, duration, self duration, args); times in s since self.origin. only the
+        # most recent max_events are kept, e.g. when recording in watch mode for a long time
+        self.events = collections.deque(maxlen=max_events)
+        self.origin = time.perf_counter()
+        self.local = threading.local()
+
+    def enable(self, clear=False):
+        if clear: self.clear()
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+        return self
+
+    def clear(self):
+        self.events.clear()
+
+    # records everything in the with-block, e.g. "with tracer.recording(): ..."; the previous state is restored afterwards
+    @contextlib.contextmanager
+    def recording(self, clear=True):
+        enabled = self.enabled
+        self.enable(clear=clear)
+        try: yield self
+        finally: self.enabled = enabled
+
+    def span(self, name, category="analysis", **args):
+        if not self.enabled: return _no_span
+        return _Span(self, name, category, args)
+
+    # name of the innermost open span of this thread (None outside of spans)
+    def current(self):
+        stack = getattr(self.local, "stack", None)
+        return stack[-1].name if stack else None
+
+    def to_dataframe(self):
+        return pd.DataFrame(list(self.events), columns=["name", "category", "thread", "start", "duration", "self", "args"])
+
+    # calls, total and self time in ms per span name or category, sorted by self time. share is the part of the summed
+    # self times, i.e. of the recorded time
+    def summary(self, by="name"):
+        events = self.to_dataframe()
+        if len(events) == 0:
+            return pd.DataFrame(columns=["calls", "total [ms]", "self [ms]", "mean [ms]", "max [ms]", "share [%]"])
+        groups = events.groupby(by)
+        summary = pd.DataFrame({"calls": groups.size(),
+                                "total [ms]": 1e3 * groups["duration"].sum(),
+                                "self [ms]": 1e3 * groups["self"].sum(),
+                                "mean [ms]": 1e3 * groups["duration"].mean(),
+                                "max [ms]": 1e3 * groups["duration"].max()})
+        summary["share [%]"] = 100 * summary["self [ms]"] / summary["self [ms]"].sum()
+        return summary.sort_values("self [ms]", ascending=False)
+
+    # trace event format (complete events), as read by chrome://tracing and perfetto
+    def chrome_trace(self):
+        pid = os.getpid()
+        return {"traceEvents": [{"name": name, "cat": category, "ph": "X", "ts": 1e6 * start, "dur": 1e6 * duration,
+                                 "pid": pid, "tid": thread, "args": {**args, "self [ms]": 1e3 * self_}}
+                                for name, category, thread, start, duration, self_, args in list(self.events)],
+                "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, filename):
+        with open(filename, "w") as tracefile:
+            json.dump(self.chrome_trace(), tracefile, default=str)
+        return filename
+
+
+_no_span = contextlib.nullcontext()
+
+
+class _Span():
+    __slots__ = ("tracer", "name", "category", "args", "start", "children")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer, self.name, self.category, self.args = tracer, name, category, args
+        self.children = 0.
+
+    def __enter__(self):
+        stack = self.tracer.local.__dict__.setdefault("stack", [])
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        stack = self.tracer.local.stack
+        stack.pop()
+        if stack: stack[-1].children += duration
+        self.tracer.events.append((self.name, self.category, threading.get_ident(), self.start - self.tracer.origin,
+                                   duration, duration - self.children, self.args))
+        return False
+
+
+tracer = Tracer()
+
+
+# decorator version of tracer.span() for functions and methods (default name: the qualified function name)
+def traced(name=None, category="analysis"):
+    def decorator(function):
+        name_ = function.__qualname__ if name is None else name
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled: return function(*args, **kwargs)
+            with tracer.span(name_, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# every fit of the analysis goes through these, each one is a "fit" span named after the span it is called in
+# (e.g. "curve_fit [TransistorAnalysis.fit_mobility_lin]")
+def curve_fit(f, *args, **kwargs):
+    if not tracer.enabled: return optimize.curve_fit(f, *args, **kwargs)
+    with tracer.span(f"curve_fit [{tracer.current()}]", "fit"):
+        return optimize.curve_fit(f, *args, **kwargs)
+
+
+def least_squares(fun, *args, **kwargs):
+    if not tracer.enabled: return optimize.least_squares(fun, *args, **kwargs)
+    with tracer.span(f"least_squares [{tracer.current()}]", "fit"):
+        return optimize.least_squares(fun, *args, **kwargs)
+
+
+def _freeze(value):
+    # turn the (possibly mutable) fit settings into something hashable, e.g. manualFitRanges={'lin':[0,1],...}
+    if isinstance(value, dict): return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, np.ndarray)): return tuple(_freeze(v) for v in value)
+    return value
+
+
+def memoize_fit(*parameters):
+    # caches the result of an analysis method per TransistorAnalysis object. the key is built from the method arguments
+    # and the instance attributes listed in `parameters` (smoothing, fd/sd, manual fit range, region,...), so changing
+    # one of them on an existing object automatically leads to a refit, while repeated calls with unchanged settings
+    # (GUI refreshes, TLM calling fit_mobility_lin() several times) are answered from the cache.
+    # failed fits (None) are cached as well, because they are the expensive ones (all threshold combinations tried)
+    # a parameter can also be given as (attribute, key) to only depend on one entry of a dict, e.g. ('manualFitRanges','lin')
+    def lookup(obj, p):
+        if isinstance(p, tuple):
+            d = getattr(obj, p[0], None)
+            return d.get(p[1]) if isinstance(d, dict) else d
+        return getattr(obj, p, None)
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, _freeze(kwargs), tuple(_freeze(lookup(self, p)) for p in parameters))
+            cache = self.__dict__.setdefault('_fit_cache', {})
+            if key not in cache:
+                cache[key] = method(self, *args, **kwargs)
+            return cache[key]
+        return wrapper
+    return decorator
+
+
+# counters of the automatic fit window search (the loops over the derivative thresholds in fit_mobility_lin/sat and
+# subthreshold_swing), kept per method in TransistorAnalysis.fit_diagnostics. for the last run of the method:
+# iterations = threshold combinations tried (until convergence or all of them), attempts = iterations that got as far as
+# curve_fit, failures = failed iterations by reason (see fit_failure_reason), converged, time (s). runs and total_time
+# count all runs (i.e. cache misses, e.g. the refit with the common thresholds of a TLM)
+def diagnose_fit(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        store = self.__dict__.setdefault('fit_diagnostics', {})
+        previous = store.get(method.__name__, {})
+        diagnostics = {"iterations": 0, "attempts": 0, "failures": collections.Counter(), "converged": False,
+                       "time": 0., "runs": previous.get("runs", 0) + 1, "total_time": previous.get("total_time", 0.)}
+        store[method.__name__] = diagnostics
+        start = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+            diagnostics["converged"] = result is not None
+            return result
+        finally:
+            diagnostics["time"] = time.perf_counter() - start
+            diagnostics["total_time"] += diagnostics["time"]
+    return wrapper
+
+
+# short reason for a failed iteration of a fit window search or TLM regression, used as key of the failure counters
+def fit_failure_reason(exception):
+    if isinstance(exception, RuntimeError) and "Optimal parameters not found" in str(exception): return "no convergence"
+    if isinstance(exception, ValueError) and "infs or NaNs" in str(exception): return "non-finite data"
+    if isinstance(exception, optimize.OptimizeWarning): return "covariance not estimated"
+    return type(exception).__name__
+
+
+# metadata from the filenames. the naming convention is <sample>_W<width>L<length>_..., optionally followed by the drain
+# voltage (e.g. Vds-0.1), the regime (lin/sat/out), the die (e.g. die3) and, for temperature series,
+# G<gate>_T<temperature>. the patterns are compiled once here and applied to the basename only; W/L, V_DS and T are
+# taken from their last occurrence as the greedy ".*" patterns used before did. a file extension is removed first, so
+# "..._Vds-0.1.txt" gives V_DS=-0.1
+_filename_patterns = {
+    "extension": re.compile(r"\.[A-Za-z]\w*$"),
+    "name": re.compile(r"^(?P<N>[A-Za-z\d]+)[_#]?W(?P<W>[\d.]+)[_#]*L(?P<L>[\d.]+)"),
+    "WL": re.compile(r"[_#]?W(?P<W>[\d.]+)[_#]*L(?P<L>[\d.]+)"),
+    "VDS": re.compile(r"V[dsDS]+(?P<VDS>[\-+\d.]+)"),
+    "T": re.compile(r"_T(?P<T>\d+)"),
+    "G": re.compile(r"G(?P<G>\d+)_T\d+"),
+    "die": re.compile(r"(?<![A-Za-z])die[_#\-]?(?P<D>[A-Za-z]?\d+)", re.IGNORECASE),
+    "regime": re.compile(r"(?<![A-Za-z])(?P<R>lin|sat|out)(?:ear|uration|put)?(?![A-Za-z])", re.IGNORECASE),
+}
+
+# the parsed metadata are cached per filename; every call returns its own dict, so callers may change it
+def parse_filename_metadata(filename):
+    return dict(_filename_metadata(filename))
+
+
+@functools.lru_cache(maxsize=None)
+def _filename_metadata(filename):
+    basename = _filename_patterns["extension"].sub("", os.path.basename(filename))
+    meta = {"name": None, "W": None, "L": None, "VDS": None, "T": None, "G": None, "die": None, "regime": None}
+
+    def to_float(value):
+        try: return float(value)
+        except (TypeError, ValueError): return None
+
+    if (m := _filename_patterns["name"].match(basename)) is not None:
+        meta["name"] = m.group("N")
+    if (m := _filename_patterns["WL"].findall(basename)):
+        meta["W"], meta["L"] = to_float(m[-1][0]), to_float(m[-1][1])
+    if (m := _filename_patterns["VDS"].findall(basename)):
+        meta["VDS"] = to_float(m[-1])
+    if (m := _filename_patterns["T"].findall(basename)):
+        meta["T"] = to_float(m[-1])
+    if (m := _filename_patterns["G"].search(basename)) is not None:
+        meta["G"] = int(m.group("G"))
+    if (m := _filename_patterns["die"].search(basename)) is not None:
+        meta["die"] = m.group("D")
+    if (m := _filename_patterns["regime"].search(basename)) is not None:
+        meta["regime"] = m.group("R").lower()
+    return tuple(meta.items())
+
+
+# guess of the data preset of a file from its name and first line, the same criteria as in TransistorAnalysis.read_data()
+@traced("detect_preset", "io")
+def detect_preset(filename):
+    file_ext = filename.split('.')[-1]
+    try:
+        with open(filename, "r", errors="ignore") as datafile: header = datafile.readline()
+    except:
+        header = ""
+    return "SweepMe!" if "_gate" in header \
+        else "Goettingen" if "GOETT" in filename \
+        else "LabVIEW" if ("GS" in header and file_ext in ["dat", "DAT"]) \
+        else "ParameterAnalyzer" if file_ext == "TXT" \
+        else None
+
+
+# column names (per regime), skipped header rows and separator of the transfer data files of a preset. file_columns is
+# the header of the file (some presets have optional resistance columns), column_names and custom_skiprows are the
+# settings of the custom preset. unknown presets give None
+def transfer_file_format(filetype, file_columns=(), column_names=None, custom_skiprows=None):
+    c = file_columns
+    transfer_column_names, skiprows, sep = None, None, None
+    if filetype == "Custom":
+        transfer_column_names = {'lin':column_names,'sat':[i.replace('lin','sat') for i in column_names]}
+        skiprows = custom_skiprows
+        sep = "\t"
+        print("Use custom data preset on your own risk. Errors in syntax, column names etc can happen!!")
+
+    elif filetype == "SweepMe!":
+        transfer_column_names = {
+            'lin':['time_elapsed', 'timestamp', 'lin_source Voltage', 'lin_source Current', 'lin_source Resistance',
+                   'lin_drain Voltage', 'lin_drain Current', 'lin_drain Resistance',
+                   'lin_gate Voltage', 'lin_gate Current', 'lin_gate Resistance'],
+            'sat':['time_elapsed', 'timestamp', 'sat_source Voltage', 'sat_source Current', 'sat_source Resistance',
+                   'sat_drain Voltage', 'sat_drain Current', 'sat_drain Resistance',
+                   'sat_gate Voltage', 'sat_gate Current', 'sat_gate Resistance']} if any(['Resistance' in i for i in c]) else {
+            'lin': ['time_elapsed', 'timestamp', 'lin_source Voltage', 'lin_source Current', 'lin_drain Voltage',
+                    'lin_drain Current', 'lin_gate Voltage', 'lin_gate Current'],
+            'sat': ['time_elapsed', 'timestamp', 'sat_source Voltage', 'sat_source Current', 'sat_drain Voltage',
+                    'sat_drain Current', 'sat_gate Voltage', 'sat_gate Current']}
+        skiprows = 3
+        sep = "\t"
+
+    elif filetype == "Marburg":
+        transfer_column_names = {
+            'lin': ['time_elapsed', 'timestamp', 'lin_drain Voltage', 'lin_drain Current',
+                    'lin_drain Resistance', 'lin_gate Voltage', 'lin_gate Current', 'lin_gate Resistance'],
+            'sat': ['time_elapsed', 'timestamp', 'sat_drain Voltage','sat_drain Resistance',
+                    'sat_drain Current', 'sat_gate Voltage', 'sat_gate Current', 'sat_gate Resistance']} if any(['Resistance' in i for i in c]) else {
+            'lin': ['time_elapsed', 'timestamp', 'lin_drain Voltage',
+                    'lin_drain Current', 'lin_gate Voltage', 'lin_gate Current'],
+            'sat': ['time_elapsed', 'timestamp', 'sat_drain Voltage',
+                    'sat_drain Current', 'sat_gate Voltage', 'sat_gate Current']}
+        skiprows = 3
+        sep = "\t"
+
+    elif filetype == "Goettingen":
+        transfer_column_names = {
+            'lin':['lin_drain Voltage', 'lin_gate Voltage', 'lin_drain Current', 'lin_gate Current', 'time_elapsed','empty'],
+            'sat':['sat_drain Voltage', 'sat_gate Voltage', 'sat_drain Current', 'sat_gate Current', 'time_elapsed','empty']
+        }  if column_names == None else column_names
+        skiprows = 4
+        sep = "\t"
+
+    elif filetype == "LabVIEW":
+        transfer_column_names = {
+            'lin':['lin_gate Voltage', 'time', 'lin_drain Current', 'lin_gate Current', 'abs_lin_drain_current',
+                   'abs_lin_gate_current', 'sqrt_lin_drain_current', '1stderiv_lin_drain_current', '2ndderiv_lin_drain_current'],
+            'sat':['sat_gate Voltage', 'time', 'sat_drain Current', 'sat_gate Current', 'abs_sat_drain_current',
+                   'abs_sat_gate_current', 'sqrt_sat_drain_current','1stderiv_sat_drain_current', '2ndderiv_sat_drain_current']}
+        skiprows = 2
+        sep = "\t"
+
+    elif filetype == "ParameterAnalyzer":
+            transfer_column_names = {
+                'lin':['idx', 'lin_drain Voltage', 'lin_gate Voltage', 'lin_drain Current','lin_gate Current'],
+                'sat':['idx', 'sat_drain Voltage', 'sat_gate Voltage', 'sat_drain Current','sat_gate Current']}
+            skiprows = 5
+            sep="\t"
+
+    elif filetype == "Surrey":
+        transfer_column_names = {
+            'lin': ['rep','point','lin_drain Voltage','lin_drain Current','tdrain','lin_gate Voltage','lin_gate Current','tgate'],
+            'sat': ['rep','point','sat_drain Voltage','sat_drain Current','tdrain','sat_gate Voltage','sat_gate Current','tgate']}
+        skiprows = 1
+        sep = ','
+    return transfer_column_names, skiprows, sep
+
+
+# index of the filename metadata (see parse_filename_metadata) of all data files in a directory. it is stored as json in
+# the directory itself and refresh() only parses files that are new or whose modification time or size changed, so a
+# directory with thousands of measurements is scanned once. selecting files for an analysis is then a query:
+#   index = FileIndex(directory)
+#   tlm_files = index.query(name="S12", W=100, regime="lin")
+#   series = index.temperature_series(name="S12", W=100)   # {T: [files]} for Arrhenius
+class FileIndex():
+    index_filename = ".transistor_analysis_index.json"
+    index_version = 2  # increased when the metadata changes, older index files are built again
+    transfer_extensions = (".txt", ".dat", ".csv")
+    data_extensions = transfer_extensions + (".s2p", ".xlsx")
+
+    def __init__(self, directory, recursive=False, persistent=True):
+        self.directory = os.path.abspath(directory)
+        self.recursive = recursive
+        self.persistent = persistent
+        self.index_file = os.path.join(self.directory, self.index_filename)
+        self.entries = {}   # path: {"mtime": ns, "size": bytes, **metadata}
+
+        if self.persistent and os.path.isfile(self.index_file):
+            try:
+                with open(self.index_file, "r") as file_:
+                    index_ = json.load(file_)
+                if index_.get("version", 1) == self.index_version: self.entries = index_["entries"]
+            except:
+                print(f"Index file {self.index_file} could not be read, the directory is indexed again.")
+                self.entries = {}
+        self.refresh()
+
+    def scan(self):
+        for root, dirs, files in os.walk(self.directory):
+            for file_ in files:
+                if file_.lower().endswith(self.data_extensions): yield os.path.join(root, file_)
+            if not self.recursive: break
+
+    # returns the number of new, updated and removed files
+    def refresh(self):
+        n_new, n_updated, found = 0, 0, set()
+        for path in self.scan():
+            try: stat = os.stat(path)
+            except OSError: continue
+            found.add(path)
+            entry = self.entries.get(path)
+            if entry is not None and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size: continue
+            if entry is None: n_new += 1
+            else: n_updated += 1
+            self.entries[path] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, **parse_filename_metadata(path),
+                                  "preset": detect_preset(path)}
+        removed = [path for path in self.entries if path not in found]
+        for path in removed: del self.entries[path]
+
+        if self.persistent and (n_new or n_updated or removed or not os.path.isfile(self.index_file)): self.save()
+        return n_new, n_updated, len(removed)
+
+    def save(self):
+        try:
+            with open(self.index_file, "w") as file_:
+                json.dump({"directory": self.directory, "version": self.index_version, "entries": self.entries}, file_)
+        except:
+            print(f"Index could not be saved in {self.directory}, it is only kept in memory.")
+
+    # criteria are metadata keys (name, W, L, VDS, T, G, die, regime, preset) with a single value, a list/tuple/set of
+    # accepted values or a function returning True/False, e.g. query(L=[10, 20], T=lambda t: t > 250)
+    def query(self, **criteria):
+        def accepts(value, criterion):
+            if callable(criterion): return value is not None and criterion(value)
+            if isinstance(criterion, (list, tuple, set)): return value in criterion
+            return value == criterion
+        return sorted(path for path, entry in self.entries.items()
+                      if all(accepts(entry.get(key), criterion) for key, criterion in criteria.items()))
+
+    def temperature_series(self, **criteria):
+        series = {}
+        for path in self.query(T=lambda t: True, **criteria):
+            series.setdefault(self.entries[path]["T"], []).append(path)
+        return dict(sorted(series.items()))
+
+    def to_dataframe(self):
+        return pd.DataFrame.from_dict(self.entries, orient="index").rename_axis("path")
+
+
+# whether a file can be a device of a TLM: transfer data (no S-parameters, spreadsheets etc.) of the linear regime with
+# the channel length in the filename. saturation files of the same devices are not used for the TLM
+def is_TLM_file(filename):
+    meta = parse_filename_metadata(filename)
+    return filename.lower().endswith(FileIndex.transfer_extensions) and meta["regime"] == "lin" and meta["L"] is not None
+
+
+# all transfer sweeps of a sample or lot in one binary file, so that the data files don't have to be parsed again when a
+# sample is analyzed again. the file is: magic, length of the header, header (json: one entry per sweep with the
+# metadata of its filename, preset, origin (path, modification time, size), number of datapoints and position of its
+# data), then the data of all sweeps as one contiguous float64 block, per sweep its columns Vg, Id, Ig, Vd (as far as
+# the data file has them) one after the other, as measured (without the sign of the carrier type). the data block is
+# memory mapped, so opening an archive only reads the header, and a sweep is a view into the mapped file (a few µs,
+# nothing is read from disk before it is used):
+#   archive = SweepArchive.convert("S12.tsa", files)       # again later: only new or changed files are parsed
+#   archive = SweepArchive("S12.tsa")
+#   tlm = TLM_Analysis(C_ox, filenames=archive.query(name="S12", regime="lin"), archive=archive)
+#   t = TransistorAnalysis(W, L, C_ox, filenames={"lin": ..., "sat": ...}, archive=archive)
+# files are found by their original (absolute) path. with match_names=True (e.g. the archive of a lot used on another
+# computer) also by their name, as long as only one archived file has that name. a file that exists with another
+# modification time or size than when it was archived (measured again) is not taken from the archive but read from
+# disk, convert() the files again to update the archive
+class SweepArchive():
+    magic = b"TASWEEP1"
+    version = 1
+    columns = ("Vg", "Id", "Ig", "Vd")
+    alignment = 64  # bytes, start of the data block
+
+    def __init__(self, path, match_names=False):
+        self.path = os.path.abspath(path)
+        self.match_names = match_names
+        with open(self.path, "rb") as file_:
+            if file_.read(len(self.magic)) != self.magic: raise ValueError(f"{path} is not a sweep archive.")
+            header_length = int(np.frombuffer(file_.read(8), dtype="<u8")[0])
+            self.header = json.loads(file_.read(header_length).decode())
+        if self.header.get("version") != self.version:
+            raise ValueError(f"{path} was written by an incompatible version ({self.header.get('version')}).")
+        self.entries = {entry["file"]: entry for entry in self.header["entries"]}
+        self.names = {}  # name: archived files of that name
+        for file_ in self.entries: self.names.setdefault(os.path.basename(file_), []).append(file_)
+        n = self.header["values"]
+        self.data = np.memmap(self.path, dtype="<f8", mode="r", offset=self.data_offset(header_length), shape=(n,)) \
+            if n else np.empty(0)
+
+    @classmethod
+    def data_offset(cls, header_length):
+        return -(-(len(cls.magic) + 8 + header_length) // cls.alignment) * cls.alignment
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __contains__(self, filename):
+        return self.entry(filename) is not None
+
+    # the mapping is closed once no sweep uses it anymore
+    def close(self):
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # only the path is pickled (e.g. for the worker processes of Arrhenius), the archive is mapped again there
+    def __getstate__(self):
+        return {"path": self.path, "match_names": self.match_names}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state.get("match_names", False))
+
+    # same criteria as FileIndex, on the metadata of the archived files
+    query = FileIndex.query
+    temperature_series = FileIndex.temperature_series
+
+    # the archived entry of a data file, None if it is not archived or has changed on disk since
+    def entry(self, filename):
+        if filename is None: return None
+        entry = self.entries.get(os.path.abspath(filename))
+        if entry is None and self.match_names and len(files_ := self.names.get(os.path.basename(filename), [])) == 1:
+            entry = self.entries[files_[0]]
+        if entry is None: return None
+        try: stat = os.stat(filename)
+        except OSError: return entry  # not on disk (anymore), the archive is all there is
+        return entry if (stat.st_mtime_ns, stat.st_size) == (entry["mtime"], entry["size"]) else None
+
+    # Vg, Id, Ig, Vd of a file as read-only views of the mapped data (None for the columns the data file did not have)
+    def arrays(self, filename):
+        entry = self.entry(filename)
+        if entry is None: raise KeyError(f"{filename} is not in the archive {self.path} or has changed since.")
+        return self.entry_arrays(entry)
+
+    def entry_arrays(self, entry):
+        n, start, arrays = entry["points"], entry["offset"], []
+        for present in entry["columns"]:
+            arrays.append(self.data[start:start + n] if present else None)
+            start += n if present else 0
+        return arrays
+
+    # TransferSweep of a file with the currents multiplied by factor (the sign of the carrier type), as
+    # TransistorAnalysis.read_sweep does it for the data files
+    def sweep(self, filename, factor=1, dtype=np.float64):
+        Vg, Id, Ig, Vd = self.arrays(filename)
+        return TransferSweep(Vg, factor * Id + 1e-15, None if Ig is None else factor * Ig, Vd, dtype=dtype)
+
+    # one row per file: metadata of the filename, preset, number of datapoints, modification time and size of the file
+    def metadata(self):
+        rows = [{key: value for key, value in entry.items() if key not in ("offset", "columns")}
+                for entry in self.entries.values()]
+        return pd.DataFrame(rows).set_index("file") if rows else pd.DataFrame()
+
+    # preset and the columns Vg, Id, Ig, Vd (None if missing) of a transfer data file, as measured
+    @staticmethod
+    def read_file(filename, filetype=None, column_settings={"names": None, "skiprows": None}):
+        if filetype is None: filetype = detect_preset(filename)
+        column_names = i.split(";") if ((i := column_settings["names"]) is not None) else None
+        names, skiprows, sep = transfer_file_format(filetype, pd.read_table(filename, nrows=5).columns, column_names,
+                                                    column_settings["skiprows"])
+        if names is None: raise ValueError(f"Data preset of {os.path.basename(filename)} unknown.")
+        data = pd.read_table(filename, skiprows=skiprows, names=names['lin'], header=None, index_col=None, sep=sep)
+        column = lambda name: data[f'lin_{name}'].to_numpy(dtype=float) if f'lin_{name}' in data.columns else None
+        if column('gate Voltage') is None or column('drain Current') is None:
+            raise ValueError(f"No gate voltage or drain current in {os.path.basename(filename)}.")
+        return filetype, [column('gate Voltage'), column('drain Current'), column('gate Current'), column('drain Voltage')]
+
+    # writes the archive of the data files (transfer sweeps, the preset is detected for each file unless filetype is
+    # given) and returns it opened. with update, the sweeps of an existing archive at path are kept: files that are not
+    # given again, that have not changed (same modification time and size) or that don't exist anymore are copied from
+    # it, only new or re-measured files are parsed. files that can't be read are left out and reported.
+    # progress_callback(filename, n_done, n_total) is called after each given file
+    @classmethod
+    @traced(category="io")
+    def convert(cls, path, filenames, filetype=None, column_settings={"names": None, "skiprows": None}, update=True,
+                progress_callback=None):
+        path = os.path.abspath(path)
+        old = None
+        if update and os.path.isfile(path):
+            try: old = cls(path)
+            except:
+                print_exc()
+                print(f"{path} can't be updated, it is written again.")
+
+        entries, blocks, offset = {}, {}, 0
+
+        def add(entry, arrays):
+            nonlocal offset
+            entry = {**entry, "offset": offset, "columns": [a is not None for a in arrays]}
+            entries[entry["file"]] = entry
+            blocks[entry["file"]] = [a for a in arrays if a is not None]
+            offset += entry["points"] * len(blocks[entry["file"]])
+
+        filenames = [os.path.abspath(f_) for f_ in filenames]
+        if old is not None:
+            for file_, entry in old.entries.items():
+                if file_ in filenames and os.path.isfile(file_):
+                    stat = os.stat(file_)
+                    if (stat.st_mtime_ns, stat.st_size) != (entry["mtime"], entry["size"]): continue
+                add(entry, old.entry_arrays(entry))
+
+        for k, file_ in enumerate(filenames):
+            if file_ not in entries:
+                try:
+                    stat = os.stat(file_)
+                    preset, arrays = cls.read_file(file_, filetype, column_settings)
+                    add({"file": file_, **parse_filename_metadata(file_), "preset": preset, "mtime": stat.st_mtime_ns,
+                         "size": stat.st_size, "points": len(arrays[0])}, arrays)
+                except Exception as e:
+                    print(f"{os.path.basename(file_)} could not be archived: {e}")
+            if progress_callback is not None:
+                try: progress_callback(file_, k + 1, len(filenames))
+                except: print_exc()
+
+        header = json.dumps({"version": cls.version, "columns": cls.columns, "values": offset,
+                             "entries": list(entries.values())}).encode()
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file_:
+            file_.write(cls.magic)
+            file_.write(np.array([len(header)], dtype="<u8").tobytes())
+            file_.write(header)
+            file_.write(b"\0" * (cls.data_offset(len(header)) - file_.tell()))
+            file_.writelines(np.ascontiguousarray(a, dtype="<f8").tobytes() for block in blocks.values() for a in block)
+        # the old mapping has to be closed (no views of it left) before the file can be replaced on Windows
+        blocks = None
+        if old is not None: old.close()
+        os.replace(temporary, path)
+        return cls(path)
+
+
+# reads data files ahead of the analysis, for data on a network or cloud synced share where the latency of every file
+# dominates the start-up of a TLM or Arrhenius analysis. all files are fetched concurrently, at most `parallel` at a
+# time and in the given order, by an asyncio event loop in a background thread. the analysis takes the content of a
+# file as soon as it has arrived (source() waits for it if necessary), so the files that are there are parsed and
+# fitted while the others are still being read:
+#   prefetch = FilePrefetcher(files, parallel=8)
+#   t = TransistorAnalysis(W, L, C_ox, filenames={"lin": files[0], "sat": None}, prefetch=prefetch)
+#   tlm = TLM_Analysis(C_ox, filenames=files, prefetch=8)   # prefetches its own files
+# as_completed() gives the filenames in the order they arrive. a file that could not be read raises its error when it
+# is used, files that are not (or no longer, see release()) in the prefetcher are read from disk as usual
+class FilePrefetcher():
+    def __init__(self, filenames, parallel=8):
+        self.filenames = list(dict.fromkeys(f_ for f_ in filenames if f_ is not None))
+        self.parallel = max(1, int(parallel))
+        self.pending = set(self.filenames)  # files whose content is (or will be) held here
+        self.contents = {}  # filename: content of the file (bytes), or the exception raised when reading it
+        self.arrived = []   # filenames in the order they have been read
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=asyncio.run, args=(self.fetch_all(),), daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def read_bytes(filename):
+        with open(filename, "rb") as file_:
+            return file_.read()
+
+    # a file is handed to the thread pool only once one of the `parallel` slots is free, so the files that are still
+    # waiting for a slot when close() is called are not read at all
+    async def fetch(self, loop, pool, semaphore, filename):
+        async with semaphore:
+            if self._closed: content = None
+            else:
+                try: content = await loop.run_in_executor(pool, self.read_bytes, filename)
+                except Exception as e: content = e
+        with self._condition:
+            if filename in self.pending: self.contents[filename] = content
+            self.arrived.append(filename)
+            self._condition.notify_all()
+
+    async def fetch_all(self):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.parallel)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel) as pool:
+            await asyncio.gather(*(self.fetch(loop, pool, semaphore, f_) for f_ in self.filenames))
+
+    # waits until the file has been read and returns its content, None for files that are not prefetched
+    def content(self, filename, timeout=None):
+        with self._condition:
+            if filename not in self.pending: return None
+            if not self._condition.wait_for(lambda: filename in self.contents, timeout):
+                raise TimeoutError(f"{filename} has not been read within {timeout} s.")
+            content = self.contents[filename]
+        if isinstance(content, Exception): raise content
+        return content
+
+    # what pandas reads the file from: its content if it is prefetched, otherwise the filename itself
+    def source(self, filename, timeout=None):
+        content = self.content(filename, timeout)
+        return filename if content is None else io.BytesIO(content)
+
+    # drops the content of a file once it has been analyzed (or if it changes and has to be read again)
+    def release(self, filename):
+        with self._condition:
+            self.pending.discard(filename)
+            self.contents.pop(filename, None)
+
+    def as_completed(self, timeout=None):
+        for i in range(len(self.filenames)):
+            with self._condition:
+                if not self._condition.wait_for(lambda: len(self.arrived) > i, timeout):
+                    raise TimeoutError(f"No file has been read within {timeout} s.")
+                filename = self.arrived[i]
+            yield filename
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    # files that are not being read yet are not read anymore (the ones in progress are finished and dropped)
+    def close(self):
+        self._closed = True
+        with self._condition:
+            self.pending.clear()
+            self.contents.clear()
+
+
+# watches a directory for measurement files that are being written, e.g. by the probe station during a measurement
+# series. a file counts as complete once its size and modification time have not changed for settle_time seconds
+# (files are written line by line, so a file that is still growing is not handed over half-written). files that
+# change again afterwards (re-measured) are reported again. poll() does one check and can be called from a GUI timer,
+# start()/stop() run it in a background thread. callback(filenames) gets the list of newly completed files
+class DirectoryWatcher():
+    def __init__(self, directory, callback=None, settle_time=2., extensions=FileIndex.data_extensions, recursive=False,
+                 include_existing=True):
+        self.directory = directory
+        self.callback = callback
+        self.settle_time = settle_time
+        self.extensions = tuple(extensions)
+        self.recursive = recursive
+        self.pending = {}    # path: ((mtime, size), time when this state was first seen)
+        self.completed = {}  # path: (mtime, size) when it was reported
+        self._thread, self._stop = None, threading.Event()
+        if not include_existing:
+            for path, state in self.scan(): self.completed[path] = state
+
+    def scan(self):
+        for root, dirs, files in os.walk(self.directory):
+            for file_ in files:
+                if not file_.lower().endswith(self.extensions): continue
+                path = os.path.join(root, file_)
+                try: stat = os.stat(path)
+                except OSError: continue  # e.g. deleted in the meantime
+                yield path, (stat.st_mtime_ns, stat.st_size)
+            if not self.recursive: break
+
+    def poll(self, now=None):
+        now = time.monotonic() if now is None else now
+        ready = []
+        for path, state in self.scan():
+            if self.completed.get(path) == state: continue
+            previous = self.pending.get(path)
+            if previous is None or previous[0] != state:
+                self.pending[path] = (state, now)
+            elif now - previous[1] >= self.settle_time and state[1] > 0:
+                del self.pending[path]
+                self.completed[path] = state
+                ready.append(path)
+
+        ready.sort()
+        if ready and self.callback is not None:
+            try: self.callback(ready)
+            except: print_exc()
+        return ready
+
+    def start(self, interval=1.):
+        if self._thread is not None and self._thread.is_alive(): return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval): self.poll()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None: self._thread.join()
+        self._thread = None
+
+
+# short hash of the settings of an analysis (any json-serializable dict, other values are converted to strings), used to
+# tell results of the same files with different settings apart
+def settings_hash(settings):
+    return hashlib.sha1(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+# results of all analyses in one local sqlite database, one row per value ("long" format). every row carries sample,
+# die, W, L, T and V_DS of the measurement (from the filename, see parse_filename_metadata, or given to add()) and the
+# hash of the analysis settings; adding the same files with the same settings again replaces the old rows. values are
+# stored in the units the analysis classes return them. the indexes cover the typical queries, e.g. one quantity of a
+# sample across L or one quantity across all samples, so they take milliseconds also for millions of rows:
+#   store = ResultsStore("D:/results.sqlite")
+#   store.add(TransistorAnalysis(...))                    # or TLM_Analysis, InverterAnalysis, SparameterAnalysis(BiasSweep)
+#   store.query("vth_lin", sample="S12", direction="fwd")  # DataFrame
+#   store.query("RcW", x=None, T=slice(250, None))         # x is the overdrive voltage/V_GS of curve-type results
+#   store.trend("RcW", by="sample")
+class ResultsStore():
+    columns = ("run", "analysis", "quantity", "direction", "value", "error", "x", "sample", "die", "W", "L", "T", "VDS",
+               "settings_hash", "source", "created")
+    metadata_keys = ("sample", "die", "W", "L", "T", "VDS")
+
+    def __init__(self, path="transistor_analysis_results.sqlite"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY, run TEXT NOT NULL,
+                analysis TEXT NOT NULL, quantity TEXT NOT NULL, direction TEXT, value REAL, error REAL, x REAL,
+                sample TEXT, die TEXT, W REAL, L REAL, T REAL, VDS REAL, settings_hash TEXT, source TEXT, created REAL)""")
+            for name, columns in {"sample": "sample, quantity, L", "quantity": "quantity, sample, die",
+                                  "WL": "W, L", "T": "T", "settings": "settings_hash", "run": "run"}.items():
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS results_{name} ON results ({columns})")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # writes all results of an analysis object. results can be given if they were already calculated (e.g. the tuple
+    # of contactresistance() or the dict of calculate_fT()), metadata (sample, die, W, L, T, VDS) overrides the values
+    # read from the filenames. returns the number of rows written
+    def add(self, analysis, results=None, **metadata):
+        if isinstance(analysis, TLM_Analysis): kind, (rows, files, settings) = "TLM", self.TLM_rows(analysis, results)
+        elif isinstance(analysis, TransistorAnalysis): kind, (rows, files, settings) = "transfer", self.transistor_rows(analysis)
+        elif isinstance(analysis, InverterAnalysis): kind, (rows, files, settings) = "inverter", self.inverter_rows(analysis, results)
+        elif isinstance(analysis, SparameterBiasSweep): kind, (rows, files, settings) = "sparameter", self.bias_sweep_rows(analysis, results)
+        elif isinstance(analysis, SparameterAnalysis): kind, (rows, files, settings) = "sparameter", self.sparameter_rows(analysis, results)
+        else: raise TypeError(f"Results of {type(analysis).__name__} can't be stored.")
+
+        hash_ = settings_hash(settings)
+        run = settings_hash({"analysis": kind, "files": sorted(files), "settings": hash_})
+        created = time.time()
+        records = []
+        for row in rows:
+            meta = self.row_metadata(row, **metadata)
+            values = {"run": run, "analysis": kind, "direction": None, "error": None, "x": None, "settings_hash": hash_,
+                      "created": created, **meta, **row}
+            records.append(tuple(float(v) if isinstance(v, (np.floating, np.integer)) else v
+                                 for v in (values.get(column) for column in self.columns)))
+
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM results WHERE run = ?", (run,))
+            self.connection.executemany(f"INSERT INTO results ({', '.join(self.columns)}) "
+                                        f"VALUES ({', '.join('?' * len(self.columns))})", records)
+        return len(records)
+
+    # criteria are columns with a single value, a list/tuple/set of accepted values, None (not set) or a slice for a
+    # range (ends included, None for open), e.g. query("vth_lin", sample=["S12", "S13"], L=slice(10, 40))
+    def query(self, quantity=None, order_by=("sample", "die", "L", "x"), **criteria):
+        where, parameters = self.where(quantity, **criteria)
+        statement = "SELECT * FROM results" + where
+        if order_by: statement += " ORDER BY " + ", ".join(c for c in order_by if c in self.columns)
+        return self.sql(statement, parameters)
+
+    # statistics of one quantity per sample (or die, L, ...) in the order the groups were measured/analyzed. the
+    # aggregation runs in the database, so only one row per group is read. the standard deviation is computed from the
+    # deviations of the group mean (window function), not as sum(x²) - n·mean², which cancels for values with a small
+    # spread compared to their magnitude (e.g. resistances of 1e6 Ω)
+    def trend(self, quantity, by="sample", **criteria):
+        if by not in self.columns: raise KeyError(f"Unknown column {by}.")
+        where, parameters = self.where(quantity, **criteria)
+        data = self.sql(f"SELECT {by}, COUNT(value) AS n, AVG(value) AS mean, SUM(deviation*deviation) AS sum_sq, "
+                        f"MIN(value) AS min, MAX(value) AS max, MIN(created) AS first, MAX(created) AS last "
+                        f"FROM (SELECT {by}, value, created, value - AVG(value) OVER (PARTITION BY {by}) AS deviation "
+                        f"FROM results{where}) GROUP BY {by} ORDER BY first", parameters)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            data.insert(3, "std", np.sqrt(data.sum_sq / (data.n - 1)))
+        return data.drop(columns="sum_sq").set_index(by)
+
+    def where(self, quantity=None, **criteria):
+        if quantity is not None: criteria["quantity"] = quantity
+        conditions, parameters = [], []
+        for column, criterion in criteria.items():
+            if column not in self.columns: raise KeyError(f"Unknown column {column}.")
+            if criterion is None:
+                conditions.append(f"{column} IS NULL")
+            elif isinstance(criterion, slice):
+                if criterion.start is not None: conditions.append(f"{column} >= ?"); parameters.append(criterion.start)
+                if criterion.stop is not None: conditions.append(f"{column} <= ?"); parameters.append(criterion.stop)
+            elif isinstance(criterion, (list, tuple, set)):
+                conditions.append(f"{column} IN ({', '.join('?' * len(criterion))})"); parameters.extend(criterion)
+            else:
+                conditions.append(f"{column} = ?"); parameters.append(criterion)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), parameters
+
+    def sql(self, statement, parameters=()):
+        with self.lock:
+            return pd.read_sql_query(statement, self.connection, params=list(parameters))
+
+    # sample, die, W, L, T and VDS of a result row: read from the filename (source), values of the row and the given
+    # metadata override it
+    @classmethod
+    def row_metadata(cls, row, **metadata):
+        meta = {key: value for key, value in parse_filename_metadata(row["source"]).items()} if row.get("source") else {}
+        meta["sample"] = meta.pop("name", None)
+        meta.update({key: value for key, value in row.items() if key in cls.metadata_keys})
+        meta.update(metadata)
+        return {key: meta.get(key) for key in cls.metadata_keys}
+
+    # rows of the single analyses: (list of rows, files, settings). a row has quantity, value and source (file) and
+    # optionally direction, error, x and metadata
+    @staticmethod
+    def transistor_rows(t):
+        rows = []
+        files = [f_ for f_ in t.filenames.values() if f_ is not None]
+        for regime, fit in (("lin", t.fit_mobility_lin), ("sat", t.fit_mobility_sat)):
+            if t.filenames.get(regime) is None: continue
+            try: fit_ = fit()
+            except: fit_ = None
+            if fit_ is None: continue
+            popts, reliability, errors = fit_[0], fit_[4], fit_[5]
+            for direction in ("fwd", "back", "mean"):
+                rows.append({"quantity": "mu_"+regime, "direction": direction, "value": popts[direction][0],
+                             "error": errors[direction][0], "source": t.filenames[regime]})
+                rows.append({"quantity": "vth_"+regime, "direction": direction, "value": popts[direction][1],
+                             "error": errors[direction][1], "source": t.filenames[regime]})
+                rows.append({"quantity": "reliability_"+regime, "direction": direction, "value": reliability[direction],
+                             "source": t.filenames[regime]})
+        try:
+            ssw = t.subthreshold_swing()
+            for k, direction in enumerate(("fwd", "back", "mean")):
+                rows.append({"quantity": "ssw_"+t.ss_region, "direction": direction, "value": -1000 / ssw[0][direction][0],
+                             "error": 1000 * ssw[3][k] / ssw[0][direction][0]**2, "source": t.filenames[t.ss_region]})
+        except: pass
+        try:
+            oor = t.on_off_ratio()
+            for k, direction in enumerate(("fwd", "back", "mean")):
+                rows.append({"quantity": "oor_"+t.oor_region, "direction": direction, "value": oor[k],
+                             "source": t.filenames[t.oor_region]})
+        except: pass
+        for row in rows:
+            row.update(W=t.channel_width*1e6, L=t.channel_length*1e6)
+            if row["source"] == t.filenames.get("lin"): row["VDS"] = t.linear_source_drain_voltage
+        settings = {"C_ox": t.capacitance_oxide, "fd": t.first_deriv_limit, "sd": t.second_deriv_limit,
+                    "smoothing": t.smoothing, "V_DS": t.linear_source_drain_voltage, "manualFitRanges": t.manualFitRanges,
+                    "ss_region": t.ss_region, "oor_region": t.oor_region, "oor_avg": t.oor_avg_window,
+                    "carrier_type": t.carrier_type, "filetype": t.filetype}
+        return rows, files, settings
+
+    # TLM: contact resistance, mobility and sheet resistance at every overdrive voltage (x), RcW averaged over the
+    # rcw_window highest overdrive voltages, Rc0W, L0, intrinsic mobility and L1/2 and Vth/SSw of every device
+    @staticmethod
+    def TLM_rows(tlm, results=None, rcw_window=5):
+        if results is None: results = tlm.contactresistance()
+        o, r, err, bestfitdata, allRWs, l_0, Rc0W, mu0, mu0err, rs_sheet, rs_sheet_err, all_Vths, all_SSws = results
+        source = sorted(tlm.devices)[0] if tlm.devices else None
+        rows = []
+        for quantity, values, errors in (("RcW", r, err), ("mu0", mu0, mu0err), ("Rsh", rs_sheet, rs_sheet_err)):
+            rows += [{"quantity": quantity, "x": x_, "value": v_, "error": e_, "source": source}
+                     for x_, v_, e_ in zip(o, values, errors)]
+        highest = np.argsort(tlm.factor * np.asarray(o))[::-1][:rcw_window]
+        rows.append({"quantity": "RcW", "value": np.nanmean(np.asarray(r)[highest]) if len(highest) else np.nan,
+                     "error": np.nanmean(np.asarray(err)[highest]) if len(highest) else np.nan, "source": source})
+        rows += [{"quantity": "Rc0W", "value": Rc0W, "source": source}, {"quantity": "L0", "value": l_0, "source": source}]
+        try:
+            l_1_2, mu0_intrinsic, ls, ms, l_1_2_err, mu0_err = tlm.intr_mob()
+            rows += [{"quantity": "mu0_intrinsic", "value": mu0_intrinsic, "error": mu0_err, "source": source},
+                     {"quantity": "L12", "value": l_1_2, "error": l_1_2_err, "source": source}]
+        except: pass
+        for filename, (l, t_) in tlm.devices.items():
+            if t_.Vth is None: continue
+            device = {"direction": tlm.fitRestriction, "source": filename, "W": t_.channel_width*1e6, "L": l,
+                      "VDS": tlm.VDS}
+            rows += [{"quantity": "vth_lin", "value": t_.Vth, **device}, {"quantity": "ssw_lin", "value": t_.SSw, **device}]
+        for row in rows:
+            if "L" not in row: row.update(L=None, VDS=tlm.VDS)
+        settings = {"C_ox": tlm.capacitance_oxide, "fd": tlm.first_deriv_limit, "sd": tlm.second_deriv_limit,
+                    "smoothing": tlm.smoothing, "V_DS": tlm.VDS, "manualFitRanges": tlm.manualFitRanges,
+                    "fitRestriction": tlm.fitRestriction, "carrier_type": tlm.carrier_type, "filetype": tlm.filetype,
+                    "L_correct": tlm.L_correct is not None, "rcw_window": rcw_window}
+        # only if not the default, so the least squares results keep the hash they were stored with before
+        if tlm.regression != "ols" or tlm.reject_outliers:
+            settings.update(regression=tlm.regression, reject_outliers=tlm.reject_outliers)
+        return rows, list(tlm.devices), settings
+
+    @staticmethod
+    def inverter_rows(inverter, results=None):
+        if results is None: results = inverter.get_characteristics()
+        rows = [{"quantity": "V_DD", "value": inverter.supply_voltage}]
+        if results:
+            for direction, key in (("fwd", "fwd"), ("back", "bwd")):
+                rows += [{"quantity": "max_gain", "direction": direction, "value": results["max_gain"][key]},
+                         {"quantity": "trip_point", "direction": direction, "value": results["trip_point"][key][0]},
+                         {"quantity": "nm_eff", "direction": direction, "value": results["nm_eff_"+key][0]},
+                         {"quantity": "nm_eff_perc", "direction": direction, "value": results["nm_eff_"+key][1]}]
+        for row in rows: row.update(source=inverter.filename, W=None, L=None, VDS=None)
+        settings = {"smoothing": inverter.smoothing, "V_DD": inverter.supply_voltage, "carrier_type": inverter.carrier_type,
+                    "manualFitRange": inverter.manualFitRange, "filetype": inverter.filetype}
+        return rows, [inverter.filename], settings
+
+    @staticmethod
+    def sparameter_rows(s, results=None):
+        if results is None: results = s.calculate_fT()
+        rows = []
+        if results:
+            rows += [{"quantity": "fT", "value": results["fT"], "error": results["errors"]["fT"]},
+                     {"quantity": "fT_slope", "value": results["fitslope"], "error": results["errors"]["slope"]}]
+        for row in rows: row.update(source=s.filename, W=s.channel_width*1e6, L=s.channel_length*1e6,
+                                    VDS=s.linear_source_drain_voltage)
+        settings = {"fTbounds": s.fTbounds, "fTfit": s.fTfit_bool, "C_ox": s.capacitance_oxide}
+        return rows, [s.filename], settings
+
+    # one row per bias point with V_GS as x
+    @staticmethod
+    def bias_sweep_rows(sweep, results=None):
+        if results is None: results = sweep.calculate_fT_fmax()
+        rows = []
+        for quantity in ("fT", "fmax"):
+            if quantity not in results: continue
+            for k, filename in enumerate(sweep.filenames):
+                rows.append({"quantity": quantity, "value": results[quantity][k], "error": results["errors_"+quantity][quantity][k],
+                             "x": sweep.VGS[k], "VDS": sweep.VDS[k], "source": filename})
+        settings = {"fTbounds": sweep.fTbounds, "fmaxbounds": sweep.fmaxbounds}
+        return rows, list(sweep.filenames), settings
+
+
+# device-to-device variability of many analysed devices. the table has one row per device with its metadata (sample,
+# die, W, L, T, VDS, source) and one column per result of one sweep direction (mu_lin, vth_lin, reliability_lin, mu_sat,
+# ..., ssw_lin, oor_sat). the statistics run on the whole table at once, grouped (by) e.g. per sample, W/L and
+# temperature, so the summary of some thousand devices takes milliseconds. outliers are flagged with the modified
+# z-score 0.6745*|x - median|/MAD of their group (Iglewicz & Hoaglin, outlier for z > 3.5):
+#   population = DevicePopulation.from_devices(devices)   # TransistorAnalysis objects, or from_TLM(), from_store()
+#   population.summary(by=("sample", "L"))                # n, mean, std, median, MAD, trimmed mean, percentiles, ...
+#   population.outliers()                                 # boolean table, one column per quantity and "any"
+#   population.correlations(by="sample", method="spearman")
+class DevicePopulation():
+    by = ("sample", "W", "L", "T")
+
+    def __init__(self, table, by=None):
+        self.table = table.reset_index(drop=True)
+        for key in ("source",) + ResultsStore.metadata_keys:
+            if key not in self.table: self.table[key] = None
+        for key in ("W", "L", "T", "VDS"):
+            self.table[key] = pd.to_numeric(self.table[key], errors="coerce")
+        if by is not None: self.by = (by,) if isinstance(by, str) else tuple(by)
+        self.quantities = [c for c in self.table.columns if c not in ("source",) + ResultsStore.metadata_keys
+                           and pd.api.types.is_numeric_dtype(self.table[c])]
+
+    def __len__(self):
+        return len(self.table)
+
+    # the results are the ones stored by ResultsStore.add (same quantities and names), metadata from the filenames
+    @classmethod
+    def from_devices(cls, devices, direction="mean", by=None):
+        records = []
+        for t in devices:
+            rows, files, settings = ResultsStore.transistor_rows(t)
+            if not rows: continue
+            record = {"source": files[0] if files else None, **ResultsStore.row_metadata(rows[0])}
+            record.update({row["quantity"]: row["value"] for row in rows if row["direction"] == direction})
+            records.append(record)
+        return cls(pd.DataFrame.from_records(records), by=by)
+
+    # all devices of one or more TLMs (e.g. of every temperature of an Arrhenius analysis), in the sweep direction of
+    # the TLM if none is given
+    @classmethod
+    def from_TLM(cls, *tlms, direction=None, by=None):
+        tables = [cls.from_devices([t for l, t in tlm.devices.values()], direction=direction or tlm.fitRestriction).table
+                  for tlm in tlms]
+        return cls(pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(), by=by)
+
+    # devices of a ResultsStore, criteria as in ResultsStore.query. lin and sat results of a transfer analysis are one
+    # device, the devices of a TLM are told apart by their file
+    @classmethod
+    def from_store(cls, store, direction="mean", by=None, **criteria):
+        data = store.query(direction=direction, x=None, order_by=("created",), **criteria)
+        device = data.run.where(data.analysis == "transfer", data.run + data.source.fillna(""))
+        values = data.pivot_table(index=device, columns="quantity", values="value", aggfunc="last", sort=False)
+        metadata = data.groupby(device, sort=False)[["source", *ResultsStore.metadata_keys]].first()
+        return cls(metadata.join(values), by=by)
+
+    # values (float) of the quantities and the keys of the groups; by=() is the whole population in one group
+    def grouped(self, quantities=None, by=None):
+        if quantities is None: quantities = self.quantities
+        elif isinstance(quantities, str): quantities = [quantities]
+        by = self.by if by is None else (by,) if isinstance(by, str) else tuple(by)
+        values = self.table[list(quantities)].astype(float)
+        keys = [self.table[key] for key in by] if by else [pd.Series("all", index=self.table.index, name="population")]
+        return values, keys
+
+    # modified z-score of every value within its group; groups with less than min_devices values and values that are
+    # not finite get nan. if more than half of a group is equal (MAD of zero) the mean absolute deviation is used
+    def z_scores(self, quantities=None, by=None, min_devices=3):
+        values, keys = self.grouped(quantities, by)
+        values = values.where(np.isfinite(values))
+        grouped = values.groupby(keys, dropna=False)
+        deviation = (values - grouped.transform("median")).abs()
+        grouped_deviation = deviation.groupby(keys, dropna=False)
+        mad, mean_deviation = grouped_deviation.transform("median"), grouped_deviation.transform("mean")
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = (.6745 * deviation / mad).where(mad > 0, deviation / (1.253314 * mean_deviation))
+        return z.where(grouped.transform("count") >= min_devices)
+
+    def outliers(self, quantities=None, by=None, threshold=3.5, min_devices=3):
+        flags = self.z_scores(quantities, by, min_devices) > threshold
+        flags["any"] = flags.any(axis=1)
+        return flags
+
+    # statistics per quantity and group: count, mean, std, median, MAD, robust std (1.4826*MAD), mean of the values
+    # between the trim and 1-trim quantiles, mean without the outliers, number of outliers, percentiles, min, max
+    def summary(self, quantities=None, by=None, threshold=3.5, trim=.1, percentiles=(5, 25, 75, 95), min_devices=3):
+        values, keys = self.grouped(quantities, by)
+        values = values.where(np.isfinite(values))
+        grouped = values.groupby(keys, dropna=False)
+        median = grouped.median()
+        mad = (values - grouped.transform("median")).abs().groupby(keys, dropna=False).median()
+        within = (values >= grouped.transform("quantile", trim)) & (values <= grouped.transform("quantile", 1 - trim))
+        flags = self.z_scores(values.columns, by, min_devices) > threshold
+        statistics = {"n": grouped.count(), "mean": grouped.mean(), "std": grouped.std(), "median": median, "MAD": mad,
+                      "robust_std": 1.4826 * mad,
+                      "trimmed_mean": values.where(within).groupby(keys, dropna=False).mean(),
+                      "inlier_mean": values.where(~flags).groupby(keys, dropna=False).mean(),
+                      "outliers": flags.groupby(keys, dropna=False).sum(),
+                      **{f"p{p:g}": grouped.quantile(p / 100) for p in percentiles},
+                      "min": grouped.min(), "max": grouped.max()}
+        return pd.concat({q: pd.DataFrame({name: s[q] for name, s in statistics.items()}) for q in values.columns},
+                         names=["quantity"])
+
+    # correlation matrix of the quantities in every group (index: group, quantity). spearman correlates the ranks
+    # within the groups; with a threshold the outliers are left out before
+    def correlations(self, quantities=None, by=None, method="pearson", threshold=None, min_devices=3):
+        if method not in ("pearson", "spearman"): raise ValueError(f"Unknown correlation method {method}.")
+        values, keys = self.grouped(quantities, by)
+        values = values.where(np.isfinite(values))
+        if threshold is not None: values = values.where(~(self.z_scores(values.columns, by, min_devices) > threshold))
+        if method == "spearman": values = values.groupby(keys, dropna=False).rank()
+        return values.groupby(keys, dropna=False).corr(min_periods=min_devices)
+
+    # histogram of one quantity per group on common bins: (counts with one row per group and the bin centers as
+    # columns, bin edges). bins and range as in np.histogram
+    def distribution(self, quantity, by=None, bins=30, range=None):
+        values, keys = self.grouped([quantity], by)
+        x = values[quantity].to_numpy()
+        finite = np.isfinite(x)
+        edges = np.histogram_bin_edges(x[finite], bins=bins, range=range)
+        inside = finite & (x >= edges[0]) & (x <= edges[-1])
+        index = np.clip(np.searchsorted(edges, x[inside], side="right") - 1, 0, len(edges) - 2)
+        counts = pd.Series(index).groupby([k[inside].to_numpy() for k in keys] + [index], dropna=False).size()
+        counts = counts.unstack(fill_value=0).reindex(columns=np.arange(len(edges) - 1), fill_value=0)
+        counts.index.names, counts.columns = [k.name for k in keys], .5 * (edges[1:] + edges[:-1])
+        return counts, edges
+
+
+# channel width and length of a TLM device from its filename (see TLM_Analysis.read_device). with the L-correction
+# table of the GUI, the measured channel dimensions are used instead of the nominal ones; None if the sample is not in
+# that table
+def TLM_device_dimensions(filename, L_correct=None):
+    meta = parse_filename_metadata(filename)
+    if meta["W"] is None or meta["L"] is None:
+        raise ValueError(f"Channel width and length could not be read from the filename {filename}")
+    name, w, l = meta["name"], meta["W"], meta["L"]
+
+    # check for automated L-correction (using measured channel lengths instead of nominal ones) - needs a excel database from the GUI
+    if L_correct is not None:
+        try:
+            if name in L_correct.Sample.unique():
+                w_, l_ = w,l
+                l = _l if not np.isnan(_l:=np.nanmean(L_correct[(L_correct.Sample==name) & (L_correct.L_nom==l_) & (L_correct.W_nom==w_)].L_real)) else l_
+                w = _w if not np.isnan(_w:=np.nanmean(L_correct[(L_correct.Sample==name) & (L_correct.W_nom==w_) & (L_correct.L_nom==l_)].W_real)) else w_
+            else:
+                print(f"Sample {name} not in list for corrected L values. Using nominal values instead.")
+                return None
+        except Exception as e:
+            print(e)
+    return w, l
+
+
 class TLM_Analysis():
+    @traced("TLM_Analysis")
     def __init__(self, C_ox, filenames = None, filetype = None, carrier_type = 'p', fd=None,sd=None,smoothing=.25,V_DS=None,
                  manualFitRange={'lin': False,
                                  'sat': False,
                                  'ssw': False},
                  fitRestriction=None, # could be "fwd", "back" or "mean" otherwise
                  column_settings={"names": None, "skiprows": None},
-                 L_correct = None
+                 L_correct = None,
+                 devices = None,
+                 sweep_dtype = np.float64,  # np.float32 halves the memory of the data of each device, see TransferSweep
+                 regression = "ols",  # "huber", "theilsen" or "ransac" for a robust RW(L) regression, see contactresistance
+                 reject_outliers = False,  # drop devices that are outliers at most overdrive voltages, see reject_outlier_devices
+                 archive = None,  # SweepArchive the device data is read from instead of the text files
+                 prefetch = None  # number of files read concurrently ahead of the analysis, or a FilePrefetcher
                  ):
         self.filetype = filetype
         self.capacitance_oxide = C_ox
         self.carrier_type = carrier_type
+        self.smoothing = smoothing
         self.factor = -1 if self.carrier_type == 'p' else 1
         self.manualFitRanges = manualFitRange
         self.fitRestriction = fitRestriction
         self.column_settings = column_settings
         self.L_correct = L_correct
+        self.sweep_dtype = sweep_dtype
+        self.regression = regression
+        self.reject_outliers = reject_outliers
+        self.archive = archive
         if (fd is None) or (sd is None): self.first_deriv_limit=1; self.second_deriv_limit=0; self.deriv_lim_manual = False
         else: self.first_deriv_limit = fd; self.second_deriv_limit = sd; self.deriv_lim_manual = True
         if filenames is not None: self.filenames = filenames
@@ -40,175 +1225,385 @@ class TLM_Analysis():
         self.measurements = {}
         self.VDS = V_DS
 
+        # devices that were already read (filename: (L, TransistorAnalysis), e.g. the .devices of a previous TLM of the
+        # same files, see LiveTLM) are reused with the settings of this TLM instead of being read and fitted again.
+        # files that can't be used at all are kept in failed_devices (filename: reason), see fit_diagnostics()
+        self.devices = {}
+        self.failed_devices = {}
+        self.regression_diagnostics = {}
+        # devices dropped as outliers of the TLM regression (filename: {"fraction": ..., "device": (L, TransistorAnalysis)}),
+        # and the devices that were checked for it last
+        self.rejected_devices = {}
+        self.outlier_check = None
+        # the files are read ahead concurrently (see FilePrefetcher), each device is analyzed as soon as its file is
+        # there. devices are still added in the order of filenames, so the result does not depend on the arrival order
+        if isinstance(prefetch, FilePrefetcher): self.prefetch = prefetch
+        elif prefetch:
+            self.prefetch = FilePrefetcher([i for i in self.filenames if (devices is None or i not in devices)
+                                            and (archive is None or archive.entry(i) is None)], parallel=prefetch)
+        else: self.prefetch = None
         for i in self.filenames:
             try:
-                # this try/except is only to read the sample name, to be used as plot label in the RcW(V-Vth) plot.
-                # if it does not succeed, everything else can be used but the label will default to "data" (see main script)
-                try:
-                    m = re.match(r'.*[\\/](?P<N>[A-Za-z\d]+)[_#]?W(?P<W>[\d\.]+)[_#]*L(?P<L>[\d\.]+).*', i)
-                    l = float(m.group('L'))
-                    w = float(m.group('W'))
-                    self.name = m.group('N')
-                except:
-                    m = re.match('.*[_#]?W(?P<W>[\d.]+)[_#]*L(?P<L>[\d.]+).*', i)
-                    l = float(m.group('L'))
-                    w = float(m.group('W'))
-                    self.name = None
-
-                # VDS should be written in the filename. however, if that is not the case (e.g. with sweepme files)
-                # the real VDS will be determined from the file
-                if self.VDS is None:
-                    try:
-                        self.VDS = float(re.match(r".*[_#]?W(?P<W>[\d.]+)[_#]*L(?P<L>[\d.]+).*V[dsDS]+(?P<VDS>[\-+\d.]+)?.*",i).group("VDS"))
-                    except:
-                        try:
-                            if self.filetype == "SweepMe!" or self.filetype == None:
-                                d = pd.read_table(i)
-                                self.VDS = float(d.filter(regex='V').filter(regex='(drain)|(DS)|(_D)').iloc[3:].astype('float').mean().iloc[0])
-
-                            if self.filetype == "Marburg":
-                                d = pd.read_table(i)
-                                self.VDS = float(d.filter(regex='V').filter(regex='(drain)|(DS)|(_D)').iloc[3:].astype('float').mean().iloc[0])
-
-
-                            elif self.filetype == "Goettingen":
-                                d = pd.read_table(i,
-                                                  skiprows=2,header=1)
-                                try:
-                                    self.VDS = float(d['V_DS'].mean()) # SuperFunAnalyzer v2 data
-                                except:
-                                    self.VDS = float(d['V_Drain'].mean()) # SuperFunAnalyzer v3 data
-
-                            elif self.filetype == "ParameterAnalyzer":
-                                d = pd.read_table(i,skiprows=5,names=["idx","VDS","VGS","ID","IG"],
-                                                  header=None)
-                                self.VDS = float(d['VDS'].mean())
-                        except:
-                            print("V_DS was not set and could not be determined from file name. Please set V_DS.")
-                            pass
-
-                # check for automated L-correction (using measured channel lengths instead of nominal ones) - needs a excel database from the GUI
-                if self.L_correct is not None:
-                    try:
-                        if self.name in self.L_correct.Sample.unique():
-                            w_, l_ = w,l
-                            l = _l if not np.isnan(_l:=np.nanmean(L_correct[(L_correct.Sample==self.name) & (L_correct.L_nom==l_) & (L_correct.W_nom==w_)].L_real)) else l_
-                            w = _w if not np.isnan(_w:=np.nanmean(L_correct[(L_correct.Sample==self.name) & (L_correct.W_nom==w_) & (L_correct.L_nom==l_)].W_real)) else w_
-                        else:
-                            print(f"Sample {self.name} not in list for corrected L values. Using nominal values instead.")
-                            continue
-                    except Exception as e:
-                        print(e)
-
-                t = TransistorAnalysis(w, l, C_ox, filenames={'lin':i,'sat':None},filetype=self.filetype,isTLM=True,
-                                       carrier_type=self.carrier_type,fd=self.first_deriv_limit,sd=self.second_deriv_limit,smoothing=smoothing,V_DS=self.VDS,
-                                       manualFitRange=self.manualFitRanges,fitRestriction=self.fitRestriction,
-                                       column_settings=self.column_settings)
+                if devices is not None and i in devices:
+                    l, t = devices[i]
+                    meta = parse_filename_metadata(i)
+                    self.name = meta["name"]
+                    if self.VDS is None: self.VDS = meta["VDS"]
+                    t.update_parameters(C_ox=C_ox, fd=self.first_deriv_limit, sd=self.second_deriv_limit,
+                                        smoothing=smoothing, manualFitRange=self.manualFitRanges)
+                else:
+                    device = self.read_device(i)
+                    if self.prefetch is not None: self.prefetch.release(i)
+                    if device is None: self.failed_devices[i] = "not in L correction"; continue
+                    l, t = device
+                self.devices[i] = (l, t)
                 if l not in self.measurements.keys(): self.measurements[l] = [t]
                 else: self.measurements[l].append(t)
-            except:
+            except Exception as e:
+                self.failed_devices[i] = fit_failure_reason(e)
                 print_exc()
-            # print(self.measurements[l].transfer_data_all)
-            # print(self.measurements[l].results)
-            # break
+        # devices added later (add_device) are read from disk again
+        if self.prefetch is not None and self.prefetch is not prefetch: self.prefetch.close()
+        self.prefetch = None
 
-        # check for the common derivative thresholds
+        if self.VDS is None: self.VDS = self.determine_VDS()
+        for l in self.measurements.keys():
+            for t_ in self.measurements[l]:
+                t_.linear_source_drain_voltage = self.VDS
+                t_.prepare_TLM()
+
+        # check for the common derivative thresholds. the thresholds found for each device on its own are kept, so that
+        # the common ones can be determined again when a device is added or removed (see add_device/remove_device)
+        self.initial_deriv_limits = (self.first_deriv_limit, self.second_deriv_limit)
+        self.device_deriv_limits = {}
         if not self.deriv_lim_manual:
-            for l in sorted(self.measurements.keys()):
-                for t_ in self.measurements[l]:
-                    try:
-                        m = t_.fit_mobility_lin()
-                        x_singleL, y_singleL = t_.linear_Vg, t_.linear_Id
+            for i, (l, t_) in self.devices.items():
+                try:
+                    f__, s__, ysmooth__ = t_.fit_mobility_lin()[2]
+                    self.device_deriv_limits[i] = (f__, s__)
+                except:
+                    continue
 
-                        # finding the smallest common derivative thresholds
-                        f__, s__, ysmooth__ = m[2]
-                        if f__ < self.first_deriv_limit: self.first_deriv_limit = f__
-                        if s__ > self.second_deriv_limit: self.second_deriv_limit = s__
+            # the existing objects are refitted with the common thresholds; data and smoothed derivatives are kept
+            self.first_deriv_limit, self.second_deriv_limit = self.common_deriv_limits()
+            self.refit_devices()
 
-                    except:
-                        continue
+        # (L, RW) of each device on the overdrive voltage grid and the running sums of the per-overdrive regressions,
+        # built by contactresistance() and updated by add_device/remove_device
+        self.overdrive_grid, self.overdrive_grid_device = None, None
+        self.device_RWs = {}
+        self.overdrive_sums = None
 
 
-            for l in self.measurements.keys():
-                for index in range(len(self.measurements[l])):
-                    self.measurements[l][index] = TransistorAnalysis(1e6*self.measurements[l][index].channel_width, 1e6*self.measurements[l][index].channel_length,
-                                        1e6*self.measurements[l][index].capacitance_oxide,
-                                        filenames={'lin':self.measurements[l][index].filenames['lin'],'sat':None},filetype=self.filetype,isTLM=True,
-                                        carrier_type=self.carrier_type,fd=self.first_deriv_limit,sd=self.second_deriv_limit,
-                                        smoothing=smoothing,V_DS=self.VDS,
-                                        manualFitRange=self.manualFitRanges,fitRestriction=self.fitRestriction,
-                                        column_settings=self.column_settings)
+    # smallest first and largest second derivative threshold of all devices, i.e. the common thresholds of the TLM
+    def common_deriv_limits(self):
+        fd, sd = self.initial_deriv_limits
+        for f__, s__ in self.device_deriv_limits.values():
+            if f__ < fd: fd = f__
+            if s__ > sd: sd = s__
+        return fd, sd
 
+    def refit_devices(self):
+        for l in self.measurements.keys():
+            for t_ in self.measurements[l]:
+                t_.update_parameters(fd=self.first_deriv_limit, sd=self.second_deriv_limit)
+                t_.prepare_TLM()
+        self.overdrive_sums = None
 
+    # measurements (L: [devices]) in the order of the file list
+    def group_measurements(self):
+        self.measurements = {}
+        for l, t_ in self.devices.values():
+            if l not in self.measurements.keys(): self.measurements[l] = [t_]
+            else: self.measurements[l].append(t_)
+
+    # adds one file to the TLM (or replaces it, if it was measured again): only this device is read and fitted and its
+    # RW values are added to the running sums of the regressions. only if its derivative thresholds change the common
+    # ones, all devices are refitted (from their cached data). returns False if the file can't be used
+    @traced()
+    def add_device(self, filename):
+        if filename in self.devices: self.remove_device(filename)
+        self.failed_devices.pop(filename, None)
+        try:
+            device = self.read_device(filename)
+        except Exception as e:
+            self.failed_devices[filename] = fit_failure_reason(e)
+            print_exc()
+            return False
+        if device is None: self.failed_devices[filename] = "not in L correction"; return False
+        l, t = device
+        self.devices[filename] = (l, t)
+        self.rejected_devices.pop(filename, None)
+        self.filenames = list(self.filenames) + [filename]
+        self.group_measurements()
+        if self.VDS is None: self.VDS = self.determine_VDS()
+        t.linear_source_drain_voltage = self.VDS
 
+        if not self.deriv_lim_manual:
+            t.update_parameters(fd=self.initial_deriv_limits[0], sd=self.initial_deriv_limits[1])
+            try:
+                f__, s__, ysmooth__ = t.fit_mobility_lin()[2]
+                self.device_deriv_limits[filename] = (f__, s__)
+            except:
+                pass
+            if self.common_deriv_limits() != (self.first_deriv_limit, self.second_deriv_limit):
+                self.first_deriv_limit, self.second_deriv_limit = self.common_deriv_limits()
+                self.refit_devices()
+                return True
+            t.update_parameters(fd=self.first_deriv_limit, sd=self.second_deriv_limit)
+        t.prepare_TLM()
+        self.update_overdrive_sums(filename)
+        return True
+
+    # removes one file from the TLM, e.g. an outlier. its RW values are subtracted from the running sums, nothing is
+    # refitted unless the common derivative thresholds were set by this device
+    @traced()
+    def remove_device(self, filename):
+        if filename not in self.devices: return False
+        del self.devices[filename]
+        self.device_deriv_limits.pop(filename, None)
+        self.filenames = [f_ for f_ in self.filenames if f_ != filename]
+        self.group_measurements()
+
+        if not self.deriv_lim_manual and self.common_deriv_limits() != (self.first_deriv_limit, self.second_deriv_limit):
+            self.first_deriv_limit, self.second_deriv_limit = self.common_deriv_limits()
+            self.refit_devices()
+            return True
+        self.update_overdrive_sums(filename, remove=True)
+        return True
+
+    # counters of the fit window searches of all devices (see diagnose_fit), one row per device and fit method with the
+    # number of failed iterations per reason as extra columns. included is False for devices without a threshold voltage,
+    # which are left out of the TLM; files that could not be read at all are listed with their reason and no method.
+    # sorting by e.g. attempts or time shows the pathological devices, which can then be excluded with remove_device()
+    def fit_diagnostics(self):
+        rows = []
+        for i, (l, t_) in self.devices.items():
+            for method, d in t_.fit_diagnostics.items():
+                row = {"file": i, "L": l, "method": method, "included": t_.Vth is not None}
+                row.update({k: v for k, v in d.items() if k != "failures"})
+                row.update(d["failures"])
+                rows.append(row)
+        for i, reason in self.failed_devices.items():
+            rows.append({"file": i, "L": None, "method": None, "included": False, reason: 1})
+        columns = ["file", "L", "method", "included", "iterations", "attempts", "converged", "time", "runs", "total_time"]
+        df = pd.DataFrame(rows)
+        reasons = [c for c in df.columns if c not in columns]
+        df = df.reindex(columns=columns + reasons)
+        df[reasons] = df[reasons].fillna(0).astype(int)
+        return df
+
+    # fit_diagnostics() summed up per fit method: devices, converged devices, iterations, attempts and failures in total,
+    # the largest number of iterations and the time spent
+    def fit_diagnostics_summary(self):
+        df = self.fit_diagnostics().dropna(subset=["method"])
+        reasons = list(df.columns[10:])
+        summary = df.groupby("method").agg(devices=("file", "size"), converged=("converged", "sum"),
+                                           iterations=("iterations", "sum"), max_iterations=("iterations", "max"),
+                                           attempts=("attempts", "sum"), time=("time", "sum"))
+        return summary.join(df.groupby("method")[reasons].sum())
+
+
+    # mu_eff(Vg) of all devices with a threshold voltage on a common gate voltage grid, see Vgdependent_mobility_curves.
+    # "files" and "L" give the device of each row, e.g. to group the curves by channel length
+    def Vgdependent_mobility(self, derivative='gradient', V_grid=None):
+        files = [i for i, (l, t_) in self.devices.items() if t_.Vth is not None]
+        curves = Vgdependent_mobility_curves([self.devices[i][1] for i in files], 'lin', derivative, V_grid,
+                                             gauss_s=self.smoothing)
+        curves.update({"files": files, "L": np.array([self.devices[i][0] for i in files], dtype=float)})
+        return curves
+
+    # reads one file of the TLM (channel width and length from the filename, L-correction) and returns (L, device)
+    # or None if it is not to be used
+    @traced()
+    def read_device(self, filename):
+        # the sample name is used as plot label in the RcW(V-Vth) plot. if there is none, everything else can be used
+        # but the label will default to "data" (see main script)
+        meta = parse_filename_metadata(filename)
+        self.name = meta["name"]
+
+        # VDS should be written in the filename. however, if that is not the case (e.g. with sweepme files)
+        # the real VDS will be determined from the data once all files are read (see determine_VDS())
+        if self.VDS is None: self.VDS = meta["VDS"]
+
+        dimensions = TLM_device_dimensions(filename, self.L_correct)
+        if dimensions is None: return None
+        w, l = dimensions
+
+        # every file is read exactly once here. the TLM specific analysis (Vth, overdrive voltage, RW) is done
+        # afterwards with prepare_TLM(), when VDS is known
+        t = TransistorAnalysis(w, l, self.capacitance_oxide, filenames={'lin':filename,'sat':None},filetype=self.filetype,isTLM=False,
+                               carrier_type=self.carrier_type,fd=self.first_deriv_limit,sd=self.second_deriv_limit,smoothing=self.smoothing,V_DS=self.VDS,
+                               manualFitRange=self.manualFitRanges,fitRestriction=self.fitRestriction,
+                               column_settings=self.column_settings, sweep_dtype=self.sweep_dtype, archive=self.archive,
+                               prefetch=self.prefetch)
+        return l, t
+
+    # determines VDS from the drain voltage column of the data that has already been read for the TLM,
+    # instead of opening the files a second time. the first file that has such a column is used
+    def determine_VDS(self):
+        for l in self.measurements.keys():
+            for t_ in self.measurements[l]:
+                try:
+                    return float(t_.linear_sweep.Vd.astype('float').mean())
+                except:
+                    continue
+        print("V_DS was not set and could not be determined from file name. Please set V_DS.")
+        return None
+
+    # channel length and maximum overdrive voltage where the least overdrive voltage datapoints are found
+    # using it as smallest common denominator so the analysis includes all channel lengths for the available V_ov
+    def least_overdrive_device(self):
+        least_overdrive_voltages = [np.inf, np.inf, None]
+        for l in self.measurements.keys():
+            for trans_an_obj in self.measurements[l]:
+                try:
+                    # do not use np.max!! this is a workaround, but may give wrong results if measurements
+                    # are not done within a certain VGS range!! OVERHAUL!
+                    # comment 2021-02-09: tbh, i am not sure anymore why this was an issue. maybe for n-channel/ambipolar TFTs?
+                    lowest_max_ov = np.max(self.factor * trans_an_obj.overdrive_arrays()[0])
+                    if lowest_max_ov < least_overdrive_voltages[1]:
+                        least_overdrive_voltages = [l, lowest_max_ov, trans_an_obj] # [l, max(ov[l]), analysis_object]
+                except:
+                    pass
+        return least_overdrive_voltages[2]
+
+    # RW of one device at every overdrive voltage of the grid (nan where it has no data)
+    def device_RW(self, trans_an_obj, grid):
+        # include all values in the R*W data that are within one step size of the nominal overdrive voltage
+        # this is most important for fitRestriction=="mean", but also for "fwd" and "back" because the overdrive voltage is an exact measurement, not rounded
+        ov, rw, _ = trans_an_obj.overdrive_arrays(self.fitRestriction)
+
+        within = (np.abs(ov[None, :] - grid[:, None]) < np.abs(trans_an_obj.Vg_stepsize / 2)) & ~np.isnan(rw)
+        count = within.sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            return np.where(count > 0, np.where(within, rw, 0).sum(axis=1) / np.maximum(count, 1), np.nan)
+
+    # (re)builds the RW of all devices on the overdrive voltage grid and the running sums of the regressions
+    @traced(category="regression")
+    def build_overdrive_sums(self):
+        self.overdrive_grid_device = self.least_overdrive_device()
+        self.overdrive_grid = self.overdrive_grid_device.overdrive_arrays()[0].astype(float)
+        self.device_RWs = {}
+        self.overdrive_sums = np.zeros((7, len(self.overdrive_grid)))
+        for i, (l, t_) in self.devices.items():
+            if t_.Vth is None: continue
+            rw = self.device_RW(t_, self.overdrive_grid)
+            self.device_RWs[i] = (l, rw)
+            self.overdrive_sums += _regression_sum_terms(1e-6 * l, rw)
+
+    # adds (or subtracts) a single device to the running sums. if the device with the least overdrive voltage, i.e. the
+    # grid, has changed, all sums are built again on the next call of contactresistance() (from the fitted data)
+    def update_overdrive_sums(self, filename, remove=False):
+        if self.overdrive_sums is None: return
+        if self.least_overdrive_device() is not self.overdrive_grid_device:
+            self.overdrive_sums = None
+            return
+        if remove:
+            l, rw = self.device_RWs.pop(filename, (None, None))
+            if rw is not None: self.overdrive_sums -= _regression_sum_terms(1e-6 * l, rw)
+        else:
+            l, t_ = self.devices[filename]
+            if t_.Vth is None: return
+            rw = self.device_RW(t_, self.overdrive_grid)
+            self.device_RWs[filename] = (l, rw)
+            self.overdrive_sums += _regression_sum_terms(1e-6 * l, rw)
+
+
+    # files, channel lengths (m) and RW (one row per device, one column per overdrive voltage of the grid) of all devices
+    # in the TLM regressions
+    def overdrive_RW_matrix(self):
+        if self.overdrive_sums is None: self.build_overdrive_sums()
+        files = list(self.device_RWs)
+        x = np.array([1e-6 * self.device_RWs[i][0] for i in files], dtype=float)
+        y = np.array([self.device_RWs[i][1] for i in files], dtype=float).reshape(len(files), len(self.overdrive_grid))
+        return files, x, y
+
+    # the regressions of all overdrive voltages at once: a, b, pcov, R², valid (see _linear_regression_sums). least
+    # squares from the running sums, or robust (see _robust_regression_columns) from the RW of all devices, which
+    # leaves out single bad points (infinite RW too) instead of letting them shift RcW
+    def overdrive_regression(self, method=None):
+        method = self.regression if method is None else method
+        if method == "ols":
+            if self.overdrive_sums is None: self.build_overdrive_sums()
+            return _linear_regression_sums(self.overdrive_sums)
+        files, x, y = self.overdrive_RW_matrix()
+        return _robust_regression_columns(x, y, method, relative=True)[:5]
+
+    # fraction of the overdrive voltages (of those that can be fitted, each voltage of the grid once) at which the RW of
+    # a device deviates more than threshold robust standard deviations from the robust regression line (method, or
+    # "huber" for least squares TLMs), per filename
+    def device_outlier_fractions(self, method=None, threshold=3.):
+        method = self.regression if method is None else method
+        files, x, y = self.overdrive_RW_matrix()
+        if not files: return {}
+        valid, z = _robust_regression_columns(x, y, "huber" if method == "ols" else method, relative=True)[4:]
+        first = np.zeros(len(self.overdrive_grid), dtype=bool)
+        first[np.unique(self.overdrive_grid, return_index=True)[1]] = True
+        counted = (first & valid) & ~np.isnan(z)
+        flagged = counted & (z > threshold)
+        return dict(zip(files, flagged.sum(axis=1) / np.maximum(counted.sum(axis=1), 1)))
+
+    # removes the devices that are outliers at at least the given fraction of the overdrive voltages (see
+    # device_outlier_fractions) from the TLM with remove_device(), i.e. without reading or fitting anything again, and
+    # keeps them in rejected_devices. at least two channel lengths with min_devices devices in total are kept. returns
+    # the rejected files
+    @traced(category="regression")
+    def reject_outlier_devices(self, method=None, threshold=3., fraction=.5, min_devices=3):
+        fractions = self.device_outlier_fractions(method, threshold)
+        rejected = []
+        for i in sorted((i for i, v in fractions.items() if v >= fraction), key=lambda i: -fractions[i]):
+            kept = [self.devices[j][0] for j in fractions if j not in rejected and j != i]
+            if len(kept) < min_devices or len(set(kept)) < 2: break
+            rejected.append(i)
+        for i in rejected:
+            self.rejected_devices[i] = {"fraction": float(fractions[i]), "device": self.devices[i]}
+            self.remove_device(i)
+        self.outlier_check = set(self.devices)
+        return rejected
+
+    # the TLM regression RW = R_sh*L + RcW at every overdrive voltage. the RW of each device is cached on the overdrive
+    # grid and the regressions are solved from running sums (see build_overdrive_sums), so after add_device/
+    # remove_device only the changed device has to be evaluated. with regression="huber"/"theilsen"/"ransac" all
+    # overdrive voltages are fitted robustly at once and with reject_outliers devices that are outliers at most
+    # overdrive voltages are dropped first (once for each set of devices)
+    @traced(category="regression")
     def contactresistance(self):
         def linear_regression(x, a, b):
             return a * x + b
 
-        # I'm not satisfied with the fact that the dict Vths is made from scratch for each overdrive voltage
-        # for now, I will leave it as is, because it's working nicely
-        def single_overdrive(o):
-            RWs = {}
-            Vths = {}
-            SSws = {}
-            for l in self.measurements.keys():
-                for trans_an_obj in self.measurements[l]:
-                    if trans_an_obj.Vth is None: continue
-
-                    # building lists for Vth and SSw as function of L for plotting later on
-                    if l not in Vths.keys(): Vths[l] = [trans_an_obj.Vth]
-                    else: Vths[l].append(trans_an_obj.Vth)
-
-                    if l not in SSws.keys(): SSws[l] = [trans_an_obj.SSw]
-                    else: SSws[l].append(trans_an_obj.SSw)
-
-                    # include all values in the R*W data that are within one step size of the nominal overdrive voltage
-                    # this is most important for fitRestriction=="mean", but also for "fwd" and "back" because the overdrive voltage is an exact measurement, not rounded
-                    stepsize = trans_an_obj.Vg_stepsize
-                    ovdata_tot = trans_an_obj.overdrive_data
-                    ovdata_fwd = ovdata_tot.head(int(len(ovdata_tot)/2))
-                    ovdata_back = ovdata_tot.tail(int(len(ovdata_tot)/2))
-                    if self.fitRestriction == "mean":
-                        rw = ovdata_tot[np.abs(ovdata_tot['overdrive_voltage'] - o) < np.abs(stepsize / 2)]['RW'].mean()
-
-                    elif self.fitRestriction == "fwd":
-                        rw = ovdata_fwd[np.abs(ovdata_fwd['overdrive_voltage'] - o) < np.abs(stepsize/2)]['RW'].mean()
-
-                    elif self.fitRestriction == "back":
-                        rw = ovdata_back[np.abs(ovdata_back['overdrive_voltage'] - o) < np.abs(stepsize/2)]['RW'].mean()
-
-
-                    if not np.isnan(rw):
-                        if l not in RWs.keys(): RWs[l] = [float(rw)]
-                        else: RWs[l].append(float(rw))
-
-                #if np.isnan(rw): print(l,o,rw)
-
-                #print(rw)
-
-            # x: channel length, y: width-normalized resistance
-            x, y = [], []
-            for l in RWs.keys():
-                for i in RWs[l]:
-                    x.append(1e-6 * l)
-                    y.append(i)
-
-            x, y = np.array(x), np.array(y)
-
-            popt, pcov = curve_fit(linear_regression, x, y)
-
-            # calculate R^2 value
-            ss_residuals = np.sum((y - linear_regression(x, *popt))**2)
-            ss_tot = np.sum((y - np.mean(y))**2)
-            r_sq = 1 - (ss_residuals/ss_tot)
-
-            r_sheet, r_contact = popt # both are width normalized
-            r_sheet_error,r_contact_error = np.sqrt(np.diag(pcov)) # numerical fitting error
-
-            # within the single overdrive voltage, the following data will be returned
-            # contact resistance RcW, its error dRcW, sheet resistance R_sh, threshold voltage, fitting covariance and parameters, width-norm. resistance RW, R^2 value of the fit
-            return r_contact, r_contact_error, r_sheet, r_sheet_error, Vths, pcov, popt, RWs, r_sq, SSws
+        if self.overdrive_sums is None: self.build_overdrive_sums()
+        if self.reject_outliers and self.outlier_check != set(self.devices):
+            self.reject_outlier_devices()
+            if self.overdrive_sums is None: self.build_overdrive_sums()
+        grid = self.overdrive_grid
+        slopes, intercepts, pcovs, r_sqs, valid = self.overdrive_regression()
+
+        # why the regression failed at the overdrive voltages that can't be fitted, see regression_diagnostics. repeated
+        # overdrive voltages of the grid are only fitted once (see below) and only counted once
+        n, n_inf = self.overdrive_sums[0], self.overdrive_sums[1]
+        first = np.zeros(len(grid), dtype=bool)
+        first[np.unique(grid, return_index=True)[1]] = True
+        failures = collections.Counter("too few devices" if n[k] < 2 else "infinite RW" if n_inf[k] > 0 and
+                                       self.regression == "ols" else "single channel length"
+                                       for k in np.flatnonzero(first & ~valid))
+        self.regression_diagnostics['TLM'] = {"overdrives": int(first.sum()), "fitted": int((first & valid).sum()),
+                                              "failures": failures, "method": self.regression,
+                                              "rejected devices": len(self.rejected_devices)}
+
+        # building lists for Vth and SSw as function of L for plotting later on
+        V_ths = {}
+        SSws = {}
+        devices = []
+        for l in self.measurements.keys():
+            for i, (l_, trans_an_obj) in self.devices.items():
+                if l_ != l or trans_an_obj.Vth is None: continue
+                devices.append(self.device_RWs[i])
+                if l not in V_ths.keys(): V_ths[l] = [trans_an_obj.Vth]
+                else: V_ths[l].append(trans_an_obj.Vth)
 
+                if l not in SSws.keys(): SSws[l] = [trans_an_obj.SSw]
+                else: SSws[l].append(trans_an_obj.SSw)
 
         ovs = []
         rs = []
@@ -220,69 +1615,56 @@ class TLM_Analysis():
         best_ov = {'ov': np.nan, 'err': np.inf}
         all_RWs = {}
 
-        # channel length and maximum overdrive voltage where the least overdrive voltage datapoints are found
-        # using it as smallest common denominator so the analysis includes all channel lengths for the available V_ov
-        least_overdrive_voltages = [np.inf, np.inf, None]
-        for l in self.measurements.keys():
-            for trans_an_obj in self.measurements[l]:
-                try:
-                    # do not use np.max!! this is a workaround, but may give wrong results if measurements
-                    # are not done within a certain VGS range!! OVERHAUL!
-                    # comment 2021-02-09: tbh, i am not sure anymore why this was an issue. maybe for n-channel/ambipolar TFTs?
-                    lowest_max_ov = np.max(self.factor * trans_an_obj.overdrive_data['overdrive_voltage'])
-                    if lowest_max_ov < least_overdrive_voltages[1]:
-                        least_overdrive_voltages = [l, lowest_max_ov, trans_an_obj] # [l, max(ov[l]), analysis_object]
-                except:
-                    pass
-
-        for i in least_overdrive_voltages[2].overdrive_data['overdrive_voltage']:
+        for k, i in enumerate(grid):
             if i in ovs: continue
-            try:
-                r_c, r_c_err, r_sh, r_sh_err, V_ths, pcov, popt, rws, r_sq, SSws = single_overdrive(i)
-
-                ov_str = f'{i:.2f}'
-                if ov_str not in all_RWs.keys(): all_RWs[ov_str] = {'r_sq':r_sq,'data':rws,'popt':popt,'pcov':pcov}
-                if best_ov['err'] > r_c_err: best_ov['ov'] = ov_str;best_ov['err'] = r_c_err
-                ovs.append(i)
-                rs.append(r_c)
-                errs.append(r_c_err)
-                mu0s.append(1 / ((1e-6 * self.capacitance_oxide) * r_sh * i))
-                mu0errs.append( np.abs((1 / ((1e-6 * self.capacitance_oxide) * r_sh**2 * i)))*r_sh_err )
-                rs_sheet.append(r_sh)
-                rs_sheet_errs.append(r_sh_err)
-            except:
+            if not valid[k]:
                 if np.abs(i)>0.03: print(f"There was an error with the TLM fit for an overdrive voltage of {i:.3f}V")
-                #print_exc()
                 continue
 
+            popt, pcov, r_sq = np.array([slopes[k], intercepts[k]]), pcovs[k], r_sqs[k]
+            r_sh, r_c = popt # both are width normalized
+            r_sh_err, r_c_err = np.sqrt(np.diag(pcov)) # numerical fitting error
+
+            ov_str = f'{i:.2f}'
+            if ov_str not in all_RWs.keys():
+                # width-normalized resistance RW that went into the fit
+                rws = {}
+                for l, rw in devices:
+                    if np.isnan(rw[k]): continue
+                    if l not in rws.keys(): rws[l] = [float(rw[k])]
+                    else: rws[l].append(float(rw[k]))
+                all_RWs[ov_str] = {'r_sq':r_sq,'data':rws,'popt':popt,'pcov':pcov}
+            if best_ov['err'] > r_c_err: best_ov['ov'] = ov_str;best_ov['err'] = r_c_err
+            ovs.append(i)
+            rs.append(r_c)
+            errs.append(r_c_err)
+            mu0s.append(1 / ((1e-6 * self.capacitance_oxide) * r_sh * i))
+            mu0errs.append( np.abs((1 / ((1e-6 * self.capacitance_oxide) * r_sh**2 * i)))*r_sh_err )
+            rs_sheet.append(r_sh)
+            rs_sheet_errs.append(r_sh_err)
+
+
+        # only used the high overdrive voltages (highest 30%) in the "graphical" extraction of L_0
+        # also exclude bad fits (r^2 below 0.98) and "too good fits" (a.k.a. too few points) (r^2 above 0.99999)
+        max_ov = np.max(np.abs(np.array(list(all_RWs.keys())).astype(float))) if all_RWs else np.nan
+        l_0_lines = np.array([all_RWs[ov]['popt'] for ov in all_RWs.keys()
+                              if not ((np.abs(float(ov)) / max_ov < 0.7) or (all_RWs[ov]['r_sq'] < 0.98) or
+                                      (all_RWs[ov]['r_sq'] > 0.99999))]).reshape(-1, 2)
 
         # recursive function to find the closest point to intersection of several lines with small calculation cost
         def find_l_0(l_range=np.linspace(-80e-6, 5e-6, 10), l_0=np.nan, Rc0W=np.nan, s=np.inf):
             if np.ptp(l_range) < 0.5e-6:
                 return l_0, Rc0W
             else:
-                for l in l_range:
-                    sum_of_squares = 0
-                    line_values = []
-                    # determination of the mean value of all TLM fit lines for each channel length
-                    for ov in all_RWs.keys():
-                        # only used the high overdrive voltages (highest 30%) in the "graphical" extraction of L_0
-                        # also exclude bad fits (r^2 below 0.98) and "too good fits" (a.k.a. too few points) (r^2 above 0.99999)
-                        if (np.abs(float(ov)) / np.max(
-                                np.abs(np.array(list(all_RWs.keys())).astype(float))) < 0.7) or (
-                                all_RWs[ov]['r_sq'] < 0.98) or (all_RWs[ov]['r_sq'] > 0.99999): continue
-                        line_values.append(linear_regression(l, *all_RWs[ov]['popt']))
-                    Rc0W_ = np.median(line_values)
-
-                    # determination of L0 and Rc0W by means of least squares deviation from the mean value
-                    # where the least squares are, there is the closest overlap/intersection of the lines
-                    for ov in all_RWs.keys():
-                        # only used the high overdrive voltages (highest 30%) in the "graphical" extraction of L_0
-                        if (np.abs(float(ov)) / np.max(
-                                np.abs(np.array(list(all_RWs.keys())).astype(float))) < 0.7) or (
-                                all_RWs[ov]['r_sq'] < 0.98) or (all_RWs[ov]['r_sq'] > 0.99999): continue
-                        sum_of_squares += (linear_regression(l, *all_RWs[ov]['popt']) - Rc0W_) ** 2
-                    if sum_of_squares < s: s = sum_of_squares; l_0 = l; Rc0W = Rc0W_
+                # determination of the mean value of all TLM fit lines for each channel length (one row per length)
+                line_values = linear_regression(l_range[:, None], l_0_lines[:, 0], l_0_lines[:, 1])
+                Rc0W_ = np.median(line_values, axis=1)
+
+                # determination of L0 and Rc0W by means of least squares deviation from the mean value
+                # where the least squares are, there is the closest overlap/intersection of the lines
+                sums_of_squares = np.sum((line_values - Rc0W_[:, None]) ** 2, axis=1)
+                for l, sum_of_squares, Rc0W__ in zip(l_range, sums_of_squares, Rc0W_):
+                    if sum_of_squares < s: s = sum_of_squares; l_0 = l; Rc0W = Rc0W__
 
                 stepsize = l_range[1] - l_range[0]
                 next_min, next_max = l_0 - stepsize, l_0 + stepsize
@@ -313,6 +1695,7 @@ class TLM_Analysis():
                np.array(mu0s), np.array(mu0errs), np.array(rs_sheet), np.array(rs_sheet_errs), V_ths, SSws
 
 
+    @traced(category="regression")
     def contactresistance_mTLM(self):
         def linear_regression(x, a, b):
             return a + b * x
@@ -333,17 +1716,9 @@ class TLM_Analysis():
                     # include all values in the R*W data that are within one step size of the nominal overdrive voltage
                     # this is most important for fitRestriction=="mean", but also for "fwd" and "back" because the overdrive voltage is an exact measurement, not rounded
                     stepsize = trans_an_obj.Vg_stepsize
-                    ovdata_tot = trans_an_obj.overdrive_data
-                    ovdata_fwd = ovdata_tot.head(int(len(ovdata_tot)/2))
-                    ovdata_back = ovdata_tot.tail(int(len(ovdata_tot)/2))
-                    if self.fitRestriction == "mean":
-                        rw = ovdata_tot[np.abs(ovdata_tot['overdrive_voltage'] - o) < np.abs(stepsize / 2)]['RW'].mean()
-
-                    elif self.fitRestriction == "fwd":
-                        rw = ovdata_fwd[np.abs(ovdata_fwd['overdrive_voltage'] - o) < np.abs(stepsize/2)]['RW'].mean()
-
-                    elif self.fitRestriction == "back":
-                        rw = ovdata_back[np.abs(ovdata_back['overdrive_voltage'] - o) < np.abs(stepsize/2)]['RW'].mean()
+                    ov_, rw_, _ = trans_an_obj.overdrive_arrays(self.fitRestriction)
+                    rw_ = rw_[(np.abs(ov_ - o) < np.abs(stepsize / 2)) & ~np.isnan(rw_)]
+                    rw = rw_.mean() if len(rw_) else np.nan
 
 
                     if not np.isnan(rw):
@@ -388,22 +1763,10 @@ class TLM_Analysis():
         best_ov = {'ov': np.nan, 'err': np.inf}
         all_RWpLs = {}
 
-        # channel length and maximum overdrive voltage where the least overdrive voltage datapoints are found
-        # using it as smallest common denominator so the analysis includes all channel lengths for the available V_ov
-        least_overdrive_voltages = [np.inf, np.inf, None]
-        for l in self.measurements.keys():
-            for trans_an_obj in self.measurements[l]:
-                try:
-                    # do not use np.max!! this is a workaround, but may give wrong results if measurements
-                    # are not done within a certain VGS range!! OVERHAUL!
-                    # comment 2021-02-09: tbh, i am not sure anymore why this was an issue. maybe for n-channel/ambipolar TFTs?
-                    lowest_max_ov = np.max(self.factor * trans_an_obj.overdrive_data['overdrive_voltage'])
-                    if lowest_max_ov < least_overdrive_voltages[1]:
-                        least_overdrive_voltages = [l, lowest_max_ov, trans_an_obj] # [l, max(ov[l]), analysis_object]
-                except:
-                    pass
-
-        for i in least_overdrive_voltages[2].overdrive_data['overdrive_voltage']:
+        grid = self.least_overdrive_device().overdrive_arrays()[0]
+        diagnostics = {"overdrives": len(np.unique(grid)), "fitted": 0, "failures": collections.Counter()}
+        self.regression_diagnostics['mTLM'] = diagnostics
+        for i in grid:
             if i in ovs: continue
             try:
                 r_c, r_c_err, r_sh, r_sh_err, V_ths, (pcov, popt), rwpls, r_sq = single_overdrive(i)
@@ -417,7 +1780,9 @@ class TLM_Analysis():
                 mu0errs.append( np.abs((1 / ((1e-6 * self.capacitance_oxide) * r_sh**2 * i)))*r_sh_err )
                 rs_sheet.append(r_sh)
                 rs_sheet_errs.append(r_sh_err)
-            except:
+                diagnostics["fitted"] += 1
+            except Exception as e:
+                diagnostics["failures"][fit_failure_reason(e)] += 1
                 if np.abs(i)>0.03: print(f"There was an error with the TLM fit for an overdrive voltage of {i:.3f}V")
                 #print_exc()
                 continue
@@ -428,6 +1793,7 @@ class TLM_Analysis():
                np.array(mu0s), np.array(mu0errs), np.array(rs_sheet), np.array(rs_sheet_errs)
 
 
+    @traced(category="regression")
     def intr_mob(self):
         def intr_mu(L, l_1_2, mu0):  # equation taken from ulrikes thesis, page 60
             return mu0 / (1 + (l_1_2 / L))
@@ -477,7 +1843,143 @@ class TLM_Analysis():
         return data
 
 
+# keeps the TLM of a directory up to date while the measurements are running: a DirectoryWatcher reports every completed
+# file, and the new devices are added to the existing TLM (see TLM_Analysis.add_device), so each file is read and
+# fitted only once and the results are available a few seconds after the last measurement. only the files a TLM can
+# use are taken (see is_TLM_file), saturation or S-parameter files etc. in the same directory are ignored.
+# on_update(live) is called after every update, the results of contactresistance() are in .results
+#   live = LiveTLM("D:/measurements/S12", C_ox=0.56, filetype="SweepMe!", fitRestriction="fwd", on_update=print_results)
+#   live.start()  ...  live.stop()
+class LiveTLM():
+    def __init__(self, directory, C_ox, settle_time=2., on_update=None, include_existing=True, min_lengths=2,
+                 **tlm_settings):
+        self.C_ox = C_ox
+        self.tlm_settings = tlm_settings
+        self.on_update = on_update
+        self.min_lengths = min_lengths  # a TLM needs at least two different channel lengths
+        self.filenames = []
+        self.tlm, self.results = None, None
+        self.lock = threading.Lock()
+        self.watcher = DirectoryWatcher(directory, callback=self.ingest, settle_time=settle_time,
+                                        extensions=FileIndex.transfer_extensions, include_existing=include_existing)
+
+    def ingest(self, filenames):
+        with self.lock:
+            new = [f_ for f_ in filenames if is_TLM_file(f_)]
+            if not new: return None
+            self.filenames = sorted(set(self.filenames) | set(new))
+            if len({parse_filename_metadata(f_)["L"] for f_ in self.filenames}) < self.min_lengths: return None
+
+            # the TLM is built once enough channel lengths are there, afterwards only the new (or re-measured) files
+            # are read, fitted and added
+            t0 = time.time()
+            if self.tlm is None:
+                self.tlm = TLM_Analysis(self.C_ox, filenames=self.filenames, **self.tlm_settings)
+            else:
+                for f_ in new: self.tlm.add_device(f_)
+            try:
+                self.results = self.tlm.contactresistance()
+            except:
+                print_exc()
+                self.results = None
+            print(f"[{time.strftime('%H:%M:%S')}] TLM updated with {len(new)} new file(s), "
+                  f"{len(self.filenames)} in total ({1000*(time.time() - t0):.0f} ms).")
+        if self.on_update is not None:
+            try: self.on_update(self)
+            except: print_exc()
+        return self.results
+
+    def poll(self):
+        return self.watcher.poll()
+
+    def start(self, interval=1.):
+        self.watcher.start(interval)
+
+    def stop(self):
+        self.watcher.stop()
+
+
+# indices where a sweep changes direction, found from the sign changes of the gate voltage steps. steps smaller than
+# a fraction of the typical step (e.g. the noise of the measured voltage during a hold) have no direction. the sample
+# at which the direction changes is the first one of the new segment, i.e. a symmetric fwd/back sweep is split at
+# len//2 (for an odd number of datapoints as well as for a repeated turning point)
+def sweep_turning_points(V, tolerance=.5):
+    dV = np.diff(np.asarray(V, dtype=float))
+    if len(dV) == 0: return np.array([], dtype=int)
+    direction = np.sign(dV) * (np.abs(dV) > tolerance * np.percentile(np.abs(dV), 90))
+    moving = np.flatnonzero(direction)
+    return moving[1:][direction[moving[1:]] != direction[moving[:-1]]]
+
+
+# compact container for the data of one transfer sweep. of the data file only gate voltage, drain current, gate current
+# and drain voltage are kept, each as its own contiguous array (float64, or float32 to halve the memory once more);
+# timestamps, resistances etc. are dropped. the segments of the sweep (see sweep_turning_points) are views of the same
+# memory, not copies: .fwd is the first, .back the second segment (empty if the sweep does not return); further
+# segments, e.g. of repeated cycles, are in .segments. Ig and Vd are None if the data file does not contain them.
+# the arrays are read-only since views share them
+class TransferSweep():
+    __slots__ = ("Vg", "Id", "Ig", "Vd", "turns")
+
+    def __init__(self, Vg, Id, Ig=None, Vd=None, turns=None, dtype=np.float64):
+        # np.array copies, so the sweep never keeps e.g. the block of a DataFrame it was taken from alive
+        self.Vg, self.Id, self.Ig, self.Vd = [None if a is None else np.array(a, dtype=dtype) for a in (Vg, Id, Ig, Vd)]
+        for a in self.arrays(): a.setflags(write=False)
+        self.turns = sweep_turning_points(self.Vg) if turns is None else np.asarray(turns, dtype=int)
+
+    def __len__(self):
+        return len(self.Vg)
+
+    def arrays(self):
+        return [a for a in (self.Vg, self.Id, self.Ig, self.Vd) if a is not None]
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays())
+
+    # index of the first datapoint of the back sweep (len(sweep) if there is none)
+    @property
+    def split(self):
+        return int(self.turns[0]) if len(self.turns) else len(self)
+
+    # slices of the segments in the order they were measured; they can be used for any array of the same length as the
+    # sweep (smoothed data, derivatives, ...)
+    def segment_slices(self):
+        bounds = [0, *self.turns.tolist(), len(self)]
+        return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    @property
+    def segments(self):
+        return [self.view(sl.start, sl.stop) for sl in self.segment_slices()]
+
+    @property
+    def fwd(self):
+        return self.view(0, self.split)
+
+    @property
+    def back(self):
+        return self.view(self.split, int(self.turns[1]) if len(self.turns) > 1 else len(self))
+
+    # whether the turning point is measured only once (e.g. a symmetric sweep with an odd number of datapoints), i.e.
+    # it is the last datapoint of the fwd as well as the first of the back sweep. a turning point that is measured
+    # twice (even number of datapoints) is the first datapoint of the back sweep only
+    def shared_turning_point(self, tolerance=.5):
+        if not len(self.turns): return False
+        dV = np.abs(np.diff(self.Vg.astype(float)))
+        return bool(dV[self.split - 1] > tolerance * np.percentile(dV, 90))
+
+    # "fwd", "back" or the whole sweep for anything else (e.g. fitRestriction "mean" or None)
+    def direction(self, direction):
+        return self.fwd if direction == "fwd" else self.back if direction == "back" else self
+
+    def view(self, start, stop):
+        view = TransferSweep.__new__(TransferSweep)
+        view.Vg, view.Id, view.Ig, view.Vd = [None if a is None else a[start:stop] for a in (self.Vg, self.Id, self.Ig, self.Vd)]
+        view.turns = self.turns[(self.turns > start) & (self.turns < stop)] - start
+        return view
+
+
 class TransistorAnalysis():
+    @traced("TransistorAnalysis")
     def __init__(self, W, L, C_ox, carrier_type='p', filenames=None, filetype=None,
                  fd=.75, sd=.4, smoothing=.25, V_DS = -.1, isTLM=False,
                  manualFitRange={'lin':False,
@@ -485,10 +1987,15 @@ class TransistorAnalysis():
                                 'ssw':False},
                  fitRestriction=None,  # could be "fwd", "back" or "mean" otherwise
                  ss_region = 'lin', oor_region = 'sat', oor_avg = 4, column_settings={"names":None,"skiprows":None},
-                 sample_name=None
+                 sample_name=None, sweep_dtype=np.float64, sat_refine=True, archive=None, prefetch=None
                  ):
         # input of W,L,C_ox in µm and µF/cm², respectively. fd and sd are thresholds for automatic data fit
+        # sat_refine=False uses the closed form line through sqrt(Id) as result of the saturation fit, see fit_mobility_sat
+        # archive: SweepArchive the data of the files is taken from (files that are not in it are read as usual)
+        # prefetch: FilePrefetcher that reads the files ahead (see TLM_Analysis)
 
+        self._fit_cache = {}  # results of fit_mobility_lin/sat, subthreshold_swing and on_off_ratio, see memoize_fit()
+        self.fit_diagnostics = {}  # counters of the last run of each fit method, see diagnose_fit()
         self.filenames = filenames
         self.filetype = filetype
 
@@ -505,104 +2012,60 @@ class TransistorAnalysis():
         self.ss_region = ss_region
         self.oor_region = oor_region
         self.oor_avg_window = oor_avg
+        self.sat_refine = sat_refine
         self.f = -1 if self.carrier_type == 'p' else 1 if self.carrier_type == 'n' else None
         self.column_names = i.split(";") if ((i:=column_settings["names"]) is not None) else None
         self.skiprows = column_settings["skiprows"]
+        self.sweep_dtype = sweep_dtype
+        self.linear_sweep, self.saturation_sweep = None, None  # TransferSweep of the data files, see read_sweep()
+        self.RW, self.overdrive_voltage, self.overdrive_index = None, None, None  # see prepare_TLM()
+
+        # files that are in an archive (see SweepArchive) are not opened at all, the preset is known from the archive
+        archived = {regime: None if archive is None else archive.entry(f_) for regime, f_ in self.filenames.items()}
+        source = (lambda f_: f_) if prefetch is None else prefetch.source
+        from_archive = archive is not None and all(archived[regime] is not None for regime, f_ in self.filenames.items()
+                                                   if f_ is not None)
+        if from_archive:
+            if self.filetype is None: self.filetype = next((e["preset"] for e in archived.values() if e is not None), None)
+            transfer_column_names, skiprows, sep = None, None, None
+        else:
+            with tracer.span("preset detection", "io"):
+                try:
+                    c = pd.read_table(source(self.filenames['lin']),nrows=5).columns
+                    file_ext = self.filenames['lin'].split('.')[-1]
+                except:
+                    try:
+                        c = pd.read_table(source(self.filenames['sat']),nrows=5).columns
+                        file_ext = self.filenames['sat'].split('.')[-1]
+                    except:
+                        c = []
+                        try: file_ext = self.filenames['lin'].split('.')[-1]
+                        except: file_ext = self.filenames['sat'].split('.')[-1]
+                        pass
 
-        try:
-            c = pd.read_table(self.filenames['lin'],nrows=5).columns
-            file_ext = self.filenames['lin'].split('.')[-1]
-        except:
-            try:
-                c = pd.read_table(self.filenames['sat'],nrows=5).columns
-                file_ext = self.filenames['sat'].split('.')[-1]
-            except:
-                c = []
-                try: file_ext = self.filenames['lin'].split('.')[-1]
-                except: file_ext = self.filenames['sat'].split('.')[-1]
-                pass
-
-        if self.filetype is None: self.filetype = "SweepMe!" if any(['_gate' in i for i in c])\
-            else "Goettingen" if any(["GOETT" in i for i in [j for j in self.filenames.values() if j is not None]])\
-            else "LabVIEW" if (any(['GS' in i for i in c]) and any([i == file_ext for i in ["dat","DAT"]]))\
-            else "ParameterAnalyzer" if file_ext=="TXT"\
-            else False
-
-        if self.filetype == "Custom":
-            transfer_column_names = {'lin':self.column_names,'sat':[i.replace('lin','sat') for i in self.column_names]}
-            skiprows = self.skiprows
-            sep = "\t"
-            print("Use custom data preset on your own risk. Errors in syntax, column names etc can happen!!")
-
-        elif self.filetype == "SweepMe!":
-            transfer_column_names = {
-                'lin':['time_elapsed', 'timestamp', 'lin_source Voltage', 'lin_source Current', 'lin_source Resistance',
-                       'lin_drain Voltage', 'lin_drain Current', 'lin_drain Resistance',
-                       'lin_gate Voltage', 'lin_gate Current', 'lin_gate Resistance'],
-                'sat':['time_elapsed', 'timestamp', 'sat_source Voltage', 'sat_source Current', 'sat_source Resistance',
-                       'sat_drain Voltage', 'sat_drain Current', 'sat_drain Resistance',
-                       'sat_gate Voltage', 'sat_gate Current', 'sat_gate Resistance']} if any(['Resistance' in i for i in c]) else {
-                'lin': ['time_elapsed', 'timestamp', 'lin_source Voltage', 'lin_source Current', 'lin_drain Voltage',
-                        'lin_drain Current', 'lin_gate Voltage', 'lin_gate Current'],
-                'sat': ['time_elapsed', 'timestamp', 'sat_source Voltage', 'sat_source Current', 'sat_drain Voltage',
-                        'sat_drain Current', 'sat_gate Voltage', 'sat_gate Current']}
-            skiprows = 3
-            sep = "\t"
-
-        elif self.filetype == "Marburg":
-            transfer_column_names = {
-                'lin': ['time_elapsed', 'timestamp', 'lin_drain Voltage', 'lin_drain Current',
-                        'lin_drain Resistance', 'lin_gate Voltage', 'lin_gate Current', 'lin_gate Resistance'],
-                'sat': ['time_elapsed', 'timestamp', 'sat_drain Voltage','sat_drain Resistance',
-                        'sat_drain Current', 'sat_gate Voltage', 'sat_gate Current', 'sat_gate Resistance']} if any(['Resistance' in i for i in c]) else {
-                'lin': ['time_elapsed', 'timestamp', 'lin_drain Voltage',
-                        'lin_drain Current', 'lin_gate Voltage', 'lin_gate Current'],
-                'sat': ['time_elapsed', 'timestamp', 'sat_drain Voltage',
-                        'sat_drain Current', 'sat_gate Voltage', 'sat_gate Current']}
-            skiprows = 3
-            sep = "\t"
-
-        elif self.filetype == "Goettingen":
-            transfer_column_names = {
-                'lin':['lin_drain Voltage', 'lin_gate Voltage', 'lin_drain Current', 'lin_gate Current', 'time_elapsed','empty'],
-                'sat':['sat_drain Voltage', 'sat_gate Voltage', 'sat_drain Current', 'sat_gate Current', 'time_elapsed','empty']
-            }  if self.column_names == None else self.column_names
-            skiprows = 4
-            sep = "\t"
+                if self.filetype is None: self.filetype = "SweepMe!" if any(['_gate' in i for i in c])\
+                    else "Goettingen" if any(["GOETT" in i for i in [j for j in self.filenames.values() if j is not None]])\
+                    else "LabVIEW" if (any(['GS' in i for i in c]) and any([i == file_ext for i in ["dat","DAT"]]))\
+                    else "ParameterAnalyzer" if file_ext=="TXT"\
+                    else False
 
-        elif self.filetype == "LabVIEW":
-            transfer_column_names = {
-                'lin':['lin_gate Voltage', 'time', 'lin_drain Current', 'lin_gate Current', 'abs_lin_drain_current',
-                       'abs_lin_gate_current', 'sqrt_lin_drain_current', '1stderiv_lin_drain_current', '2ndderiv_lin_drain_current'],
-                'sat':['sat_gate Voltage', 'time', 'sat_drain Current', 'sat_gate Current', 'abs_sat_drain_current',
-                       'abs_sat_gate_current', 'sqrt_sat_drain_current','1stderiv_sat_drain_current', '2ndderiv_sat_drain_current']}
-            skiprows = 2
-            sep = "\t"
-
-        elif self.filetype == "ParameterAnalyzer":
-                transfer_column_names = {
-                    'lin':['idx', 'lin_drain Voltage', 'lin_gate Voltage', 'lin_drain Current','lin_gate Current'],
-                    'sat':['idx', 'sat_drain Voltage', 'sat_gate Voltage', 'sat_drain Current','sat_gate Current']}
-                skiprows = 5
-                sep="\t"
-
-        elif self.filetype == "Surrey":
-            transfer_column_names = {
-                'lin': ['rep','point','lin_drain Voltage','lin_drain Current','tdrain','lin_gate Voltage','lin_gate Current','tgate'],
-                'sat': ['rep','point','sat_drain Voltage','sat_drain Current','tdrain','sat_gate Voltage','sat_gate Current','tgate']}
-            skiprows = 1
-            sep = ','
+            transfer_column_names, skiprows, sep = transfer_file_format(self.filetype, c, self.column_names, self.skiprows)
 
 
+        # only the columns needed for the analysis are kept from the files (see TransferSweep), the DataFrame itself is
+        # dropped after reading. linear_Vg, linear_Id etc. are Series that share the memory of the sweep
         if self.filenames['lin'] is not None:
             try:
-                self.transfer_data_linear = pd.read_table(self.filenames['lin'],
-                                                          skiprows=skiprows,
-                                                          names=transfer_column_names['lin'],
-                                                          header=None, index_col=None, sep=sep)
-                self.linear_Vg = self.transfer_data_linear['lin_gate Voltage']
-                self.linear_Id = self.f * self.transfer_data_linear['lin_drain Current'] + 1e-15 # needed for log description I think? comment Sept 2021
-                self.linear_Ig = self.f * self.transfer_data_linear['lin_gate Current']
+                if archived['lin'] is not None:
+                    with tracer.span("read archive", "io", file=self.filenames['lin']):
+                        self.linear_sweep = archive.sweep(self.filenames['lin'], self.f, self.sweep_dtype)
+                else:
+                    with tracer.span("read file", "io", file=self.filenames['lin']):
+                        self.linear_sweep = self.read_sweep(pd.read_table(source(self.filenames['lin']),
+                                                                          skiprows=skiprows,
+                                                                          names=transfer_column_names['lin'],
+                                                                          header=None, index_col=None, sep=sep), 'lin')
+                self.linear_Vg, self.linear_Id, self.linear_Ig = self.sweep_series(self.linear_sweep, 'lin')
 
             except:
                 print("Something went wrong during reading of the datafile for Transistor Analysis (linear).")
@@ -610,116 +2073,244 @@ class TransistorAnalysis():
 
         if self.filenames['sat'] is not None:
             try:
-                self.transfer_data_saturation = pd.read_table(self.filenames['sat'],
-                                                              skiprows=skiprows,
-                                                              names=transfer_column_names['sat'],
-                                                              header=None, index_col=None)
-                self.saturation_Vg = self.transfer_data_saturation['sat_gate Voltage']
-                self.saturation_Id = self.f * self.transfer_data_saturation['sat_drain Current'] + 1e-15 # needed for log description I think? comment Sept 2021
-                self.saturation_Ig = self.f * self.transfer_data_saturation['sat_gate Current']
+                if archived['sat'] is not None:
+                    with tracer.span("read archive", "io", file=self.filenames['sat']):
+                        self.saturation_sweep = archive.sweep(self.filenames['sat'], self.f, self.sweep_dtype)
+                else:
+                    with tracer.span("read file", "io", file=self.filenames['sat']):
+                        self.saturation_sweep = self.read_sweep(pd.read_table(source(self.filenames['sat']),
+                                                                              skiprows=skiprows,
+                                                                              names=transfer_column_names['sat'],
+                                                                              header=None, index_col=None), 'sat')
+                self.saturation_Vg, self.saturation_Id, self.saturation_Ig = self.sweep_series(self.saturation_sweep, 'sat')
             except:
                 print("Something went wrong during reading of the datafile for Transistor Analysis (saturation.")
 
 
 
+        # the overdrive voltage data for the TLM is prepared in a separate method, so TLM_Analysis can re-run it on
+        # the same object (e.g. with common derivative thresholds) without reading the data file again
+        if isTLM: self.prepare_TLM()
+
+
+    # the currents are stored with the sign used throughout the analysis (positive for the carrier type)
+    def read_sweep(self, data, regime='lin'):
+        column = lambda name: data[f'{regime}_{name}'] if f'{regime}_{name}' in data.columns else None
+        return TransferSweep(column('gate Voltage'),
+                             self.f * data[f'{regime}_drain Current'].to_numpy(dtype=float) + 1e-15,  # needed for log description I think? comment Sept 2021
+                             None if (i := column('gate Current')) is None else self.f * i.to_numpy(dtype=float),
+                             column('drain Voltage'), dtype=self.sweep_dtype)
+
+    @staticmethod
+    def sweep_series(sweep, regime='lin'):
+        return (pd.Series(sweep.Vg, name=f'{regime}_gate Voltage', copy=False),
+                pd.Series(sweep.Id, name=f'{regime}_drain Current', copy=False),
+                None if sweep.Ig is None else pd.Series(sweep.Ig, name=f'{regime}_gate Current', copy=False))
+
+    # the data files are not kept (see TransferSweep). for export, the columns of the sweeps are put together again
+    # with the measured sign of the currents, incl. RW and overdrive voltage once prepared for the TLM
+    @property
+    def transfer_data_linear(self):
+        return self.transfer_data('lin')
+
+    @property
+    def transfer_data_saturation(self):
+        return self.transfer_data('sat')
+
+    def transfer_data(self, regime='lin'):
+        sweep = self.linear_sweep if regime == 'lin' else self.saturation_sweep
+        if sweep is None: return None
+        columns = {f'{regime}_drain Voltage': sweep.Vd, f'{regime}_drain Current': self.f * (sweep.Id - 1e-15),
+                   f'{regime}_gate Voltage': sweep.Vg, f'{regime}_gate Current': None if sweep.Ig is None else self.f * sweep.Ig}
+        if regime == 'lin' and self.RW is not None:
+            columns.update({'RW': self.RW, 'overdrive_voltage': self.overdrive_voltage})
+        return pd.DataFrame({key: value for key, value in columns.items() if value is not None})
+
+    # overdrive voltage, RW and gate voltage of the datapoints above threshold (see prepare_TLM), of the fwd or back sweep
+    # or (for anything else, e.g. fitRestriction "mean") of both. a turning point that belongs to both sweeps (see
+    # TransferSweep.shared_turning_point) is used for neither of them, as the first/last half of the datapoints did before
+    def overdrive_arrays(self, direction=None):
+        idx = self.overdrive_index
+        if direction in ["fwd", "back"]:
+            segments = self.linear_sweep.segment_slices()
+            segment = segments[1] if direction == "back" and len(segments) > 1 else segments[0]
+            start = segment.start + (segment.start > 0 and self.linear_sweep.shared_turning_point())
+            idx = idx[(idx >= start) & (idx < segment.stop)]
+        return self.overdrive_voltage[idx], self.RW[idx], self.linear_sweep.Vg[idx]
+
+    # fwd and back sweep of a regime as slices that run from the off to the on state, i.e. for a usual measurement the
+    # fwd sweep as it is and the back sweep from its last datapoint to the turning point. they are views for all arrays
+    # of the length of the sweep (data, smoothed data, derivatives). a sweep that does not return is used as fwd and
+    # back sweep, so fwd, back and mean results coincide; further segments (repeated cycles) are not used
+    def direction_slices(self, regime='lin'):
+        sweep = self.linear_sweep if regime == 'lin' else self.saturation_sweep
+        slices = []
+        for sl in sweep.segment_slices()[:2]:
+            # p-type transistors are switched on towards negative, n-type towards positive gate voltage
+            if (sweep.Vg[sl.stop - 1] < sweep.Vg[sl.start]) == (self.carrier_type == 'p'): slices.append(sl)
+            else: slices.append(slice(sl.stop - 1, sl.start - 1 if sl.start > 0 else None, -1))
+        return slices if len(slices) == 2 else slices * 2
+
+    # indices of the datapoints of the fwd and back sweep that may be used in the fits, in the order of
+    # direction_slices(). the first datapoint of the measurement and the turning point are never used, the first
+    # `ignore` datapoints of each direction (off state) are left out as well
+    def fit_candidates(self, regime='lin', ignore=0):
+        sweep = self.linear_sweep if regime == 'lin' else self.saturation_sweep
+        excluded = np.zeros(len(sweep), dtype=bool)
+        excluded[0], excluded[sweep.turns] = True, True
+        candidates = []
+        for sl in self.direction_slices(regime):
+            idx = np.arange(len(sweep))[sl][ignore:]
+            candidates.append(idx[~excluded[idx]])
+        return candidates
+
+    ###################### some Analysis included (needed) for overdrive voltage ####################
+    @traced()
+    def prepare_TLM(self):
         try:
-            ###################### some Analysis included (needed) for overdrive voltage ####################
-            if isTLM:
+            # check if there is a "lin" in the file name. this will save time searching errors in case
+            # some idiot (me) includes saturation/output data in the file list
+            if not any([i in self.filenames["lin"] for i in ["_lin","_tl"]]):
+                print("Check loaded data files, there is one without a 'lin' in them - maybe loaded wrong for TLM?")
 
-                # check if there is a "lin" in the file name. this will save time searching errors in case
-                # some idiot (me) includes saturation/output data in the file list
-                if not any([i in self.filenames["lin"] for i in ["_lin","_tl"]]):
-                    print("Check loaded data files, there is one without a 'lin' in them - maybe loaded wrong for TLM?")
+            fml = self.fit_mobility_lin()
+            ssw = self.subthreshold_swing()
 
-                fml = self.fit_mobility_lin()
-                ssw = self.subthreshold_swing()
-
-                # this is used to plot single channel length fits in a separate tab
-                try:
-                    self.linearFitData = fml[3]
-                except:
-                    print(self.channel_length*1e6)
-
-                if fml is None:
-                    self.Vth = None
-                    print(f'L={self.channel_length:.2e}m cant be fitted for Vth and will be ignored in the TLM analysis.')
-                else:
-                    popts_fml = fml[0]
-                    if self.fitRestriction == "mean":
-                        self.Vth = popts_fml['mean'][1]
-
-                    elif self.fitRestriction == "fwd":
-                        self.Vth = popts_fml['fwd'][1]
-
-                    elif self.fitRestriction == "back":
-                        self.Vth = popts_fml['back'][1]
+            # this is used to plot single channel length fits in a separate tab
+            try:
+                self.linearFitData = fml[3]
+            except:
+                print(self.channel_length*1e6)
 
-                if ssw is None:
-                    self.SSw = np.nan
-                    print(f'L={self.channel_length:.2e}m has problems with SSw fitting.')
-                else:
-                    popts_ssw = ssw[0]
-                    if self.fitRestriction == "mean":
-                        self.SSw = -1000 / popts_ssw['mean'][0]
+            if fml is None:
+                self.Vth = None
+                print(f'L={self.channel_length:.2e}m cant be fitted for Vth and will be ignored in the TLM analysis.')
+            else:
+                popts_fml = fml[0]
+                if self.fitRestriction == "mean":
+                    self.Vth = popts_fml['mean'][1]
 
-                    elif self.fitRestriction == "fwd":
-                        self.SSw = -1000 / popts_ssw['fwd'][0]
+                elif self.fitRestriction == "fwd":
+                    self.Vth = popts_fml['fwd'][1]
 
-                    elif self.fitRestriction == "back":
-                        self.SSw = -1000 / popts_ssw['back'][0]
+                elif self.fitRestriction == "back":
+                    self.Vth = popts_fml['back'][1]
 
+            if ssw is None:
+                self.SSw = np.nan
+                print(f'L={self.channel_length:.2e}m has problems with SSw fitting.')
+            else:
+                popts_ssw = ssw[0]
+                if self.fitRestriction == "mean":
+                    self.SSw = -1000 / popts_ssw['mean'][0]
 
-                # determining the average step size (assumes linear spacing!!) since SweepMe! measures the exact voltage,
-                # Vg_stepsize is not necessarily equal to the nominal step size.
-                self.Vg_stepsize = np.abs(np.mean([self.transfer_data_linear['lin_gate Voltage'][i+1] - self.transfer_data_linear['lin_gate Voltage'][i]
-                       for i in range(len(self.transfer_data_linear['lin_gate Voltage'])//2-1)]))
+                elif self.fitRestriction == "fwd":
+                    self.SSw = -1000 / popts_ssw['fwd'][0]
 
-                def find_nearest(array, value):
-                    array = np.asarray(array)
-                    idx = (np.abs(array - value)).argmin()
-                    return array[idx]
-                Vth_round = np.round(find_nearest(np.arange(-50, 50, self.Vg_stepsize), self.Vth), 2)
+                elif self.fitRestriction == "back":
+                    self.SSw = -1000 / popts_ssw['back'][0]
 
-                # RW in Ohm cm
-                self.transfer_data_linear['RW'] = self.channel_width * self.linear_source_drain_voltage / self.transfer_data_linear['lin_drain Current']
-                self.transfer_data_linear['overdrive_voltage'] = self.transfer_data_linear['lin_gate Voltage'] - Vth_round
-                if self.carrier_type == 'p': self.overdrive_data = self.transfer_data_linear[self.transfer_data_linear['overdrive_voltage'] <= 0]
-                elif self.carrier_type == 'n': self.overdrive_data = self.transfer_data_linear[self.transfer_data_linear['overdrive_voltage'] >= 0]
+            self.prepare_overdrive()
 
         except:
             self.Vth = None
-            if isTLM:
-                #print_exc()
-                print(f'L={self.channel_length:.2e}m cant be fitted and will be ignored in the TLM analysis.')
-
-
+            #print_exc()
+            print(f'L={self.channel_length:.2e}m cant be fitted and will be ignored in the TLM analysis.')
+
+    # overdrive voltage and RW of every datapoint for the threshold voltage in self.Vth (see prepare_TLM), and the
+    # datapoints above threshold
+    def prepare_overdrive(self):
+        # determining the average step size (assumes linear spacing!!) since SweepMe! measures the exact voltage,
+        # Vg_stepsize is not necessarily equal to the nominal step size.
+        Vg = self.linear_sweep.Vg
+        self.Vg_stepsize = np.abs(np.mean(np.diff(self.linear_sweep.fwd.Vg)))
+
+        def find_nearest(array, value):
+            array = np.asarray(array)
+            idx = (np.abs(array - value)).argmin()
+            return array[idx]
+        Vth_round = np.round(find_nearest(np.arange(-50, 50, self.Vg_stepsize), self.Vth), 2)
+
+        # RW in Ohm cm (from the measured drain current, i.e. with its original sign)
+        self.RW = self.channel_width * self.linear_source_drain_voltage / (self.f * (self.linear_sweep.Id - 1e-15))
+        self.overdrive_voltage = Vg - Vth_round
+        if self.carrier_type == 'p': self.overdrive_index = np.flatnonzero(self.overdrive_voltage <= 0)
+        elif self.carrier_type == 'n': self.overdrive_index = np.flatnonzero(self.overdrive_voltage >= 0)
+
+
+    # the fit methods are memoized (see memoize_fit()); changed fit settings are part of the cache key, but if the
+    # underlying data is replaced (e.g. linear_sweep reassigned), the cache has to be emptied by hand
+    def clear_fit_cache(self):
+        self._fit_cache = {}
+
+    # the analysis runs in stages: parse (__init__) -> smooth -> derivatives -> window selection -> fit.
+    # smoothed data and derivatives only depend on the regime data and the smoothing factor, so they are cached on their
+    # own; changing e.g. the derivative thresholds or the manual fit range then only redoes window selection and fit.
+    # the returned arrays are shared between calls and therefore read-only
+    @memoize_fit('smoothing')
+    @traced("smoothing", "smoothing")
+    def smoothed_derivatives(self, regime='lin'):
+        y_data = (self.linear_sweep if regime == 'lin' else self.saturation_sweep).Id
+        stages = (smoothing(y_data, gauss_s=self.smoothing),
+                  first_derivative(y_data, gauss_s=self.smoothing),
+                  second_derivative(y_data, gauss_s=self.smoothing))
+        for a_ in stages: a_.setflags(write=False)
+        return stages
+
+    @memoize_fit('smoothing')
+    @traced("smoothing", "smoothing")
+    def smoothed_log_derivative(self, regime='lin'):
+        y_data = (self.linear_sweep if regime == 'lin' else self.saturation_sweep).Id
+        fd = first_derivative(np.log10(np.abs(y_data)), gauss_s=self.smoothing)  # np.abs is needed to account for negative noise values
+        fd.setflags(write=False)
+        return fd
+
+    # change fit settings of an existing object instead of creating (and re-reading the files for) a new one.
+    # same units as in __init__; arguments that are None stay as they are. because the settings are part of the
+    # cache keys, only the stages downstream of a changed setting are run again on the next call of the fit methods
+    def update_parameters(self, W=None, L=None, C_ox=None, fd=None, sd=None, smoothing=None, V_DS=None,
+                          manualFitRange=None, ss_region=None, oor_region=None, oor_avg=None, sat_refine=None):
+        if W is not None: self.channel_width = W * 1e-6
+        if L is not None: self.channel_length = L * 1e-6
+        if C_ox is not None: self.capacitance_oxide = C_ox * 1e-6
+        if fd is not None: self.first_deriv_limit = fd
+        if sd is not None: self.second_deriv_limit = sd
+        if smoothing is not None: self.smoothing = smoothing
+        if V_DS is not None: self.linear_source_drain_voltage = V_DS
+        if manualFitRange is not None: self.manualFitRanges = manualFitRange
+        if ss_region is not None: self.ss_region = ss_region
+        if oor_region is not None: self.oor_region = oor_region
+        if oor_avg is not None: self.oor_avg_window = oor_avg
+        if sat_refine is not None: self.sat_refine = sat_refine
+        return self
+
+    @memoize_fit('oor_region', 'oor_avg_window')
+    @traced()
     def on_off_ratio(self, ignore=2):
         # calculate the on-off-ratio for saturation regime
         # average the maximum and minimum values to account for noisy data, especially in the off state
         # differentiate between fwd and back sweep
         # python can throw RuntimeWarning because the averaging data can be empty ->
         # and the division for the ration could be infinite
-        try:
-            if self.oor_region == 'lin': I_d = self.linear_Id
-            elif self.oor_region == 'sat': I_d = self.saturation_Id
-        except AttributeError: return False
+        sweep = self.linear_sweep if self.oor_region == 'lin' else self.saturation_sweep if self.oor_region == 'sat' else None
+        if sweep is None: return False
+        I_d = sweep.Id
         a = ignore
-        b = -ignore
-        halflength = len(I_d) // 2
 
-        # abs needed, otherwise log10 might return np.nan
-        I_fwd = np.abs(I_d[a:halflength])
-        I_back = np.abs(I_d[halflength:b])
+        # abs needed, otherwise log10 might return np.nan. the first datapoints of each direction (off state) are ignored
+        fwd, back = self.direction_slices(self.oor_region)
+        I_fwd = np.sort(np.abs(I_d[fwd][a:])); I_fwd = I_fwd[~np.isnan(I_fwd)]
+        I_back = np.sort(np.abs(I_d[back][a:])); I_back = I_back[~np.isnan(I_back)]
         avg_window = self.oor_avg_window
 
         #min_fwd, min_back = np.mean(I_fwd[:avg_window]), np.mean(   # old, faulty way to do it. prerequisite is that off state is at beginning of data
         #    I_back[-avg_window:])
-        min_fwd, min_back = I_fwd.sort_values(ascending=True).iloc[0:avg_window].mean(), I_back.sort_values(ascending=True).iloc[0:avg_window].mean()
+        min_fwd, min_back = I_fwd[:avg_window].mean(), I_back[:avg_window].mean()
         min_mean = (min_fwd + min_back) / 2
 
         #max_fwd, max_back = np.mean(I_fwd[-avg_window:]), np.mean(
         #    I_back[:avg_window])
-        max_fwd, max_back = I_fwd.sort_values(ascending=False).iloc[0:avg_window].mean(), I_back.sort_values(ascending=False).iloc[0:avg_window].mean()
+        max_fwd, max_back = I_fwd[::-1][:avg_window].mean(), I_back[::-1][:avg_window].mean()
         max_mean = (max_fwd + max_back) / 2
 
         r_fwd = np.log10(max_fwd / min_fwd)
@@ -728,28 +2319,35 @@ class TransistorAnalysis():
         return r_fwd, r_back, r_mean, (
             min_mean, max_mean)  # 3-tuple of log-ratios given in decades
 
+    @memoize_fit('ss_region', 'smoothing', 'carrier_type', ('manualFitRanges', 'ssw'))
+    @traced(category="window search")
+    @diagnose_fit
     def subthreshold_swing(self, ignore=10):
-        if self.ss_region == 'lin':
-            x = self.linear_Vg
-            y = self.linear_Id
-        elif self.ss_region == 'sat':
-            x = self.saturation_Vg
-            y = self.saturation_Id
-        # ignore the first a steps for fwd and the last 10 steps for back sweep to cut out noisy off state
+        sweep = self.linear_sweep if self.ss_region == 'lin' else self.saturation_sweep
+        x, y = sweep.Vg, sweep.Id
+        # ignore the first a steps of fwd and back sweep (from the off state on, see fit_candidates) to cut out noisy off state
         a = ignore
-        b = -a
-        halflength = len(x) // 2
+        fwd_idx, back_idx = [i_[(i_ >= a) & (i_ < len(y) - a)] for i_ in self.fit_candidates(self.ss_region, ignore=a)]  # the ends of the data are not smoothed properly
+        manual_fwd_idx, manual_back_idx = self.fit_candidates(self.ss_region)
         fd_input = self.first_deriv_limit
 
         # determine the datapoints around the linear part of the curve by normalizing to the largest 1st derivative
-        # and taking only values where the 1st derivative is larger than a set value; differentiate between fwd and back
-        fd = first_derivative(np.log10(np.abs(
-            y)),gauss_s=self.smoothing)  # np.abs is needed to account for negative noise values
-        max_slope = np.amax(fd[a:halflength])
+        # and taking only values where the 1st derivative is larger than a set value; differentiate between fwd and back.
+        # the derivative is taken along the datapoints, so it changes sign for a direction that runs backwards in the data
+        fd = self.smoothed_log_derivative(self.ss_region)  # first derivative of log10(|Id|), see stage cache below
+        fwd_sign, back_sign = [sl.step or 1 for sl in self.direction_slices(self.ss_region)]
+        max_slope = np.amax(fwd_sign * fd[fwd_idx])
         norm = fd / max_slope
+        # local maxima (spikes) of the current are never used in the fit
+        spike = np.zeros(len(y), dtype=bool)
+        spike[2:-2] = (y[4:] < y[2:-2]) & (y[:-4] < y[2:-2])
+        # with a manual fit range every iteration selects the same datapoints, one is enough then
+        diagnostics = self.fit_diagnostics['subthreshold_swing']
+        fixed_selection = self.manualFitRanges['ssw'] is not False
         breakall = False
         for ff_ in np.arange(1, 0, -.1):
-            if breakall: break
+            if breakall or (fixed_selection and diagnostics["iterations"] > 0): break
+            diagnostics["iterations"] += 1
 
             #####
             # FOR NOW THIS FEATURE OF SETTING THE THRESHOLD MANUALL IS DISABLED
@@ -765,44 +2363,26 @@ class TransistorAnalysis():
 
             try:
                 if self.manualFitRanges['ssw'] is False:
-                    xfit_fwd, yfit_fwd, xfit_back, yfit_back = [], [], [], []
-                    for i in range(len(x[a:halflength])):
-                        # iloc indexing is needed because pandas doesnt allow negative indexing natively (?)
-                        if (norm[a + i] > min_val) and not (
-                                (y.iloc[a + i + 2] < y.iloc[a + i]) and
-                                (y.iloc[a + i - 2] < y.iloc[a + i])):
-                            xfit_fwd.append(x.iloc[a + i])
-                            yfit_fwd.append(y.iloc[a + i])
-                        if (-norm[b - i] > min_val) and not (
-                                (y.iloc[b - i + 2] < y.iloc[b - i]) and
-                                (y.iloc[b - i - 2] < y.iloc[b - i])):
-                            xfit_back.append(x.iloc[b - i])
-                            yfit_back.append(y.iloc[b - i])
+                    fwd_fit = fwd_idx[(fwd_sign * norm[fwd_idx] > min_val) & ~spike[fwd_idx]]
+                    back_fit = back_idx[(back_sign * norm[back_idx] > min_val) & ~spike[back_idx]]
                 else:
                     xmin, xmax = self.manualFitRanges['ssw']
                     if xmin > xmax: xmin_ = xmin; xmin= xmax; xmax = xmin_; del xmin_
 
-                    xfit_fwd, yfit_fwd, xfit_back, yfit_back = [], [], [], []
-                    for i in range(len(x) // 2):
-                        if i == 0:
-                            continue
-                        if xmax > x.iloc[i] > xmin:
-                            xfit_fwd.append(x.iloc[i])
-                            yfit_fwd.append(y.iloc[i])
-                        if xmax > x.iloc[-i] > xmin:
-                            xfit_back.append(x.iloc[-i])
-                            yfit_back.append(y.iloc[-i])
-
-                xfit_fwd, yfit_fwd, xfit_back, yfit_back = np.array(
-                    xfit_fwd), np.array(yfit_fwd), np.array(xfit_back), np.array(
-                    yfit_back)
+                    fwd_fit = manual_fwd_idx[(xmax > x[manual_fwd_idx]) & (x[manual_fwd_idx] > xmin)]
+                    back_fit = manual_back_idx[(xmax > x[manual_back_idx]) & (x[manual_back_idx] > xmin)]
+
+                xfit_fwd, yfit_fwd, xfit_back, yfit_back = x[fwd_fit], y[fwd_fit], x[back_fit], y[back_fit]
                 xfit_tot, yfit_tot = np.concatenate(
                     (xfit_fwd, xfit_back)), np.concatenate((yfit_fwd, yfit_back))
 
                 def linear_regression(x, a, b):
                     return a * x + b
 
-                if len(xfit_fwd)<3 or len(xfit_back)<3: continue
+                if len(xfit_fwd)<3 or len(xfit_back)<3:
+                    diagnostics["failures"]["too few datapoints"] += 1
+                    continue
+                diagnostics["attempts"] += 1
                 popt_fwd, pcov_fwd = curve_fit(linear_regression, xfit_fwd,
                                                np.log10(np.abs(yfit_fwd)),check_finite=True)
                 popt_back, pcov_back = curve_fit(linear_regression, xfit_back,
@@ -840,38 +2420,50 @@ class TransistorAnalysis():
                 return popts, fitresult_data, fit_data, errors, automatic_determination
                 #return popt_fwd, popt_back, popt_tot, popt_mean, xfit_fwd, xfit_back, x_plot_line, yfit_fwd, yfit_back, min_val, errors
 
-            except: continue
+            except Exception as e:
+                diagnostics["failures"][fit_failure_reason(e)] += 1
+                continue
 
 
+    @memoize_fit('smoothing', 'first_deriv_limit', 'second_deriv_limit', ('manualFitRanges', 'lin'),
+                 'linear_source_drain_voltage', 'channel_width', 'channel_length', 'capacitance_oxide', 'carrier_type')
+    @traced(category="window search")
+    @diagnose_fit
     def fit_mobility_lin(self):
 
-        x_data = self.linear_Vg
-        y_data = self.linear_Id
+        x_data = self.linear_sweep.Vg
+        y_data = self.linear_sweep.Id
         V_d = self.linear_source_drain_voltage
         Z = self.channel_width
         L = self.channel_length
         C_ox = self.capacitance_oxide
-        halflength = len(x_data) // 2
+        halflength = self.linear_sweep.split  # first datapoint of the back sweep
+        fwd, back = self.direction_slices('lin')
+        fwd_idx, back_idx = self.fit_candidates('lin')
         fd_input = self.first_deriv_limit
         sd_input = self.second_deriv_limit
 
-        y_smooth = smoothing(y_data,gauss_s=self.smoothing)
-        first_deriv = first_derivative(y_data,gauss_s=self.smoothing)
-        second_deriv = second_derivative(y_data,gauss_s=self.smoothing)
+        y_smooth, first_deriv, second_deriv = self.smoothed_derivatives('lin')
 
         # normalization in order to avoid hardcoding - derivative values w/o normalization are somewhat random
         # 07.01.2021: added limitation for the maximum to be close to operating voltages so that random spikes
         # in the derivative in the off state cannot mess up the fitting; requires hardcoded >1e2 on-off-ratio
-        first_deriv /= np.max(np.abs(first_deriv[np.abs(y_data) > 1e2*np.min(np.abs(y_data))]))
-        second_deriv /= np.max(np.abs(second_deriv[10:halflength - 10][np.abs(y_data[10:halflength - 10]) > 1e2*np.min(np.abs(y_data[10:halflength - 10]))]))
+        # (no in-place division, the derivatives come from the stage cache). the first and last 10 datapoints are not used,
+        # the smoothing is not valid at the ends of the data (e.g. the on state of a sweep that does not return)
+        first_deriv = first_deriv / np.max(np.abs(first_deriv[10:-10][np.abs(y_data[10:-10]) > 1e2*np.min(np.abs(y_data))]))
+        second_deriv = second_deriv / np.max(np.abs(second_deriv[10:halflength - 10][np.abs(y_data[10:halflength - 10]) > 1e2*np.min(np.abs(y_data[10:halflength - 10]))]))
 
         # automatically determine which datapoints to include in fit. separately for forward and backward sweep
         # note: this could be done so much more elegent with pandas dataframes, but never change a running system (28.3.2022)
+        # with fixed thresholds or a manual fit range every iteration selects the same datapoints, one is enough then
+        diagnostics = self.fit_diagnostics['fit_mobility_lin']
+        fixed_selection = ((sd_input >= 0.01) and (fd_input >= 0.01)) or (self.manualFitRanges['lin'] is not False)
         breakall = False
         for ff_ in np.arange(1, 0, -.1):
             if breakall: break
             for ss_ in np.arange(0, 1, .1):
-                if breakall: break
+                if breakall or (fixed_selection and diagnostics["iterations"] > 0): breakall = True; break
+                diagnostics["iterations"] += 1
                 if (sd_input >= 0.01) and (fd_input >= 0.01):
                     sd_min_val = sd_input; fd_min_val = fd_input#; breakall = True
                 else:
@@ -879,56 +2471,40 @@ class TransistorAnalysis():
 
                 try:
                     if self.manualFitRanges['lin'] is False:
-                        xfit_fwd, yfit_fwd, xfit_back, yfit_back = [], [], [], []
-
-                        for i in range(len(x_data) // 2):
-                            if i == 0:
-                                continue
-                            if (np.abs(second_deriv[i]) < sd_min_val) and (np.abs(
-                                    first_deriv[i]) > fd_min_val):
-                                xfit_fwd.append(x_data.iloc[i])
-                                yfit_fwd.append(y_data.iloc[i])
-                            if (np.abs(second_deriv[-i]) < sd_min_val) and (np.abs(
-                                    first_deriv[-i]) > fd_min_val):
-                                xfit_back.append(x_data.iloc[-i])
-                                yfit_back.append(y_data.iloc[-i])
-                        #print(self.channel_length,xfit_fwd,xfit_back)
+                        selected = (np.abs(second_deriv) < sd_min_val) & (np.abs(first_deriv) > fd_min_val)
 
                     else:
                         xmin, xmax = self.manualFitRanges['lin']
                         if xmin > xmax: xmin_ = xmin; xmin = xmax; xmax = xmin_; del xmin_
 
-                        xfit_fwd, yfit_fwd, xfit_back, yfit_back = [], [], [], []
+                        selected = (xmax > x_data) & (x_data > xmin)
 
-                        for i in range(len(x_data) // 2):
-                            if i == 0:
-                                continue
-                            if xmax > x_data.iloc[i] > xmin:
-                                xfit_fwd.append(x_data.iloc[i])
-                                yfit_fwd.append(y_data.iloc[i])
-                            if xmax > x_data.iloc[-i] > xmin:
-                                xfit_back.append(x_data.iloc[-i])
-                                yfit_back.append(y_data.iloc[-i])
+                    fwd_fit, back_fit = fwd_idx[selected[fwd_idx]], back_idx[selected[back_idx]]
+                    xfit_fwd, yfit_fwd, xfit_back, yfit_back = x_data[fwd_fit], y_data[fwd_fit], x_data[back_fit], y_data[back_fit]
 
                     # ensure that fitting would run smoothly and results would be somewhat reliable
-                    if (len(xfit_fwd) < 3) or (len(xfit_back) < 3): continue
-
-                    # convert python lists to numpy arrays to do easily modify (e.g. multiply by factor)
-                    xfit_fwd, yfit_fwd, xfit_back, yfit_back = np.array(xfit_fwd), np.array(yfit_fwd),\
-                                                               np.array(xfit_back), np.array(yfit_back)
+                    if (len(xfit_fwd) < 3) or (len(xfit_back) < 3):
+                        diagnostics["failures"]["too few datapoints"] += 1
+                        continue
+                    diagnostics["attempts"] += 1
 
                     # fit routine for forward and backward sweep as well as all datapoints selected for the fit (to compare fwd/back mean with total fit)
+                    # the fits start from the line through the selected datapoints (see mobility_lin_guess) instead of
+                    # scipy's default p0 of ones, which is far off in SI units; the total fit starts from the fwd/back mean
+                    p0_fwd = mobility_lin_guess(xfit_fwd, yfit_fwd, V_d, Z, L, C_ox)
                     popt_fwd, pcov_fwd = curve_fit(
                         lambda V_g, mu_eff, V_th: mobility_lin(
-                            V_g, V_d, Z, L, C_ox, mu_eff, V_th), xfit_fwd, yfit_fwd)
+                            V_g, V_d, Z, L, C_ox, mu_eff, V_th), xfit_fwd, yfit_fwd, p0=p0_fwd)
+                    p0_back = mobility_lin_guess(xfit_back, yfit_back, V_d, Z, L, C_ox)
                     popt_back, pcov_back = curve_fit(
                         lambda V_g, mu_eff, V_th: mobility_lin(
-                            V_g, V_d, Z, L, C_ox, mu_eff, V_th), xfit_back, yfit_back)
+                            V_g, V_d, Z, L, C_ox, mu_eff, V_th), xfit_back, yfit_back,
+                        p0=popt_fwd if p0_back is None else p0_back)
                     popt_tot, pcov_tot = curve_fit(
                         lambda V_g, mu_eff, V_th: mobility_lin(V_g, V_d, Z, L, C_ox,
                                                                mu_eff, V_th),
                         np.concatenate((xfit_fwd, xfit_back)),
-                        np.concatenate((yfit_fwd, yfit_back)))
+                        np.concatenate((yfit_fwd, yfit_back)), p0=0.5 * (popt_fwd + popt_back))
                     popt_avg = np.array([
                         0.5 * (popt_fwd[0] + popt_back[0]),
                         0.5 * (popt_fwd[1] + popt_back[1])
@@ -939,10 +2515,10 @@ class TransistorAnalysis():
 
                     breakall = True
 
-                    # caluclate reliability factor (DOI: 10.1038/nmat5035)
-                    y = np.array(y_data)
-                    reliability_fwd = (  (np.max(np.abs(y[:halflength]))-np.abs(y[0]))/np.max(np.abs(x_data[:halflength]))  ) / (np.abs(V_d)*Z*C_ox*popt_fwd[0]/L)
-                    reliability_back = (  (np.max(np.abs(y[halflength:]))-np.abs(y[-1]))/np.max(np.abs(x_data[halflength:]))  ) / (np.abs(V_d)*Z*C_ox*popt_back[0]/L)
+                    # caluclate reliability factor (DOI: 10.1038/nmat5035); the current in the off state is the one at the start of each direction
+                    y = y_data
+                    reliability_fwd = (  (np.max(np.abs(y[fwd]))-np.abs(y[fwd][0]))/np.max(np.abs(x_data[fwd]))  ) / (np.abs(V_d)*Z*C_ox*popt_fwd[0]/L)
+                    reliability_back = (  (np.max(np.abs(y[back]))-np.abs(y[back][0]))/np.max(np.abs(x_data[back]))  ) / (np.abs(V_d)*Z*C_ox*popt_back[0]/L)
                     reliability_mean = 1/2 * (reliability_fwd+reliability_back)
 
                     # calculate data to be shown in fits
@@ -971,179 +2547,427 @@ class TransistorAnalysis():
 
                     return popts, fitresult_data, automatic_determination_parameters, fit_data, reliability, errors
                    #return popt_fwd, popt_back, popt_tot, avg, x_data_fit, y_data_fit_fwd, y_data_fit_back, y_smooth, fd_min_val, sd_min_val, xfit_fwd, xfit_back, yfit_fwd, yfit_back, reliability_fwd, reliability_back, reliability_mean, errors
-                except:
+                except Exception as e:
+                    diagnostics["failures"][fit_failure_reason(e)] += 1
                     continue
 
 
+    @memoize_fit('smoothing', 'first_deriv_limit', 'second_deriv_limit', ('manualFitRanges', 'sat'),
+                 'channel_width', 'channel_length', 'capacitance_oxide', 'carrier_type', 'sat_refine')
+    @traced(category="window search")
+    @diagnose_fit
     def fit_mobility_sat(self):
-        x_data = self.saturation_Vg
-        y_data = self.saturation_Id
+        x_data = self.saturation_sweep.Vg
+        y_data = self.saturation_sweep.Id
         Z = self.channel_width
         L = self.channel_length
         C_ox = self.capacitance_oxide
         fd_input = self.first_deriv_limit
         sd_input = self.second_deriv_limit
 
-        halflength = len(x_data) // 2
+        halflength = self.saturation_sweep.split  # first datapoint of the back sweep
+        fwd, back = self.direction_slices('sat')
+        fwd_idx, back_idx = self.fit_candidates('sat')
 
-        y_smooth = smoothing(y_data,gauss_s=self.smoothing)
-        first_deriv = first_derivative(y_data,gauss_s=self.smoothing)
-        second_deriv = second_derivative(y_data,gauss_s=self.smoothing)
+        y_smooth, first_deriv, second_deriv = self.smoothed_derivatives('sat')
 
         # normalization in order to avoid hardcoding - derivative values w/o normalization are somewhat random
         # 07.01.2021: added limitation for the maximum to be close to operating voltages so that random spikes
-        # in the derivative cannot mess up the fitting; requires hardcoded >1e2 on-off-ratio
-
-        first_deriv /= np.nanmax(np.abs(first_deriv[np.abs(y_data) > 1e2 * np.min(np.abs(y_data))]))
-        second_deriv /= np.nanmax(np.abs(second_deriv[10:halflength - 10][
+        # in the derivative cannot mess up the fitting; requires hardcoded >1e2 on-off-ratio. the first and last 10 datapoints
+        # are not used, the smoothing is not valid at the ends of the data (e.g. the on state of a sweep that does not return)
+        first_deriv = first_deriv / np.nanmax(np.abs(first_deriv[10:-10][np.abs(y_data[10:-10]) > 1e2 * np.min(np.abs(y_data))]))
+        second_deriv = second_deriv / np.nanmax(np.abs(second_deriv[10:halflength - 10][
                                           np.abs(y_data[10:halflength - 10]) > 1e2 * np.min(
                                               np.abs(y_data[10:halflength - 10]))]))
 
-        breakall = False
-        for ff_ in np.arange(1,0,-.1):
-            if breakall: break
-            for ss_ in np.arange(1,0,-.1):
-                if breakall: break
-                if (sd_input >= 0.01) and (fd_input >= 0.01):
-                    sd_min_val = sd_input; fd_min_val = fd_input; breakall = True
-                else:
-                    sd_min_val = ss_; fd_min_val = ff_
-                try:
-                    if self.manualFitRanges['sat'] is False:
-                        xfit_fwd, yfit_fwd, xfit_back, yfit_back = [], [], [], []
-
-                        for i in range(len(x_data) // 2):
-                            if i == 0:
-                                continue
-                            if (np.abs(second_deriv[i]) > sd_min_val) and (np.abs(
-                                    first_deriv[i]) > fd_min_val):
-                                xfit_fwd.append(x_data.iloc[i])
-                                yfit_fwd.append(y_data.iloc[i])
-                            if (np.abs(second_deriv[-i]) > sd_min_val) and (np.abs(
-                                    first_deriv[-i]) > fd_min_val):
-                                xfit_back.append(x_data.iloc[-i])
-                                yfit_back.append(y_data.iloc[-i])
-
-                    else:
-                        xmin, xmax = self.manualFitRanges['sat']
-                        if xmin > xmax: xmin_ = xmin; xmin = xmax; xmax = xmin_; del xmin_
-
-                        xfit_fwd, yfit_fwd, xfit_back, yfit_back = [], [], [], []
-                        for i in range(len(x_data) // 2):
-                            if i == 0:
-                                continue
-                            if xmax > x_data.iloc[i] > xmin:
-                                xfit_fwd.append(x_data.iloc[i])
-                                yfit_fwd.append(y_data.iloc[i])
-                            if xmax > x_data.iloc[-i] > xmin:
-                                xfit_back.append(x_data.iloc[-i])
-                                yfit_back.append(y_data.iloc[-i])
-
-                    # ensure that fitting would run smoothly and results would be reliable
-                    if (len(xfit_fwd) < 3) or (len(xfit_back) < 3): continue
-
-                    xfit_fwd, yfit_fwd, xfit_back, yfit_back = np.array(
-                        xfit_fwd), np.array(yfit_fwd), np.array(xfit_back), np.array(
-                        yfit_back)
-                    popt_fwd, pcov_fwd = curve_fit(
-                        lambda V_g, mu_eff, V_th: mobility_sat_simplified(
-                            V_g, mu_eff, V_th, Z, L, C_ox), xfit_fwd, yfit_fwd, check_finite=False)
-                    popt_back, pcov_back = curve_fit(
-                        lambda V_g, mu_eff, V_th: mobility_sat_simplified(
-                            V_g, mu_eff, V_th, Z, L, C_ox), xfit_back, yfit_back, check_finite=False)
-                    popt_tot, pcov_tot = curve_fit(
-                        lambda V_g, mu_eff, V_th: mobility_sat_simplified(
-                            V_g, mu_eff, V_th, Z, L, C_ox),
-                        np.concatenate((xfit_fwd, xfit_back)),
-                        np.concatenate((yfit_fwd, yfit_back)), check_finite=False)
-                    popt_avg = np.array([
-                        0.5 * (popt_fwd[0] + popt_back[0]),
-                        0.5 * (popt_fwd[1] + popt_back[1])
-                    ])
-
-                    musat_fwd_err, vthsat_fwd_err = np.sqrt(np.diag(pcov_fwd))
-                    musat_back_err, vthsat_back_err = np.sqrt(np.diag(pcov_back))
-                    musat_mean_err, vthsat_mean_err = 0.5 * (np.sqrt(np.diag(pcov_fwd)) + np.sqrt(np.diag(pcov_back)))
-
-                    breakall = True
-
-                    # caluclate reliability factor (DOI: 10.1038/nmat5035)
-                    y = np.array(y_data)
-                    reliability_fwd = ((np.sqrt(np.max(np.abs(y[:halflength]))) - np.sqrt(np.abs(y[0]))) / np.max(
-                        np.abs(x_data[:halflength])))**2 / (Z * C_ox * popt_fwd[0] / (2*L))
-                    reliability_back = ((np.sqrt(np.max(np.abs(y[halflength:]))) - np.sqrt(np.abs(y[-1]))) / np.max(
-                        np.abs(x_data[halflength:])))**2 / (Z * C_ox * popt_back[0] / (2*L))
-                    reliability_mean = 1 / 2 * (reliability_fwd + reliability_back)
-
-                    if self.carrier_type == 'p':
-                        start, stop = np.where(x_data == np.max(xfit_fwd))[0][0], np.where(
-                            x_data == np.min(xfit_fwd))[0][0]
-                    elif self.carrier_type == 'n':
-                        start, stop = np.where(x_data == np.min(xfit_fwd))[0][0], np.where(
-                            x_data == np.max(xfit_fwd))[0][0]
-                    start -= 5
-                    stop += 5
-                    x_data_fit = x_data[start:stop]
-                    y_data_fit_fwd = mobility_sat_simplified(x_data[start:stop], *popt_fwd, Z, L, C_ox)
-                    y_data_fit_back = mobility_sat_simplified(x_data[start:stop], *popt_back, Z, L, C_ox)
-
-                    errors = {"fwd": (musat_fwd_err, vthsat_fwd_err),
-                              "back": (musat_back_err, vthsat_back_err),
-                              "mean": (musat_mean_err, vthsat_mean_err)}
-                    automatic_determination_parameters = (fd_min_val, sd_min_val, y_smooth)
-                    popts = {"fwd": popt_fwd, "back": popt_back, "mean": popt_avg}
-                    fitresult_data = (x_data_fit, y_data_fit_fwd, y_data_fit_back)  # bundling the fitting lines
-                    fit_data = (xfit_fwd, xfit_back, yfit_fwd, yfit_back)  # bundling together to plot datapoints used in fits
-                    reliability = {"fwd": reliability_fwd, "back": reliability_back, "mean": reliability_mean}
-
-                    return popts, fitresult_data, automatic_determination_parameters, fit_data, reliability, errors
-                  # return popt_fwd, popt_back, popt_tot, avg, x_data_fit, y_data_fit_fwd, y_data_fit_back, y_smooth, fd_min_val, sd_min_val, xfit_fwd, xfit_back, yfit_fwd, yfit_back, reliability_fwd, reliability_back, reliability_mean, errors
-
-                except: continue
+        # the thresholds of the window search in the order they are tried: all combinations of first and second derivative
+        # threshold from 1 down to 0.1, or only the fixed ones. a manual fit range selects the same datapoints for all of
+        # them, one is enough then. the windows of all thresholds are selected at once (one row each)
+        diagnostics = self.fit_diagnostics['fit_mobility_sat']
+        if (sd_input >= 0.01) and (fd_input >= 0.01): thresholds = np.array([[fd_input, sd_input]])
+        else: thresholds = np.array([[ff_, ss_] for ff_ in np.arange(1,0,-.1) for ss_ in np.arange(1,0,-.1)])
+        if self.manualFitRanges['sat'] is False:
+            selected = (np.abs(second_deriv) > thresholds[:, 1:]) & (np.abs(first_deriv) > thresholds[:, :1])
+        else:
+            xmin, xmax = sorted(self.manualFitRanges['sat'])
+            thresholds = thresholds[:1]
+            selected = ((xmax > x_data) & (x_data > xmin))[None, :]
+
+        # sqrt(|Id|) is a straight line in Vg, so the fwd and back sweep of all windows are fitted at once in closed form
+        # from sums over the selected datapoints (see _sat_line_parameters) and the first usable window is chosen. without
+        # refinement its lines are the result, otherwise only this window is fitted with curve_fit, starting from them
+        # ensure that fitting would run smoothly and results would be reliable
+        enough = (selected[:, fwd_idx].sum(axis=1) >= 3) & (selected[:, back_idx].sum(axis=1) >= 3)
+        terms = _regression_sum_terms(x_data, np.sqrt(np.abs(y_data)))
+        lines = {}
+        for direction, idx in [("fwd", fwd_idx), ("back", back_idx)]:
+            sel = selected[:, idx].astype(float)
+            lines[direction] = _sat_line_parameters(terms[:, idx] @ sel.T, np.sign(sel @ y_data[idx]), Z, L, C_ox)
+        usable = enough & lines["fwd"][2] & lines["back"][2]
+
+        # windows that were passed over between the ones that were tried, see diagnose_fit
+        def skip(start, stop):
+            diagnostics["iterations"] = int(stop)
+            for reason, count in [("too few datapoints", np.sum(~enough[start:stop])),
+                                  ("degenerate line", np.sum((enough & ~usable)[start:stop]))]:
+                if count: diagnostics["failures"][reason] += int(count)
+
+        tried = 0
+        for k in np.flatnonzero(usable):
+            skip(tried, k)
+            tried = k + 1
+            diagnostics["iterations"] = int(tried)
+            diagnostics["attempts"] += 1
+            fd_min_val, sd_min_val = thresholds[k]
+            fwd_fit, back_fit = fwd_idx[selected[k, fwd_idx]], back_idx[selected[k, back_idx]]
+            xfit_fwd, yfit_fwd, xfit_back, yfit_back = x_data[fwd_fit], y_data[fwd_fit], x_data[back_fit], y_data[back_fit]
+            try:
+                (popt_fwd, pcov_fwd), (popt_back, pcov_back) = [(lines[d][0][k], lines[d][1][k]) for d in ("fwd", "back")]
+                if self.sat_refine:
+                    # the quadratic model starts from the lines through sqrt(|Id|). if it doesn't converge, the lines
+                    # of this window are kept
+                    try:
+                        popt_fwd, pcov_fwd = curve_fit(
+                            lambda V_g, mu_eff, V_th: mobility_sat_simplified(
+                                V_g, mu_eff, V_th, Z, L, C_ox), xfit_fwd, yfit_fwd, p0=popt_fwd, check_finite=False)
+                        popt_back, pcov_back = curve_fit(
+                            lambda V_g, mu_eff, V_th: mobility_sat_simplified(
+                                V_g, mu_eff, V_th, Z, L, C_ox), xfit_back, yfit_back, p0=popt_back, check_finite=False)
+                    except Exception as e:
+                        diagnostics["failures"][fit_failure_reason(e)] += 1
+                        (popt_fwd, pcov_fwd), (popt_back, pcov_back) = [(lines[d][0][k], lines[d][1][k]) for d in ("fwd", "back")]
+                popt_avg = np.array([
+                    0.5 * (popt_fwd[0] + popt_back[0]),
+                    0.5 * (popt_fwd[1] + popt_back[1])
+                ])
+
+                musat_fwd_err, vthsat_fwd_err = np.sqrt(np.diag(pcov_fwd))
+                musat_back_err, vthsat_back_err = np.sqrt(np.diag(pcov_back))
+                musat_mean_err, vthsat_mean_err = 0.5 * (np.sqrt(np.diag(pcov_fwd)) + np.sqrt(np.diag(pcov_back)))
+
+                # caluclate reliability factor (DOI: 10.1038/nmat5035)
+                y = y_data
+                reliability_fwd = ((np.sqrt(np.max(np.abs(y[fwd]))) - np.sqrt(np.abs(y[fwd][0]))) / np.max(
+                    np.abs(x_data[fwd])))**2 / (Z * C_ox * popt_fwd[0] / (2*L))
+                reliability_back = ((np.sqrt(np.max(np.abs(y[back]))) - np.sqrt(np.abs(y[back][0]))) / np.max(
+                    np.abs(x_data[back])))**2 / (Z * C_ox * popt_back[0] / (2*L))
+                reliability_mean = 1 / 2 * (reliability_fwd + reliability_back)
 
+                if self.carrier_type == 'p':
+                    start, stop = np.where(x_data == np.max(xfit_fwd))[0][0], np.where(
+                        x_data == np.min(xfit_fwd))[0][0]
+                elif self.carrier_type == 'n':
+                    start, stop = np.where(x_data == np.min(xfit_fwd))[0][0], np.where(
+                        x_data == np.max(xfit_fwd))[0][0]
+                start -= 5
+                stop += 5
+                x_data_fit = x_data[start:stop]
+                y_data_fit_fwd = mobility_sat_simplified(x_data[start:stop], *popt_fwd, Z, L, C_ox)
+                y_data_fit_back = mobility_sat_simplified(x_data[start:stop], *popt_back, Z, L, C_ox)
+
+                errors = {"fwd": (musat_fwd_err, vthsat_fwd_err),
+                          "back": (musat_back_err, vthsat_back_err),
+                          "mean": (musat_mean_err, vthsat_mean_err)}
+                automatic_determination_parameters = (fd_min_val, sd_min_val, y_smooth)
+                popts = {"fwd": popt_fwd, "back": popt_back, "mean": popt_avg}
+                fitresult_data = (x_data_fit, y_data_fit_fwd, y_data_fit_back)  # bundling the fitting lines
+                fit_data = (xfit_fwd, xfit_back, yfit_fwd, yfit_back)  # bundling together to plot datapoints used in fits
+                reliability = {"fwd": reliability_fwd, "back": reliability_back, "mean": reliability_mean}
+
+                return popts, fitresult_data, automatic_determination_parameters, fit_data, reliability, errors
+              # return popt_fwd, popt_back, popt_tot, avg, x_data_fit, y_data_fit_fwd, y_data_fit_back, y_smooth, fd_min_val, sd_min_val, xfit_fwd, xfit_back, yfit_fwd, yfit_back, reliability_fwd, reliability_back, reliability_mean, errors
+
+            except Exception as e:
+                diagnostics["failures"][fit_failure_reason(e)] += 1
+                continue
+        skip(tried, len(thresholds))
 
-    def mobility_sat_Vgdependent_plot(self):
-        x_data = self.saturation_Vg
-        y_data = self.saturation_Id
-        Z = self.channel_width
-        L = self.channel_length
-        C_ox = self.capacitance_oxide
-        #try:
-        mu_eff = np.gradient(np.sqrt(np.abs(y_data)), x_data)**2 * 2 * L / (Z * C_ox)
-        #except RuntimeWarning:
-        #    print("caught")
-        #mu_eff = np.gradient(np.sqrt(np.abs(y_data)), x_data[1]-x_data[0])**2 * 2 * L / (Z * C_ox)
-
-        #mu_eff = first_derivative(np.sqrt(np.abs(y_data)), gauss_s=self.smoothing)**2 * 2*L/(Z*C_ox)
-        l_ = len(x_data) // 2
-        #print(len(x_data),len(mu_eff),l_)
-        x_fwd, x_back = x_data[:l_-1], x_data[l_+1:]
-        mu_eff_fwd, mu_eff_back = mu_eff[:l_-1], mu_eff[l_+1:]
-        #print(len(x_fwd),len(mu_eff_fwd),len(x_back),len(mu_eff_back))
 
+    # mu_eff(Vg) of the fwd and back sweep, see Vgdependent_mobility_rows(). derivative="gaussian" uses the derivative of
+    # a gaussian with the smoothing of the fit window search instead of np.gradient
+    @traced()
+    def mobility_sat_Vgdependent_plot(self, derivative='gradient'):
+        (x_fwd, mu_eff_fwd), (x_back, mu_eff_back) = [(x_[0][~np.isnan(x_[0])], mu_[0][~np.isnan(x_[0])]) for x_, mu_ in
+            Vgdependent_mobility_rows([self], 'sat', derivative, gauss_s=self.smoothing)]
         return x_fwd, x_back, mu_eff_fwd, mu_eff_back
 
 
-    def mobility_lin_Vgdependent_plot(self):
-        x_data = self.linear_Vg
-        y_data = self.linear_Id
-        V_d = self.linear_source_drain_voltage
-        Z = self.channel_width
-        L = self.channel_length
-        C_ox = self.capacitance_oxide
-
-        #mu_eff = first_derivative(y_data, gauss_s=self.smoothing) * L/(Z*C_ox*V_d)
-        #mu_eff = np.gradient(y_data, x_data[1] - x_data[0]) * L / (Z * C_ox * V_d)
-        mu_eff = np.gradient(y_data, x_data) * L / (Z * C_ox * V_d)
-
-        l_ = len(x_data)//2
-        x_fwd, x_back = x_data[:l_-1], x_data[l_+1:]
-        mu_eff_fwd, mu_eff_back = mu_eff[:l_-1], mu_eff[l_+1:]
-
+    @traced()
+    def mobility_lin_Vgdependent_plot(self, derivative='gradient'):
+        (x_fwd, mu_eff_fwd), (x_back, mu_eff_back) = [(x_[0][~np.isnan(x_[0])], mu_[0][~np.isnan(x_[0])]) for x_, mu_ in
+            Vgdependent_mobility_rows([self], 'lin', derivative, gauss_s=self.smoothing)]
         return x_fwd, x_back, mu_eff_fwd, mu_eff_back
 
+    # fwd and back sweep in the order they were measured, without the datapoints next to the turning point
+    @staticmethod
+    def Vgdependent_slices(sweep):
+        segments = sweep.segment_slices()
+        if len(segments) < 2: return segments[0], segments[0]
+        fwd, back = segments[:2]
+        return slice(fwd.start, fwd.stop - 1), slice(back.start + 1, back.stop)
+
+
+# many curves of (possibly) different length as one 2d array, one curve per row, padded with nan at the end
+def _pad_rows(curves):
+    if isinstance(curves, np.ndarray) and curves.ndim == 2: return curves.astype(float)
+    curves = [np.asarray(c_, dtype=float) for c_ in curves]
+    rows = np.full((len(curves), max(len(c_) for c_ in curves)), np.nan)
+    for i, c_ in enumerate(curves): rows[i, :len(c_)] = c_
+    return rows
+
+
+# np.interp for every row at once. xp has to be ascending in each row (nan padding at the end is allowed), xq has to be
+# within the range of its row. the rows are shifted apart so that one searchsorted over the flattened array does it all
+def _interp_rows(xq, xp, fp):
+    n_rows, m = xp.shape
+    n_valid = np.sum(~np.isnan(xp), axis=1)
+    xp = np.where(np.isnan(xp), np.nanmax(xp, axis=1)[:, None], xp)
+    lo = xp[:, :1]
+    shift = (np.max(xp[:, -1:] - lo) + 1) * np.arange(n_rows)[:, None]
+    i = np.searchsorted((xp - lo + shift).ravel(), (xq - lo + shift).ravel(), side='right').reshape(xq.shape)
+    i = np.clip(i - m * np.arange(n_rows)[:, None], 1, np.maximum(n_valid - 1, 1)[:, None])
+    x0, x1 = np.take_along_axis(xp, i - 1, axis=1), np.take_along_axis(xp, i, axis=1)
+    f0, f1 = np.take_along_axis(fp, i - 1, axis=1), np.take_along_axis(fp, i, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = np.where(x1 > x0, (xq - x0) / (x1 - x0), 0)
+    return f0 + w * (f1 - f0)
+
+
+# np.gradient(y, x) of every row at once (x can differ between the rows, rows padded with nan at the end). the same
+# formulas as np.gradient with edge_order=1: second order differences inside, one-sided ones at both ends of each row
+def _gradient_rows(y, x):
+    y, x = _pad_rows(y), _pad_rows(x)
+    n_rows, m = y.shape
+    out = np.full((n_rows, m), np.nan)
+    if m < 2: return out
+    lengths = np.sum(~np.isnan(x), axis=1)
+    dx = np.diff(x, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dx1, dx2 = dx[:, :-1], dx[:, 1:]
+        a = -(dx2) / (dx1 * (dx1 + dx2))
+        b = (dx2 - dx1) / (dx1 * dx2)
+        c = dx1 / (dx2 * (dx1 + dx2))
+        out[:, 1:-1] = a * y[:, :-2] + b * y[:, 1:-1] + c * y[:, 2:]
+        # np.gradient uses the plain central difference if the steps are all exactly equal
+        uniform = np.all((dx == dx[:, :1]) | (np.arange(m - 1)[None, :] >= (lengths - 1)[:, None]), axis=1)
+        out[uniform, 1:-1] = (y[uniform, 2:] - y[uniform, :-2]) / (2. * dx[uniform, :1])
+        out[:, 0] = (y[:, 1] - y[:, 0]) / dx[:, 0]
+        rows, last = np.arange(n_rows), np.maximum(lengths - 1, 1)
+        out[rows, last] = (y[rows, last] - y[rows, last - 1]) / dx[rows, last - 1]
+    out[np.arange(m)[None, :] >= lengths[:, None]] = np.nan
+    out[lengths < 2] = np.nan
+    return out
+
+
+# np.convolve(row, kernel, mode="same") of every row at once (odd kernel length, rows padded with nan at the end). each
+# row is continued beyond its ends by point reflection at the first/last datapoint, so a straight line stays a straight
+# line and the derivative kernels do not see an artificial step at the ends (np.convolve pads with zeros)
+def _convolve_rows(y, kernel):
+    y = _pad_rows(y)
+    n_rows, m = y.shape
+    pad = len(kernel) // 2
+    last = np.maximum(np.sum(~np.isnan(y), axis=1) - 1, 0)[:, None]
+    j = np.arange(-pad, m + pad)[None, :]
+    mirrored = np.clip(np.where(j < 0, -j, np.where(j > last, 2 * last - j, j)), 0, last)
+    values = np.take_along_axis(y, mirrored, axis=1)
+    values = np.where(j < 0, 2 * y[:, :1] - values,
+                      np.where(j > last, 2 * np.take_along_axis(y, last, axis=1) - values, values))
+    out = np.lib.stride_tricks.sliding_window_view(values, len(kernel), axis=1) @ np.asarray(kernel)[::-1]
+    out[np.arange(m)[None, :] > last] = np.nan
+    return out
+
+
+# gate voltage dependent mobility of many transfer curves at once, one curve (a single sweep direction) per row: 2d arrays
+# or lists of 1d arrays of different length, see _pad_rows. linear regime: mu = dId/dVg * L/(W*C_ox*V_DS), saturation:
+# mu = (dsqrt(|Id|)/dVg)^2 * 2L/(W*C_ox). W, L and V_DS can be given per curve; units as the attributes of
+# TransistorAnalysis (W, L in m, C_ox in F/cm², which gives cm²/Vs). derivative="gradient" is np.gradient along each
+# curve, "gaussian" the ratio of the convolutions of Id and Vg with the derivative of a gaussian (the kernel of
+# first_derivative(), gauss_s as the smoothing factor of the analysis), which smooths the noise like the fit window
+# search and does not depend on the gate voltage step. returns mu_eff in the shape of the padded curves
+def mobility_Vgdependent(V_g, I_d, W, L, C_ox, V_DS=None, regime='lin', derivative='gradient', gauss_s=.25):
+    x, y = _pad_rows(V_g), _pad_rows(I_d)
+    if regime == 'sat': y = np.sqrt(np.abs(y))
+    if derivative == 'gaussian':
+        kernel = gaussian_kernel(1, gauss_s)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dydx = _convolve_rows(y, kernel) / _convolve_rows(x, kernel)
+    elif derivative == 'gradient':
+        dydx = _gradient_rows(y, x)
+    else:
+        raise ValueError(f"unknown derivative {derivative}, use 'gradient' or 'gaussian'")
+    W, L, C_ox = [np.asarray(p_, dtype=float).reshape(-1, 1) for p_ in (W, L, C_ox)]
+    if regime == 'sat': return dydx**2 * 2 * L / (W * C_ox)
+    return dydx * L / (W * C_ox * np.asarray(V_DS, dtype=float).reshape(-1, 1))
+
+
+# mu_eff(Vg) of the fwd and back sweep of many devices (TransistorAnalysis objects) in one call of mobility_Vgdependent().
+# the derivative is taken along each sweep direction, the datapoints next to the turning point are left out afterwards
+# (see TransistorAnalysis.Vgdependent_slices). returns ((V_g, mu_eff) of fwd, (V_g, mu_eff) of back), each a 2d array
+# with one device per row in measurement order, padded with nan
+def Vgdependent_mobility_rows(devices, regime='lin', derivative='gradient', gauss_s=.25):
+    sweeps = [t_.linear_sweep if regime == 'lin' else t_.saturation_sweep for t_ in devices]
+    # fwd and back segment of each sweep (both are the whole sweep if it does not return) and the part of it that is kept:
+    # the gradient is not meaningful at the turning point, so the last fwd and the first back datapoint are left out
+    curves, kept = [], []
+    segments = [sweep.segment_slices() for sweep in sweeps]
+    for direction in (0, 1):
+        for sweep, seg in zip(sweeps, segments):
+            sl = seg[direction] if len(seg) > 1 else seg[0]
+            curves.append((sweep.Vg[sl], sweep.Id[sl]))
+            kept.append(slice(None) if len(seg) < 2 else slice(0, -1) if direction == 0 else slice(1, None))
+    W, L, C_ox, V_DS = [np.tile([getattr(t_, p_) for t_ in devices], 2) for p_ in
+                        ("channel_width", "channel_length", "capacitance_oxide", "linear_source_drain_voltage")]
+    mu = mobility_Vgdependent([x_ for x_, y_ in curves], [y_ for x_, y_ in curves], W, L, C_ox, V_DS=V_DS,
+                              regime=regime, derivative=derivative, gauss_s=gauss_s)
+    x = _pad_rows([x_[k] for (x_, y_), k in zip(curves, kept)])
+    mu = _pad_rows([mu_[:len(x_)][k] for mu_, (x_, y_), k in zip(mu, curves, kept)])
+    n = len(devices)
+    return (x[:n], mu[:n]), (x[n:], mu[n:])
+
+
+# mu_eff(Vg) of many devices (e.g. all devices of a sample) aligned on a common gate voltage grid, for overlays and
+# statistics across devices: the fwd and back sweep of each device are interpolated onto V_grid (by default from the
+# lowest to the highest gate voltage of all devices in the smallest median step of the data), nan outside of the range
+# of a device. gauss_s is the smoothing factor of the first device by default. returns {"V_g": grid, "fwd": array,
+# "back": array} with one row per device
+def Vgdependent_mobility_curves(devices, regime='lin', derivative='gradient', V_grid=None, gauss_s=None):
+    devices = list(devices)
+    if not devices:
+        V_grid = np.array([]) if V_grid is None else np.asarray(V_grid, dtype=float)
+        return {"V_g": V_grid, "fwd": np.empty((0, len(V_grid))), "back": np.empty((0, len(V_grid)))}
+    if gauss_s is None: gauss_s = devices[0].smoothing
+    directions = dict(zip(("fwd", "back"), Vgdependent_mobility_rows(devices, regime, derivative, gauss_s)))
+    if V_grid is None:
+        x_all = np.concatenate([x_ for x_, mu_ in directions.values()])
+        step = np.nanmin(np.nanmedian(np.abs(np.diff(x_all, axis=1)), axis=1))
+        lo, hi = np.nanmin(x_all), np.nanmax(x_all)
+        V_grid = np.linspace(lo, hi, int(round((hi - lo) / step)) + 1)
+    V_grid = np.asarray(V_grid, dtype=float)
+    curves = {"V_g": V_grid}
+    for d, (x, mu) in directions.items():
+        # _interp_rows needs ascending gate voltages in every row, the nan padding stays at the end
+        order = np.argsort(np.where(np.isnan(x), np.inf, x), axis=1)
+        x, mu = np.take_along_axis(x, order, axis=1), np.take_along_axis(mu, order, axis=1)
+        xq = np.broadcast_to(V_grid, (len(x), len(V_grid)))
+        inside = (xq >= np.nanmin(x, axis=1)[:, None]) & (xq <= np.nanmax(x, axis=1)[:, None])
+        curves[d] = np.where(inside, _interp_rows(np.where(inside, xq, np.nanmin(x, axis=1)[:, None]), x, mu), np.nan)
+    return curves
+
+
+# characteristics of many voltage transfer curves (VTC) at once, e.g. all inverters of a sample or a V_DD sweep.
+# V_in, V_out: 2d arrays with one curve per row, or lists of 1d arrays (curves of different length are padded with nan).
+# every curve has to be a single sweep direction (fwd or bwd). V_DD: one value or one value per curve.
+# edge: number of points at both ends that are not used for the unity gain points, see InverterAnalysis.get_characteristics()
+# returns a dict of arrays with the curves along the first axis: max. gain, trip point (V_in, V_out), unity gain points
+# before/after the trip point in sweep order (V_in, V_out) and the noise margins; nan where a curve cannot be evaluated
+def inverter_characteristics(V_in, V_out, V_DD, edge=5):
+    x, y = _pad_rows(V_in), _pad_rows(V_out)
+    n_curves, n_max = x.shape
+    rows = np.arange(n_curves)
+    lengths = np.sum(~np.isnan(x), axis=1)
+    V_DD = np.broadcast_to(np.asarray(V_DD, dtype=float), (n_curves,))
+    dV = one_side_gradient(y, x)
+
+    # trip point at the maximum gain (np.nanargmax would fail for curves without any valid gain)
+    valid = ~np.all(np.isnan(dV), axis=1)
+    tp = np.argmax(np.where(np.isnan(dV), -np.inf, dV), axis=1)
+    gain = np.where(valid, dV[rows, tp], np.nan)
+    trip_point = np.where(valid[:, None], np.column_stack((x[rows, tp], y[rows, tp])), np.nan)
+
+    # unity gain points: closest to gain 1 between the edge points and the trip point (before), and between trip point
+    # and edge points (after). out-of-range values are set to inf; nan within the range is found first by argmin, as before
+    idx = np.arange(n_max)[None, :]
+    before = (idx >= edge) & (idx < tp[:, None])
+    after = (idx >= tp[:, None]) & (idx < (lengths - edge)[:, None])
+    available = valid & before.any(axis=1) & after.any(axis=1)
+    deviation = np.abs(dV - 1)
+    u_before = np.argmin(np.where(before, deviation, np.inf), axis=1)
+    u_after = np.argmin(np.where(after, deviation, np.inf), axis=1)
+    unity_gain_points = np.stack((np.column_stack((x[rows, u_before], y[rows, u_before])),
+                                  np.column_stack((x[rows, u_after], y[rows, u_after]))), axis=1)
+    unity_gain_points[~available] = np.nan
+
+    # NM_L = V_IL - V_OL, NM_H = V_OH - V_IH. in a fwd sweep (V_in increasing) the point before the trip point is
+    # (V_IL, V_OH), in a bwd sweep it is the one after
+    fwd = (x[rows, 0] < x[rows, lengths - 1])[:, None]
+    low = np.where(fwd, unity_gain_points[:, 0], unity_gain_points[:, 1])
+    high = np.where(fwd, unity_gain_points[:, 1], unity_gain_points[:, 0])
+    nm_low = low[:, 0] - high[:, 1]
+    nm_high = low[:, 1] - high[:, 0]
+    nm_eff = np.minimum(nm_low, nm_high)
+
+    return {"max_gain": gain, "trip_point": trip_point, "unity_gain_points": unity_gain_points,
+            "nm_low": nm_low, "nm_high": nm_high, "nm_eff": nm_eff, "nm_eff_perc": nm_eff / (1/2 * V_DD),
+            "gradient": dV}
+
+
+# static noise margin from the butterfly curve as the side of the largest square that fits into each of its two eyes
+# (maximum equal criterion). the butterfly is made of VTC 1 (V_out1 over V_in1) and the mirrored VTC 2 (V_in2 over
+# V_out2); without a second VTC, each curve is mirrored onto itself (two identical inverters, e.g. a latch).
+# geometric search after Seevinck: in coordinates rotated by 45° (c = x - y along the eyes, t = x + y across), the
+# diagonal of a square between the two curves is the distance in t at the same c, so the side of the largest square is
+# half the largest t difference in each eye. both curves are interpolated on a common c grid, for all curves at once.
+# V_in/V_out as in inverter_characteristics() (one curve per row, single sweep direction)
+# returns a dict of arrays (one value per curve): the noise margins of the upper left and lower right eye, the static
+# noise margin (smaller of the two, 0 if there is no bistability) and the lower left corner and side of both squares
+def butterfly_noise_margins(V_in, V_out, V_in2=None, V_out2=None, n_grid=1000):
+    x1, y1 = _pad_rows(V_in), _pad_rows(V_out)
+    x2, y2 = (x1, y1) if V_in2 is None else (_pad_rows(V_in2), _pad_rows(V_out2))
+
+    # curves without data (e.g. missing bwd sweep) are left out and get nan
+    usable = (np.sum(~np.isnan(x1 + y1), axis=1) > 1) & (np.sum(~np.isnan(x2 + y2), axis=1) > 1)
+    if not usable.all():
+        results = {"nm_upper": np.full(len(x1), np.nan), "nm_lower": np.full(len(x1), np.nan), "snm": np.full(len(x1), np.nan),
+                   "square_upper": (np.full((len(x1), 2), np.nan), np.full(len(x1), np.nan)),
+                   "square_lower": (np.full((len(x1), 2), np.nan), np.full(len(x1), np.nan))}
+        if usable.any():
+            r_ = butterfly_noise_margins(x1[usable], y1[usable], x2[usable], y2[usable], n_grid=n_grid)
+            for k_ in ["nm_upper", "nm_lower", "snm"]: results[k_][usable] = r_[k_]
+            for k_ in ["square_upper", "square_lower"]:
+                results[k_][0][usable], results[k_][1][usable] = r_[k_]
+        return results
+
+    # rotated coordinates: curve 1 as it is, curve 2 mirrored at the diagonal (x and y swapped)
+    c1, t1 = x1 - y1, x1 + y1
+    c2, t2 = y2 - x2, y2 + x2
+
+    def sorted_by_c(c, t):
+        order = np.argsort(np.where(np.isnan(c), np.inf, c), axis=1)
+        return np.take_along_axis(c, order, axis=1), np.take_along_axis(t, order, axis=1)
+    c1, t1 = sorted_by_c(c1, t1)
+    c2, t2 = sorted_by_c(c2, t2)
+
+    # common range of both curves along the eyes
+    c_min = np.maximum(np.nanmin(c1, axis=1), np.nanmin(c2, axis=1))
+    c_max = np.minimum(np.nanmax(c1, axis=1), np.nanmax(c2, axis=1))
+    c = c_min[:, None] + (c_max - c_min)[:, None] * np.linspace(0, 1, n_grid)[None, :]
+    d = _interp_rows(c, c2, t2) - _interp_rows(c, c1, t1)
+
+    # lower right eye: mirrored curve 2 above curve 1 in t (d > 0), upper left eye: d < 0. the eyes are on either side
+    # of the metastable point, where the curves cross closest to the diagonal (c = 0; the diagonal itself if they don't
+    # cross). without bistability the curves only cross there, and next to it d has the opposite sign: no eyes
+    rows = np.arange(len(c))
+    crossing = (np.sign(d[:, :-1]) != np.sign(d[:, 1:])) | (d[:, :-1] == 0)
+    distance = np.where(crossing, np.abs(c[:, :-1]), np.inf)
+    i_mid = np.argmin(distance, axis=1)
+    upper = c <= np.where(np.isfinite(distance[rows, i_mid]), c[rows, i_mid], 0)[:, None]
+    d_upper, d_lower = np.where(upper, d, 0), np.where(upper, 0, d)
+    i_upper, i_lower = np.argmin(d_upper, axis=1), np.argmax(d_lower, axis=1)
+    nm_upper = np.maximum(-d_upper[rows, i_upper], 0) / 2
+    nm_lower = np.maximum(d_lower[rows, i_lower], 0) / 2
+
+    # lower left corner of the squares: on the curve with the smaller t
+    t_upper = _interp_rows(c[rows, i_upper][:, None], c2, t2)[:, 0]
+    t_lower = _interp_rows(c[rows, i_lower][:, None], c1, t1)[:, 0]
+    corner_upper = np.column_stack(((t_upper + c[rows, i_upper]) / 2, (t_upper - c[rows, i_upper]) / 2))
+    corner_lower = np.column_stack(((t_lower + c[rows, i_lower]) / 2, (t_lower - c[rows, i_lower]) / 2))
+
+    return {"nm_upper": nm_upper, "nm_lower": nm_lower, "snm": np.minimum(nm_upper, nm_lower),
+            "square_upper": (corner_upper, nm_upper), "square_lower": (corner_lower, nm_lower)}
+
 
 class InverterAnalysis():
+    @traced("InverterAnalysis")
     def __init__(self, carrier_type='p', filename=None, filetype=None,
                  smooth_factor=None, V_DD=None,
                  manualFitRange=False,
@@ -1183,10 +3007,11 @@ class InverterAnalysis():
         try:
             # read data from data file. CAREFUL! this part is crucial, and depends on the column names.
             # Changes to column structure might break this!
-            self.inv_transfer_data = pd.read_table(self.filename,
-                                                      skiprows=skiprows,
-                                                      names=transfer_column_names,
-                                                      header=None, index_col=None)
+            with tracer.span("read file", "io", file=self.filename):
+                self.inv_transfer_data = pd.read_table(self.filename,
+                                                          skiprows=skiprows,
+                                                          names=transfer_column_names,
+                                                          header=None, index_col=None)
             self.V_in = np.array(self.inv_transfer_data['in Voltage'])
             self.V_out_raw = self.inv_transfer_data['out Voltage']
             self.V_out = smoothing(self.V_out_raw,gauss_s=self.smoothing) if (self.smoothing is not None) else np.array(self.V_out_raw)
@@ -1194,25 +3019,29 @@ class InverterAnalysis():
             # try and read Vdd if not given manually
             if self.supply_voltage is None: self.supply_voltage = np.round(self.inv_transfer_data['dd Voltage'].mean(),2)
 
-            # automatic check if bwd scan is active (if first and last datapoint coincide)
-            self.bwd_available = (np.abs(self.V_in[0]-self.V_in[-1])<5e-3)
+            # automatic check if bwd scan is active (if the input voltage changes direction, see sweep_turning_points)
+            turns = sweep_turning_points(self.V_in)
+            self.bwd_available = len(turns) > 0
+            self.split = int(turns[0]) if self.bwd_available else len(self.V_in)
+            self.bwd_stop = int(turns[1]) if len(turns) > 1 else len(self.V_in)
             if self.bwd_available == False: print("Backwards sweep seemingly not included. Please check data. If nothing is wrong there, maybe the resistance column is expected/given and the code expects it or not...please check that.")
 
         except:
             print("Something went wrong during reading of the datafile for Inverter Analysis.")
 
 
+    @traced()
     def get_characteristics(self):
         try:
             if (len(self.V_in) < 3) or (len(self.V_out) < 3):
                 self.dV_fwd, self.dV_bwd = None, None
                 return False
 
-            halflength_ = len(self.V_in) // 2
-            x_fwd = self.V_in [:halflength_] if self.bwd_available else self.V_in
-            y_fwd = self.V_out[:halflength_] if self.bwd_available else self.V_out
-            x_bwd = self.V_in [halflength_:] if self.bwd_available else None
-            y_bwd = self.V_out[halflength_:] if self.bwd_available else None
+            split_, stop_ = self.split, self.bwd_stop
+            x_fwd = self.V_in [:split_] if self.bwd_available else self.V_in
+            y_fwd = self.V_out[:split_] if self.bwd_available else self.V_out
+            x_bwd = self.V_in [split_:stop_] if self.bwd_available else None
+            y_bwd = self.V_out[split_:stop_] if self.bwd_available else None
             self.V_in_fwd, self.V_out_fwd = x_fwd, y_fwd
             if self.bwd_available:
                 self.V_in_bwd, self.V_out_bwd = x_bwd, y_bwd
@@ -1220,79 +3049,32 @@ class InverterAnalysis():
 
             # 22.04.2022 change: np.gradient uses centered gradient, but one-sided gradient is the correct approach for "perfect" inverters
             # otherwise (for one point with high gain only) the gain would be cut in half (for ideal inverter)
-            def one_side_gradient(y, x):
-                l = len(x)
-                dydx = np.abs( np.array([(y[i] - y[i + 1]) / (x[i] - x[i + 1]) for i in range(l - 1)]) )
-                dydx[dydx == np.inf] = np.nan  # np.max() will treat inf as highest value - replace with nan
-                return np.append(dydx, np.nan)  # need to add one value to keep shape of arrays
-
+            # fwd and bwd sweep are evaluated together as two curves, see inverter_characteristics()
+            c = inverter_characteristics([x_fwd, x_bwd] if self.bwd_available else [x_fwd],
+                                         [y_fwd, y_bwd] if self.bwd_available else [y_fwd], self.supply_voltage)
             #self.dV_fwd = np.abs(np.gradient(y_fwd, x_fwd)) # no condition needed because x_fwd is whole range otherwise
             #self.dV_bwd = np.abs(np.gradient(y_bwd, x_bwd)) if self.bwd_available else None
-            self.dV_fwd = one_side_gradient(y_fwd,x_fwd)
-            self.dV_bwd = one_side_gradient(y_bwd,x_bwd) if self.bwd_available else None
-
-            trip_point_index_fwd = np.nanargmax(self.dV_fwd)
-            trip_point_fwd = (x_fwd[trip_point_index_fwd], y_fwd[trip_point_index_fwd])
-            gain_fwd = self.dV_fwd[trip_point_index_fwd]
-            # use here and in the following unity gain calculation all but the 5 edge points, since it was recognized
-            # as unity gain and messed up the noise margin quite often. not sure if this is the right approach, but at least it works better
-            # in case there are no 5 data points before unity gain, trip point will not be calculated
-            if (len(self.dV_fwd[5:trip_point_index_fwd]) != 0) and (len(self.dV_fwd[trip_point_index_fwd:-5]) != 0):
-                u1 = np.abs(self.dV_fwd[5:trip_point_index_fwd] - 1).argmin() + 5
-
-                # addition needed to correctly address the data array after
-                # otherwise the array[tp:] has index starting from 0 again, resulting in wrong indexing
-                u2 = np.abs(self.dV_fwd[trip_point_index_fwd:-5] - 1).argmin() + trip_point_index_fwd + 5
-                unity_gain_point_fwd_before = (x_fwd[u1], y_fwd[u1])
-                unity_gain_point_fwd_after  = (x_fwd[u2], y_fwd[u2])
-            else: unity_gain_point_fwd_before = (np.nan,np.nan); unity_gain_point_fwd_after = (np.nan,np.nan)
-
-            if self.bwd_available:
-                trip_point_index_bwd = np.nanargmax(self.dV_bwd)
-                trip_point_bwd = (x_bwd[trip_point_index_bwd], y_bwd[trip_point_index_bwd])
-                gain_bwd = self.dV_bwd[trip_point_index_bwd]
-                if (len(self.dV_bwd[5:trip_point_index_bwd])!=0) and (len(self.dV_bwd[trip_point_index_bwd:-5])!=0):
-                    u3 = np.abs(self.dV_bwd[5:trip_point_index_bwd] - 1).argmin() + 5
-                    u4 = np.abs(self.dV_bwd[trip_point_index_bwd:-5] - 1).argmin() + trip_point_index_bwd + 5
-                    unity_gain_point_bwd_before = (x_bwd[u3], y_bwd[u3])
-                    unity_gain_point_bwd_after  = (x_bwd[u4], y_bwd[u4])
-                else:
-                    unity_gain_point_bwd_before = (np.nan, np.nan); unity_gain_point_bwd_after = (np.nan,np.nan)
+            self.dV_fwd = c["gradient"][0, :len(x_fwd)]
+            self.dV_bwd = c["gradient"][1, :len(x_bwd)] if self.bwd_available else None
 
-            else:
-                trip_point_bwd, unity_gain_point_bwd_before, unity_gain_point_bwd_after, gain_bwd = np.nan, np.nan, np.nan, np.nan
+            def point(a_):
+                return tuple(a_)
 
             # before and after refer to the trip point. in each fwd+bwd sweep there are 4 points to get the noise margin from
-            # THIS ANALYSIS OF BEFORE/AFTER IS FLAWED UNTIL NOW- WHAT HAPPENS FOR TRIP POINT NOT AT V_DD/2???????
-            """noise_margin_fwd_before      = self.supply_voltage - unity_gain_point_fwd_before[0]
-            noise_feedthrough_fwd_before = self.supply_voltage - unity_gain_point_fwd_before[1]
-            noise_margin_fwd_after       = self.supply_voltage - unity_gain_point_fwd_after[0]
-            noise_feedthrough_fwd_after  = self.supply_voltage - unity_gain_point_fwd_after[1]
-    
-            noise_margin_bwd_before      = self.supply_voltage - unity_gain_point_bwd_before[0]
-            noise_feedthrough_bwd_before = self.supply_voltage - unity_gain_point_bwd_before[1]
-            noise_margin_bwd_after       = self.supply_voltage - unity_gain_point_bwd_after[0]
-            noise_feedthrough_bwd_after  = self.supply_voltage - unity_gain_point_bwd_after[1]
-        
-            results = {"fwd":{"noise_margin":{"before":noise_margin_fwd_before, "after":noise_margin_fwd_after},
-                           "noise_feedthrough":{"before":noise_feedthrough_fwd_before,"after":noise_feedthrough_fwd_after},
-                           "plotdata":{"before":None,"after":None}},
-                    "bwd":{"noise_margin":{"before":noise_margin_fwd_before, "after":noise_margin_fwd_after},
-                           "noise_feedthrough":{"before":noise_feedthrough_fwd_before,"after":noise_feedthrough_fwd_after},
-                           "plotdata":{"before":None,"after":None}}
-                    }
-            """
-
-
-            nm_low_fwd  = unity_gain_point_fwd_before[0] - unity_gain_point_fwd_after[1]
-            nm_high_fwd = unity_gain_point_fwd_before[1] - unity_gain_point_fwd_after[0]
-            nm_eff_fwd = min(nm_low_fwd,nm_high_fwd)
-            nm_eff_fwd_perc = nm_eff_fwd/(1/2*self.supply_voltage)
-
-            nm_low_bwd = unity_gain_point_bwd_after[0] - unity_gain_point_bwd_before[1]
-            nm_high_bwd = unity_gain_point_bwd_after[1] - unity_gain_point_bwd_before[0]
-            nm_eff_bwd = min(nm_low_bwd, nm_high_bwd)
-            nm_eff_bwd_perc = nm_eff_bwd / (1 / 2 * self.supply_voltage)
+            trip_point_fwd = point(c["trip_point"][0])
+            gain_fwd = c["max_gain"][0]
+            unity_gain_point_fwd_before, unity_gain_point_fwd_after = point(c["unity_gain_points"][0, 0]), point(c["unity_gain_points"][0, 1])
+            nm_eff_fwd, nm_eff_fwd_perc = c["nm_eff"][0], c["nm_eff_perc"][0]
+
+            if self.bwd_available:
+                trip_point_bwd = point(c["trip_point"][1])
+                gain_bwd = c["max_gain"][1]
+                unity_gain_point_bwd_before, unity_gain_point_bwd_after = point(c["unity_gain_points"][1, 0]), point(c["unity_gain_points"][1, 1])
+                nm_eff_bwd, nm_eff_bwd_perc = c["nm_eff"][1], c["nm_eff_perc"][1]
+            else:
+                trip_point_bwd, gain_bwd = (np.nan, np.nan), np.nan
+                unity_gain_point_bwd_before, unity_gain_point_bwd_after = (np.nan, np.nan), (np.nan, np.nan)
+                nm_eff_bwd, nm_eff_bwd_perc = np.nan, np.nan
 
             results = {"trip_point":{"fwd":trip_point_fwd,"bwd":trip_point_bwd},
                        "nm_eff_fwd":(nm_eff_fwd,nm_eff_fwd_perc),
@@ -1308,7 +3090,146 @@ class InverterAnalysis():
             print_exc()
 
 
+# several VTCs at once, e.g. a V_DD sweep of one inverter, all inverters of a sample or mirrored inverter pairs.
+# the files are read with InverterAnalysis (same presets, smoothing and V_DD detection), sorted by V_DD and kept as
+# nan-padded 2d arrays (one curve per row, separately for fwd and bwd), so all of them are analyzed in one call
+class InverterFamilyAnalysis():
+    def __init__(self, carrier_type='p', filenames=None, filetype=None,
+                 smooth_factor=None, V_DD=None,  # V_DD: None (read from files), one value or one value per file
+                 column_settings={"names": None, "skiprows": None},
+                 ):
+        self.filetype = filetype
+        self.carrier_type = carrier_type
+        self.smoothing = smooth_factor
+
+        inverters = []
+        for i, f in enumerate(filenames):
+            try:
+                d = InverterAnalysis(carrier_type=carrier_type, filename=f, filetype=filetype, smooth_factor=smooth_factor,
+                                     V_DD=V_DD[i] if isinstance(V_DD, (list, tuple, np.ndarray)) else V_DD,
+                                     column_settings=column_settings)
+                d.V_in, d.V_out  # raises if the file could not be read
+                inverters.append(d)
+            except:
+                print(f"{f} could not be read and is ignored in the inverter family analysis.")
+
+        inverters.sort(key=lambda d: d.supply_voltage)
+        self.inverters = inverters
+        self.filenames = [d.filename for d in inverters]
+        self.supply_voltage = np.array([d.supply_voltage for d in inverters], dtype=float)
+
+        # same split into fwd and bwd sweep as in InverterAnalysis.get_characteristics()
+        self.V_in, self.V_out = {}, {}
+        for direction in ["fwd", "bwd"]:
+            x_, y_ = [], []
+            for d in inverters:
+                if direction == "fwd":
+                    x_.append(d.V_in[:d.split]); y_.append(d.V_out[:d.split])
+                else:
+                    x_.append(d.V_in[d.split:d.bwd_stop]); y_.append(d.V_out[d.split:d.bwd_stop])
+            self.V_in[direction], self.V_out[direction] = (_pad_rows(x_), _pad_rows(y_)) if len(inverters) > 0 else (None, None)
+
+    # gain, trip point and unity gain noise margins of all curves, see inverter_characteristics()
+    def get_characteristics(self, direction="fwd"):
+        results = inverter_characteristics(self.V_in[direction], self.V_out[direction], self.supply_voltage)
+        results["V_DD"] = self.supply_voltage
+        return results
+
+    # largest square noise margins of all curves, see butterfly_noise_margins(). pairs: list of (i, j) to combine VTC i
+    # with the mirrored VTC j (indices in the V_DD-sorted order of self.filenames); default: every VTC with itself
+    def get_butterfly_noise_margins(self, direction="fwd", pairs=None, n_grid=1000):
+        x_, y_ = self.V_in[direction], self.V_out[direction]
+        if pairs is None:
+            results = butterfly_noise_margins(x_, y_, n_grid=n_grid)
+            results["V_DD"] = self.supply_voltage
+        else:
+            i_, j_ = np.array(pairs).T
+            results = butterfly_noise_margins(x_[i_], y_[i_], x_[j_], y_[j_], n_grid=n_grid)
+            results["V_DD"] = self.supply_voltage[i_]
+        results["snm_perc"] = results["snm"] / (1/2 * results["V_DD"])
+        return results
+
+
+# fast reader for touchstone (.sNp) files. instead of letting pandas build a table column by column, the header is parsed
+# line by line until the first data line and the (much longer) data block is converted in a single call of
+# np.fromstring, which is then reshaped into the complex (n_freq, n_ports, n_ports) network parameter array.
+# the option line "# <freq unit> <parameter> <format> R <Z0>" is respected (defaults are GHz S MA R 50 as in the
+# touchstone specification); formats: RI (real/imag), MA (linear magnitude/angle in deg), DB (dB magnitude/angle in deg)
+# returns a dict with the frequencies in Hz, the S-parameters and the reference impedance
+_touchstone_frequency_units = {"hz": 1, "khz": 1e3, "mhz": 1e6, "ghz": 1e9}
+
+@traced("read_touchstone", "io")
+def read_touchstone(filename, n_ports=None):
+    if n_ports is None:
+        n_ports = int(m.group(1)) if (m := re.search(r"\.s(\d+)p$", filename, re.IGNORECASE)) is not None else 2
+    options = {"frequency_unit": "ghz", "parameter": "s", "format": "ma", "Z0": 50.}
+    order_12_21 = False  # touchstone 2.0 keyword, 2-ports are written as 11 21 12 22 by default
+
+    with open(filename, "r") as datafile:
+        lines = datafile.read().splitlines()
+
+    # header: comments (!), option line (#) and touchstone 2.0 keywords ([...])
+    comments, first_data_line = [], len(lines)
+    for i, line in enumerate(lines):
+        line_ = line.strip()
+        if line_.startswith("!"):
+            comments.append(line_[1:].strip())
+        elif line_.startswith("#"):
+            tokens = line_[1:].split("!")[0].lower().split()
+            for j, token in enumerate(tokens):
+                if token in _touchstone_frequency_units: options["frequency_unit"] = token
+                elif token in ("s", "y", "z", "h", "g"): options["parameter"] = token
+                elif token in ("ri", "ma", "db"): options["format"] = token
+                elif token == "r" and j+1 < len(tokens): options["Z0"] = float(tokens[j+1])
+        elif line_.startswith("["):
+            if line_.lower().startswith("[two-port data order]"): order_12_21 = "12_21" in line_
+            elif line_.lower().startswith("[number of ports]"): n_ports = int(line_.split("]")[1])
+        elif line_ != "":
+            first_data_line = i
+            break
+
+    # data block: in the usual case (no inline comments or keywords in between) it is converted in one go
+    body = lines[first_data_line:]
+    text = "\n".join(body)
+    if "!" in text or "[" in text:
+        text = "\n".join(line.split("!")[0] for line in body if not line.lstrip().startswith("["))
+    values = np.fromstring(text, sep=" ")
+
+    n_values = 1 + 2 * n_ports**2
+    n_freq = values.size // n_values
+    data = values[:n_freq * n_values].reshape(n_freq, n_values)
+    # 2-port files can contain noise parameters (5 values per frequency) after the S-parameters. the noise block starts
+    # where the frequency is no longer increasing; in that case the data lines have to be separated line by line
+    if values.size % n_values != 0 or np.any(np.diff(data[:, 0]) <= 0):
+        values_, count = [], 0
+        for line in text.splitlines():
+            tokens = line.split()
+            if not tokens: continue
+            if count % n_values == 0 and values_ and float(tokens[0]) <= float(values_[-n_values]): break  # noise data
+            values_.extend(tokens)
+            count += len(tokens)
+        data = np.array(values_[:count // n_values * n_values], dtype=float).reshape(-1, n_values)
+
+    f = data[:, 0] * _touchstone_frequency_units[options["frequency_unit"]]
+    a, b = data[:, 1::2], data[:, 2::2]
+    if options["format"] == "ri": values = a + 1j*b
+    elif options["format"] == "ma": values = a * np.exp(1j*np.deg2rad(b))
+    else: values = 10**(a/20) * np.exp(1j*np.deg2rad(b))
+
+    N = values.reshape(-1, n_ports, n_ports)
+    if n_ports == 2 and not order_12_21: N = N.swapaxes(1, 2)  # 11 21 12 22 -> [[11,12],[21,22]]
+
+    # Z and Y files are normalized to Z0 in touchstone 1.0 - convert them to S. H and G are rare, not supported here
+    if options["parameter"] == "z" and n_ports == 2: N = z_to_s(N)
+    elif options["parameter"] == "y" and n_ports == 2: N = y_to_s(N)
+    elif options["parameter"] != "s":
+        raise ValueError(f"{options['parameter'].upper()}-parameters in {filename} are not supported, only S (and Z, Y for 2-ports)")
+
+    return {"f": f, "S": np.ascontiguousarray(N), "Z0": options["Z0"], "options": options, "comments": comments}
+
+
 class SparameterAnalysis():
+    @traced("SparameterAnalysis")
     def __init__(self,
                  W=100,
                  L=100,
@@ -1338,21 +3259,17 @@ class SparameterAnalysis():
         # read the data and parse it accordingly
         self.datatype = "AnritsuVNA" if self.filename.endswith(".s2p") else "unknown"
         if self.datatype == "AnritsuVNA":
-            self.data_raw = pd.read_table(self.filename, skiprows=8, sep="\s+",
-                               names=["f", "S11r", "S11i", "S21r", "S21i", "S12r", "S12i", "S22r", "S22i"])
-            self.data_raw["f"] = 1e9 * self.data_raw["f"]
-            self.data_raw["S11"] = self.data_raw["S11r"] + 1j * self.data_raw["S11i"]
-            self.data_raw["S21"] = self.data_raw["S21r"] + 1j * self.data_raw["S21i"]
-            self.data_raw["S12"] = self.data_raw["S12r"] + 1j * self.data_raw["S12i"]
-            self.data_raw["S22"] = self.data_raw["S22r"] + 1j * self.data_raw["S22i"]
-            self.data_raw["S11abs_dB"] = 20 * np.log10(np.abs(self.data_raw["S11"]))
-            self.data_raw["S21abs_dB"] = 20 * np.log10(np.abs(self.data_raw["S21"]))
-            self.data_raw["S12abs_dB"] = 20 * np.log10(np.abs(self.data_raw["S12"]))
-            self.data_raw["S22abs_dB"] = 20 * np.log10(np.abs(self.data_raw["S22"]))
-            self.data_raw["S11phase_deg"] = np.angle(self.data_raw["S11"], deg=True)
-            self.data_raw["S21phase_deg"] = np.angle(self.data_raw["S21"], deg=True)
-            self.data_raw["S12phase_deg"] = np.angle(self.data_raw["S12"], deg=True)
-            self.data_raw["S22phase_deg"] = np.angle(self.data_raw["S22"], deg=True)
+            touchstone = read_touchstone(self.filename)
+            self.frequency, self.S, self.Z0 = touchstone["f"], touchstone["S"], touchstone["Z0"]
+
+            # all columns are built at once from the (n_freq, 2, 2) array instead of being appended one by one
+            S_ = {"S11": self.S[:, 0, 0], "S21": self.S[:, 1, 0], "S12": self.S[:, 0, 1], "S22": self.S[:, 1, 1]}
+            columns = {"f": self.frequency}
+            for key, S_ij in S_.items(): columns[key+"r"], columns[key+"i"] = S_ij.real, S_ij.imag
+            columns.update(S_)
+            for key, S_ij in S_.items(): columns[key+"abs_dB"] = 20 * np.log10(np.abs(S_ij))
+            for key, S_ij in S_.items(): columns[key+"phase_deg"] = np.angle(S_ij, deg=True)
+            self.data_raw = pd.DataFrame(columns)
 
             self.data = self.data_raw[["f", "S11", "S21", "S12", "S22"]]
 
@@ -1362,14 +3279,12 @@ class SparameterAnalysis():
                                    names=["f", "S11db", "S11deg", "S12db", "S12deg", "S21db", "S21deg", "S22db",
                                           "S22deg"], header=None)
 
-                self.data_raw.loc[:,"S11"] = 10 ** ((self.data_raw.loc[:,"S11db"]) / 20) * np.cos(np.deg2rad(self.data_raw.loc[:,"S11deg"])) + 1j * 10 ** (
-                            (self.data_raw.loc[:,"S11db"]) / 20) * np.sin(np.deg2rad(self.data_raw.loc[:,"S11deg"]))
-                self.data_raw.loc[:,"S12"] = 10 ** ((self.data_raw.loc[:,"S12db"]) / 20) * np.cos(np.deg2rad(self.data_raw.loc[:,"S12deg"])) + 1j * 10 ** (
-                            (self.data_raw.loc[:,"S12db"]) / 20) * np.sin(np.deg2rad(self.data_raw.loc[:,"S12deg"]))
-                self.data_raw.loc[:,"S21"] = 10 ** ((self.data_raw.loc[:,"S21db"]) / 20) * np.cos(np.deg2rad(self.data_raw.loc[:,"S21deg"])) + 1j * 10 ** (
-                            (self.data_raw.loc[:,"S21db"]) / 20) * np.sin(np.deg2rad(self.data_raw.loc[:,"S21deg"]))
-                self.data_raw.loc[:,"S22"] = 10 ** ((self.data_raw.loc[:,"S22db"]) / 20) * np.cos(np.deg2rad(self.data_raw.loc[:,"S22deg"])) + 1j * 10 ** (
-                            (self.data_raw.loc[:,"S22db"]) / 20) * np.sin(np.deg2rad(self.data_raw.loc[:,"S22deg"]))
+                # dB/deg -> complex for all four parameters at once, columns are ordered S11 S12 S21 S22
+                dB_deg = self.data_raw.iloc[:, 1:9].to_numpy(dtype=float)
+                self.frequency, self.Z0 = self.data_raw["f"].to_numpy(dtype=float), 50
+                self.S = (10**(dB_deg[:, 0::2]/20) * np.exp(1j*np.deg2rad(dB_deg[:, 1::2]))).reshape(-1, 2, 2)
+                for key, (i_, j_) in {"S11": (0, 0), "S12": (0, 1), "S21": (1, 0), "S22": (1, 1)}.items():
+                    self.data_raw.loc[:,key] = self.S[:, i_, j_]
                 self.data = self.data_raw[["f", "S11", "S12", "S21", "S22"]]
 
             except:
@@ -1380,21 +3295,34 @@ class SparameterAnalysis():
         self.data_raw.loc[:,"h21"], self.data.loc[:,"h21"] = h21_, h21_
         self.data_raw.loc[:,"h21_dB"], self.data.loc[:,"h21_dB"] = 20*np.log10(np.abs(h21_)), 20*np.log10(np.abs(h21_))
 
-    def calculate_h21(self):
+    # other two-port representations of the measured S-parameters as (n_freq, 2, 2) arrays, parameter is "H", "Y" or "Z"
+    def two_port_parameters(self, parameter="H"):
+        conversion = {"H": s_to_h, "Y": s_to_y, "Z": s_to_z}[parameter.upper()]
+        return conversion(self.S, self.Z0)
 
-        S11, S12, S21, S22 = self.data.loc[:,"S11"], self.data.loc[:,"S12"], self.data.loc[:,"S21"], self.data.loc[:,"S22"]
-        h21 = np.abs( -2*S21 / (    (1-S11)*(1+S22)  + S21*S12   ) )
-        return h21
+    def calculate_h21(self):
+        return np.abs(s_to_h(self.S, self.Z0)[:, 1, 0])
 
     # the transit frequency is determined by the intercept of a linear fit of the linear part of h21(f) with y=1 in a semilogx plot
     # to accomplish that the data is converted to logscale and dB, respectively, before doing the fit
+    # with fTbounds="auto" the fit range is the widest -20 dB/dec region of h21 (see find_decay_window)
+    @traced()
     def calculate_fT(self):
         if self.fTfit_bool == False: return None # user can choose not to fit fT
 
-        start, stop = self.fTbounds
         x,y = self.data["f"],self.data["h21"]
-        xfit = self.data[(self.data["f"]>start)&(self.data["f"]<stop)]["f"]
-        yfit = self.data[(self.data["f"]>start)&(self.data["f"]<stop)]["h21"]
+        if isinstance(self.fTbounds, str) and self.fTbounds == "auto":
+            window = find_decay_window(np.log10(x.to_numpy()), 20*np.log10(y.to_numpy()))
+            if not window["found"][0]:
+                print("No region with -20 dB/dec decay of h21 found, fT cannot be determined automatically. Please choose the fit range manually.")
+                return None
+            fitrange = np.zeros(len(x), dtype=bool)
+            fitrange[window["start"][0]:window["stop"][0]] = True
+        else:
+            start, stop = self.fTbounds
+            fitrange = ((self.data["f"]>start)&(self.data["f"]<stop)).to_numpy()
+        xfit = self.data[fitrange]["f"]
+        yfit = self.data[fitrange]["h21"]
         x_log, y_dB, xfit_log, yfit_dB = np.log10(x), 20*np.log10(y), np.log10(xfit), 20*np.log10(yfit)
         def linear_regression(x, a, b):
             return a * x + b
@@ -1406,8 +3334,13 @@ class SparameterAnalysis():
             fT = 10**intercept     # fT in Hz since fit was done for log10(x)
             dfT = np.abs(-1/a)*db + np.abs( -(1-b)/(a**2) )*da  # error propagation
 
+            # a window outside of the -20 dB/dec region still gives a "result", so at least tell the user
+            if np.abs(a + 20) > 2:
+                print(f"The slope of h21 in the fit range is {a:.1f} dB/dec instead of -20 dB/dec, the fT fit range might be off.")
+
             results = {"xdata":x,"ydata":y,"xfitdata":xfit,"yfitdata":yfit,"fT":fT,"fitslope":a,
                        "fitplot_ydata":linear_regression(np.log10(x),*popt), # needs to be calculated as line so that it works in the GUI with semilogx
+                       "fitbounds":[xfit.min(), xfit.max()],
                        "errors":{"fT":dfT,"slope":da}}
             return results
 
@@ -1416,6 +3349,425 @@ class SparameterAnalysis():
             return None
 
 
+# running sums of a least squares line, one column per fit: rows are n, number of non-finite y values, sum x, sum y,
+# sum x², sum xy and sum y² of the finite points. single points are added or removed by adding/subtracting their terms,
+# so e.g. the TLM regressions of all overdrive voltages are updated in O(1) per overdrive when one device changes
+def _regression_sum_terms(x, y):
+    y = np.asarray(y, dtype=float)
+    ok = np.isfinite(y)
+    y_ = np.where(ok, y, 0.)
+    x_ = np.where(ok, x, 0.)
+    return np.array([ok, np.isinf(y), x_, y_, x_*x_, x_*y_, y_*y_], dtype=float)
+
+
+# fit of y = a*x + b from the running sums above, equal to curve_fit (pcov scaled with the residual variance, inf for
+# only two points). returns a, b, pcov (..., 2, 2), R² and a mask of the columns that can be fitted at all (at least two
+# points with different x, and no infinite y, which curve_fit would refuse)
+def _linear_regression_sums(sums):
+    n, n_inf, Sx, Sy, Sxx, Sxy, Syy = sums
+    with np.errstate(divide='ignore', invalid='ignore'):
+        D = n * Sxx - Sx**2
+        valid = (n >= 2) & (n_inf == 0) & (D > 0)
+        a = (n * Sxy - Sx * Sy) / D
+        b = (Sy - a * Sx) / n
+        ss_tot = Syy - Sy**2 / n
+        ss_residuals = np.maximum(ss_tot - (Sxy - Sx * Sy / n)**2 / (D / n), 0)
+        r_sq = 1 - ss_residuals / ss_tot
+        s2 = np.where(n > 2, ss_residuals / (n - 2), np.inf)
+        pcov = np.stack([np.stack([s2 * n / D, -s2 * Sx / D], axis=-1),
+                         np.stack([-s2 * Sx / D, s2 * Sxx / D], axis=-1)], axis=-2)
+    pcov[n <= 2] = np.inf
+    return a, b, pcov, r_sq, valid
+
+
+# mu_eff and V_th of the saturation model from the line through sqrt(|Id|) (see mobility_sat_guess) for one or more fit
+# windows at once, given the running sums of each window (columns of sums, see above) and the sign of its current. the
+# covariance of the line is propagated to (mu_eff, V_th), so popt and pcov can be used like those of curve_fit. valid
+# marks the windows where the line is not degenerate
+def _sat_line_parameters(sums, sign, Z, L, C_ox):
+    a, b, pcov, r_sq, valid = _linear_regression_sums(sums)
+    k = 2 * L / (Z * C_ox)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        popt = np.stack([sign * a**2 * k, -b / a], axis=-1)
+        J = np.zeros(a.shape + (2, 2))
+        J[..., 0, 0] = 2 * sign * a * k
+        J[..., 1, 0] = b / a**2
+        J[..., 1, 1] = -1 / a
+        pcov = J @ pcov @ np.swapaxes(J, -1, -2)
+    return popt, pcov, valid & (a != 0)
+
+
+# least squares line y = a*x + b through each row of y (x common to all rows) in closed form, so that all bias points are
+# fitted at once. returns slopes, intercepts and their standard errors in the same way as curve_fit (pcov scaled with
+# the residual variance)
+def _linear_regression_rows(x, y):
+    n = x.size
+    x_mean, y_mean = x.mean(), y.mean(axis=-1)
+    Sxx = np.sum((x - x_mean)**2)
+    a = np.sum((x - x_mean) * (y - y_mean[..., None]), axis=-1) / Sxx
+    b = y_mean - a * x_mean
+    s2 = np.sum((y - (a[..., None] * x + b[..., None]))**2, axis=-1) / (n - 2) if n > 2 else np.full_like(a, np.nan)
+    return a, b, np.sqrt(s2 / Sxx), np.sqrt(s2 * (1/n + x_mean**2 / Sxx))
+
+
+# robust line y = a*x + b through every column of y (one row per point, x common to all columns, nan for missing
+# points) for all columns at once. "huber": iteratively reweighted least squares with Huber weights (c robust standard
+# deviations), "theilsen": median of the slopes between all pairs of points, "ransac": the line through the pair of
+# points with the most points within threshold robust standard deviations (of the Theil-Sen line), then least squares
+# of these points; all pairs are tried, or max_trials of them (always the same) if there are more. with relative, the
+# residuals are taken relative to the line and the least squares are weighted accordingly (for a spread that grows
+# with y, like RW of devices with a spread in mobility). the robust standard deviation is 1.4826*MAD of the residuals.
+# returns a, b, pcov, R² and valid like _linear_regression_sums (of the final weighted least squares fit, for Theil-Sen
+# of all points) and the absolute residuals in robust standard deviations (inf for infinite y)
+def _robust_regression_columns(x, y, method="huber", relative=False, c=1.345, threshold=2.5, max_iterations=50,
+                               max_trials=300):
+    if method not in ("huber", "theilsen", "ransac"): raise ValueError(f"Unknown regression method {method}.")
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    ok, infinite = np.isfinite(y), np.isinf(y)
+    y = np.where(ok, y, np.nan)
+    xx = x[:, None]
+
+    # least squares with weights w (0 leaves a point out; relative: divided by the squared line). the weights are scaled
+    # to a sum equal to the number of points, so the degrees of freedom of pcov are the ones of curve_fit with sigma
+    def weighted_fit(w, a=None, b=None):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if relative and a is not None: w = w / (a * xx + b)**2
+            w = np.where(np.isfinite(w) & ok, w, 0.)
+            w = w * np.where(w.sum(axis=0) > 0, (w > 0).sum(axis=0) / w.sum(axis=0), 0.)
+        sums = (_regression_sum_terms(xx, np.where(w > 0, y, np.nan)) * w).sum(axis=1)
+        sums[0] = (w > 0).sum(axis=0)  # exactly, without rounding errors of the weights
+        return _linear_regression_sums(sums)
+
+    def residuals(a, b, y=y):
+        line = a * xx + b
+        if not relative: return y - line
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (y - line) / np.abs(line)
+
+    def scale(r):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return 1.4826 * np.nanmedian(np.abs(r), axis=0)
+
+    # pairs of points with different x
+    i, j = np.triu_indices(len(x), 1)
+    i, j = i[x[j] != x[i]], j[x[j] != x[i]]
+    with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        a, = np.nanmedian((y[j] - y[i]) / (x[j] - x[i])[:, None], axis=0, keepdims=True)
+        b, = np.nanmedian(y - a * xx, axis=0, keepdims=True)
+
+    w = ok.astype(float)
+    if method == "huber":
+        for _ in range(max_iterations):
+            a, b = weighted_fit(w, a, b)[:2]
+            r = residuals(a, b)
+            s = scale(r)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                w_ = np.where(ok, np.where((np.abs(r) > c * s) & (s > 0), c * s / np.abs(r), 1.), 0.)
+            if np.allclose(w_, w, atol=1e-8): break
+            w = w_
+    elif method == "ransac" and len(i):
+        tolerance = threshold * scale(residuals(a, b))
+        if len(i) > max_trials:
+            k = np.sort(np.random.default_rng(0).choice(len(i), max_trials, replace=False))
+            i, j = i[k], j[k]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a_ = (y[j] - y[i]) / (x[j] - x[i])[:, None]
+            b_ = y[i] - a_ * x[i][:, None]
+            inliers = np.abs(residuals(a_[:, None], b_[:, None], y[None])) <= tolerance
+        best, columns = np.argmax(inliers.sum(axis=1), axis=0), np.arange(y.shape[1])
+        w = np.where(inliers[best, :, columns].T, 1., 0.)
+        a, b = a_[best, columns], b_[best, columns]
+
+    a_ts, b_ts = a, b
+    a, b, pcov, r_sq, valid = weighted_fit(w, a, b)
+    if method == "theilsen": a, b = a_ts, b_ts
+    r = residuals(a, b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(infinite, np.inf, np.abs(r) / scale(r))
+    return a, b, pcov, r_sq, valid, z
+
+
+# automatic search of the fit window for fT/f_max: all windows [start, stop) between a set of candidate boundaries (every
+# point for short curves, otherwise n_boundaries points evenly spread over the curve) are fitted at once with a straight
+# line in log(f) using cumulative sums (the sums over any window are differences of two prefix sums, so each window costs
+# O(1) instead of O(n)). among the windows with a slope within slope_tolerance of the expected decay (-20 dB/dec) and an
+# rms deviation below rms_tolerance (dB), the one spanning the most decades is chosen. works on a single curve or on
+# one curve per row (e.g. one row per bias point), rows without a suitable window get found=False and nan
+def find_decay_window(log_f, gain_dB, slope=-20, slope_tolerance=2, rms_tolerance=.5, min_points=5, min_decades=.3,
+                      n_boundaries=128, chunksize=2**21):
+    x = np.asarray(log_f, dtype=float)
+    Y = np.atleast_2d(np.asarray(gain_dB, dtype=float))
+    n_rows, n = Y.shape
+
+    # candidate windows
+    bounds = np.unique(np.round(np.linspace(0, n, min(n + 1, n_boundaries + 1))).astype(int))
+    I, J = np.triu_indices(len(bounds), k=1)
+    I, J = bounds[I], bounds[J]
+    keep = (J - I >= max(min_points, 3)) & (x[J - 1] - x[I] >= min_decades)
+    I, J = I[keep], J[keep]
+    N, span = (J - I).astype(float), x[J - 1] - x[I]
+
+    # prefix sums (centered to limit cancellation), non-finite points (e.g. log of 0) are excluded via their count
+    x0 = x.mean()
+    xc = x - x0
+    finite = np.isfinite(Y)
+    y0 = np.nanmean(np.where(finite, Y, np.nan), axis=1, keepdims=True)
+    Yc = np.where(finite, Y - y0, 0)
+    def prefix(a): return np.concatenate((np.zeros(a.shape[:-1] + (1,)), np.cumsum(a, axis=-1)), axis=-1)
+    Sx, Sxx = prefix(xc), prefix(xc**2)
+    Sy, Sxy, Syy, Sbad = prefix(Yc), prefix(Yc * xc), prefix(Yc**2), prefix((~finite).astype(float))
+
+    sx, sxx = Sx[J] - Sx[I], Sxx[J] - Sxx[I]
+    Sxx_c = sxx - sx**2 / N
+
+    results = {key: np.full(n_rows, np.nan) for key in ["a", "b", "da", "db", "rms"]}
+    results["start"], results["stop"] = np.full(n_rows, -1), np.full(n_rows, -1)
+
+    step = max(1, chunksize // max(len(I), 1))
+    for r0 in range(0, n_rows if len(I) > 0 else 0, step):
+        rows = slice(r0, r0 + step)
+        sy = Sy[rows][:, J] - Sy[rows][:, I]
+        sxy = Sxy[rows][:, J] - Sxy[rows][:, I]
+        syy = Syy[rows][:, J] - Syy[rows][:, I]
+        bad = Sbad[rows][:, J] - Sbad[rows][:, I]
+
+        Sxy_c = sxy - sx * sy / N
+        a = Sxy_c / Sxx_c
+        SSR = np.maximum(syy - sy**2 / N - a * Sxy_c, 0)
+        rms = np.sqrt(SSR / N)
+
+        feasible = (bad == 0) & (np.abs(a - slope) <= slope_tolerance) & (rms <= rms_tolerance)
+        score = np.where(feasible, span - 1e-6 * rms, -np.inf)  # widest window, the better fit if equally wide
+        best = np.argmax(score, axis=1)
+        found = np.isfinite(score[np.arange(score.shape[0]), best])
+
+        idx = np.arange(r0, r0 + score.shape[0])[found]
+        k = best[found]
+        a_, N_ = a[found, k], N[k]
+        s2 = SSR[found, k] / (N_ - 2)
+        x_mean = sx[k] / N_ + x0
+        results["a"][idx] = a_
+        results["b"][idx] = sy[found, k] / N_ + y0[idx, 0] - a_ * x_mean
+        results["da"][idx] = np.sqrt(s2 / Sxx_c[k])
+        results["db"][idx] = np.sqrt(s2 * (1 / N_ + x_mean**2 / Sxx_c[k]))
+        results["rms"][idx] = rms[found, k]
+        results["start"][idx], results["stop"][idx] = I[k], J[k]
+
+    results["found"] = results["start"] >= 0
+    return results
+
+
+# batch version of SparameterAnalysis for a set of s2p-files measured at different bias points (V_GS, V_DS). all files are
+# read (in parallel) into one complex array of shape (n_bias, n_freq, 2, 2), from which h21 and Mason's unilateral gain U
+# are calculated for all bias points in one pass, and fT and f_max are extrapolated from the -20 dB/dec decay of h21 and U
+# within the given frequency bounds (or "auto" for a window per bias point). the bias of each file is taken from its
+# name, e.g. "..._VGS-1.5_VDS-2.s2p" or "..._Vg=-1.5V_Vd=-2V.s2p" (a custom pattern with the named groups VGS and VDS
+# can be given)
+_bias_patterns = {"VGS": re.compile(r"V_?G(?:S)?[=_\s]*(?P<VGS>[-+]?\d+(?:[.,p]\d+)?)", re.IGNORECASE),
+                  "VDS": re.compile(r"V_?D(?:S)?[=_\s]*(?P<VDS>[-+]?\d+(?:[.,p]\d+)?)", re.IGNORECASE)}
+
+class SparameterBiasSweep():
+    def __init__(self,
+                 directory=None,
+                 filenames=None,
+                 fTbounds=[1e6,1e7],
+                 fmaxbounds=None,
+                 bias_pattern=None,
+                 workers=None,
+                 progress_callback=None,
+                 ):
+        if filenames is None:
+            filenames = [os.path.join(directory, i) for i in sorted(os.listdir(directory))
+                         if re.search(r"\.s2p$", i, re.IGNORECASE)]
+        self.fTbounds = fTbounds
+        self.fmaxbounds = fTbounds if fmaxbounds is None else fmaxbounds
+
+        touchstones = self.read_files(filenames, workers=workers, progress_callback=progress_callback)
+
+        # only files with the same frequency points as the first one can be stacked
+        self.filenames, S_ = [], []
+        for filename, touchstone in zip(filenames, touchstones):
+            if touchstone is None: continue
+            if len(S_) == 0:
+                self.frequency, self.Z0 = touchstone["f"], touchstone["Z0"]
+            elif touchstone["f"].shape != self.frequency.shape or not np.allclose(touchstone["f"], self.frequency):
+                print(f"{os.path.basename(filename)} was measured at different frequencies and is not included.")
+                continue
+            self.filenames.append(filename)
+            S_.append(touchstone["S"])
+        if len(S_) == 0: raise ValueError("None of the given files could be read as S-parameters.")
+        self.S = np.stack(S_)
+
+        self.VGS, self.VDS = self.parse_bias(self.filenames, bias_pattern)
+
+        self.h21 = np.abs(s_to_h(self.S, self.Z0)[..., 1, 0])
+        self.U = mason_unilateral_gain(self.S)
+
+    # reads all files with read_touchstone, in worker processes if there are several. files that cannot be read are None
+    @staticmethod
+    def read_files(filenames, workers=None, progress_callback=None):
+        results = {}
+
+        def collect(i, result):
+            results[i] = result
+            if progress_callback is not None:
+                try: progress_callback(filenames[i], len(results), len(filenames))
+                except: print_exc()
+
+        def read(filename):
+            try: return read_touchstone(filename)
+            except:
+                print(f"Could not read {os.path.basename(filename)}.")
+                return None
+
+        if workers is None: workers = os.cpu_count() or 1
+        workers = min(workers, len(filenames))
+        if workers > 1:
+            try:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = {pool.submit(read_touchstone, f_): i for i, f_ in enumerate(filenames)}
+                    for future in concurrent.futures.as_completed(futures):
+                        try: collect(futures[future], future.result())
+                        except: collect(futures[future], read(filenames[futures[future]]))
+            except:
+                print_exc()
+                print("Parallel reading of the S-parameter files failed, continuing sequentially.")
+
+        for i, f_ in enumerate(filenames):
+            if i not in results: collect(i, read(f_))
+
+        return [results[i] for i in range(len(filenames))]
+
+    @staticmethod
+    def parse_bias(filenames, bias_pattern=None):
+        bias = {"VGS": np.full(len(filenames), np.nan), "VDS": np.full(len(filenames), np.nan)}
+        for i, filename in enumerate(filenames):
+            name = os.path.splitext(os.path.basename(filename))[0]
+            for key in bias:
+                pattern = _bias_patterns[key] if bias_pattern is None else bias_pattern
+                if (m := re.search(pattern, name)) is not None and m.groupdict().get(key) is not None:
+                    bias[key][i] = float(m.group(key).replace(",", ".").replace("p", "."))
+        return bias["VGS"], bias["VDS"]
+
+    # fT from |h21| (same intersection with y=1 as SparameterAnalysis.calculate_fT) and f_max from U in dB (10log10, power
+    # gain) extrapolated to 0 dB, for all bias points at once. returns a dict of arrays with one entry per bias point
+    # with bounds "auto" every bias point gets its own fit window (find_decay_window), stored as key+"_window" in Hz
+    @traced()
+    def calculate_fT_fmax(self):
+        log_f = np.log10(self.frequency)
+        results = {"VGS": self.VGS, "VDS": self.VDS, "filenames": self.filenames}
+
+        for key, gain_dB, bounds, level in [("fT", 20*np.log10(self.h21), self.fTbounds, 1),
+                                             ("fmax", 10*np.log10(self.U), self.fmaxbounds, 0)]:
+            if isinstance(bounds, str) and bounds == "auto":
+                window = find_decay_window(log_f, gain_dB)
+                a, b, da, db = window["a"], window["b"], window["da"], window["db"]
+                results[key+"_window"] = np.where(window["found"][:, None],
+                                                  self.frequency[np.c_[window["start"], window["stop"] - 1]], np.nan)
+                if not all(window["found"]):
+                    print(f"No -20 dB/dec region found for {key} in {np.count_nonzero(~window['found'])} of {len(self.filenames)} files.")
+            else:
+                start, stop = bounds
+                window = (self.frequency > start) & (self.frequency < stop)
+                if np.count_nonzero(window) < 2:
+                    print(f"Less than two frequency points between {start:.1e} Hz and {stop:.1e} Hz, {key} cannot be determined.")
+                    results[key] = results[key+"_slope"] = np.full(len(self.filenames), np.nan)
+                    results["errors_"+key] = {key: results[key], "slope": results[key]}
+                    continue
+                a, b, da, db = _linear_regression_rows(log_f[window], gain_dB[:, window])
+                results[key+"_window"] = np.tile([start, stop], (len(self.filenames), 1)).astype(float)
+            results[key] = 10**((level - b) / a)
+            results[key+"_slope"] = a
+            results["errors_"+key] = {key: np.abs(-1/a)*db + np.abs(-(level - b)/a**2)*da, "slope": da}
+
+        return results
+
+    # arranges one result (e.g. "fT" or "fmax") on the grid of the measured gate and drain voltages, nan where no
+    # measurement exists. returns the unique V_GS, unique V_DS and the (n_VGS, n_VDS) map
+    def bias_map(self, quantity="fT", results=None):
+        if results is None: results = self.calculate_fT_fmax()
+        VGS_, i_ = np.unique(self.VGS, return_inverse=True)
+        VDS_, j_ = np.unique(self.VDS, return_inverse=True)
+        grid = np.full((len(VGS_), len(VDS_)), np.nan)
+        grid[i_.ravel(), j_.ravel()] = results[quantity]
+        return VGS_, VDS_, grid
+
+
+
+# TLM of a single temperature for Arrhenius.analyze_temperatureDependent_TLM(). module level function so it can be
+# sent to worker processes; only the numbers needed for the Arrhenius plot are sent back, not the whole TLM
+def _temperature_TLM(t, tlm_settings):
+    try:
+        print(f"Analyzing T={int(t):03d} K ...")
+        tlm = TLM_Analysis(**tlm_settings)
+        o, r, err, bestfitdata, allRWs, l_0, Rc0W, mu0, mu0err, rs_sheet, rs_sheet_err, all_Vths, all_SSws = tlm.contactresistance()
+        return np.array(r), np.array(err), np.array(mu0), np.array(mu0err), tlm.VDS
+    except:
+        print_exc()
+        print(f"TLM for T={int(t):03d} K failed and will be ignored in the Arrhenius analysis.")
+        return None
+
+
+# data for the joint Arrhenius fit: Vth and overdrive voltage of every device (with common derivative thresholds, as in
+# the TLM), but no TLM. the devices are read and fitted for Vth as in TLM_Analysis, without the subthreshold swing and
+# the TLM regressions. per device: channel length (m), gate voltage, RW (Ohm m), gate voltage step and Vth
+def _temperature_RW_data(t, tlm_settings):
+    try:
+        print(f"Reading T={int(t):03d} K ...")
+        s, VDS, archive = tlm_settings, tlm_settings["V_DS"], tlm_settings["archive"]
+        auto = (s["fd"] is None) or (s["sd"] is None)
+        fd, sd = (1, 0) if auto else (s["fd"], s["sd"])
+        prefetch = FilePrefetcher([i for i in s["filenames"] if archive is None or archive.entry(i) is None],
+                                  parallel=s["prefetch"]) if s["prefetch"] else None
+        transistors = []
+        for i in s["filenames"]:
+            try:
+                if VDS is None: VDS = parse_filename_metadata(i)["VDS"]
+                dimensions = TLM_device_dimensions(i, s["L_correct"])
+                if dimensions is None: continue
+                transistors.append(TransistorAnalysis(*dimensions, s["C_ox"], filenames={'lin': i, 'sat': None},
+                                                      filetype=s["filetype"], isTLM=False, carrier_type=s["carrier_type"],
+                                                      fd=fd, sd=sd, smoothing=s["smoothing"], V_DS=VDS,
+                                                      manualFitRange=s["manualFitRange"], fitRestriction=s["fitRestriction"],
+                                                      column_settings=s["column_settings"], archive=archive, prefetch=prefetch))
+                if prefetch is not None: prefetch.release(i)
+            except:
+                print_exc()
+        if prefetch is not None: prefetch.close()
+
+        # VDS from the data if it is not in the filenames, and the common derivative thresholds (see TLM_Analysis)
+        for t_ in transistors:
+            if VDS is not None: break
+            try: VDS = float(t_.linear_sweep.Vd.astype('float').mean())
+            except: continue
+        for t_ in transistors: t_.linear_source_drain_voltage = VDS
+        if auto:
+            for t_ in transistors:
+                try:
+                    f__, s__, ysmooth__ = t_.fit_mobility_lin()[2]
+                    fd, sd = min(fd, f__), max(sd, s__)
+                except:
+                    continue
+            for t_ in transistors: t_.update_parameters(fd=fd, sd=sd)
+
+        devices = []
+        for t_ in transistors:
+            try:
+                t_.Vth = t_.fit_mobility_lin()[0][s["fitRestriction"]][1]
+                t_.prepare_overdrive()
+            except:
+                print(f'L={t_.channel_length:.2e}m cant be fitted and will be ignored in the Arrhenius analysis.')
+                continue
+            ov, rw, vg = t_.overdrive_arrays(s["fitRestriction"])
+            devices.append((t_.channel_length, vg.astype(float), rw.astype(float), t_.Vg_stepsize, t_.Vth))
+        return devices, VDS
+    except:
+        print_exc()
+        print(f"Data for T={int(t):03d} K could not be prepared and will be ignored in the Arrhenius analysis.")
+        return None
+
 
 class Arrhenius():
     def __init__(self,
@@ -1432,7 +3784,11 @@ class Arrhenius():
                                  'ssw': False},
                  fitRestriction=None,  # could be "fwd" or "back" otherwise
                  column_settings={"names": None, "skiprows": None},
-                 L_correct=None
+                 L_correct=None,
+                 regression="ols",  # TLM regression and outlier rejection of every temperature, see TLM_Analysis
+                 reject_outliers=False,
+                 archive=None,  # SweepArchive of the data files, it is opened again in every worker process
+                 prefetch=None  # number of files each TLM reads concurrently, see TLM_Analysis
                  ):
         # input of Z,L,C_ox in µm and µF/cm², respectively. fd and sd are thresholds for automatic data fit
 
@@ -1448,96 +3804,32 @@ class Arrhenius():
         self.manualFitRanges = manualFitRange
         self.fitRestriction = fitRestriction  # this is not used for now. will be used later on to make it possible to use data files with only fwd or back data.
         self.f = -1 if self.carrier_type == 'p' else 1 if self.carrier_type == 'n' else None
+        self.column_settings = column_settings
         self.column_names = i.split(";") if ((i := column_settings["names"]) is not None) else None
         self.skiprows = column_settings["skiprows"]
         self.measurements = {}
         self.L_correct = L_correct if (L_correct is not None) else None
+        self.regression = regression
+        self.reject_outliers = reject_outliers
+        self.archive = archive
+        self.prefetch = prefetch
 
         for i in self.filenames:
             try:
                 # this try/except is only to read the sample name, to be used as plot label in the RcW(V-Vth) plot.
                 # if it does not succeed, everything else can be used but the label will default to "data" (see main script)
-                try:
-                    # this pattern refers to the goettingen files that have been renamed to TW convention
-                    #p_goett = r".*[\/\\](?P<N>[A-Za-z\d]+).*W(?P<W>[\d.]+)[_#]*L(?P<L>[\d.]+)[_#].*G(?P<G>[\d]+)[_\w]*T(?P<T>[\d]+).*"
-                    if self.filetype=="Goettingen":
-                        p_goett = r".*[\/\\](?P<N>[A-Za-z\d]+)_W(?P<W>[\d.]+)[_#]*L(?P<L>[\d.]+)_[_\w]*G(?P<G>[\d]+)_T(?P<T>[\d]+).*"
-                        m = re.match(p_goett, i)
-                        n, t, w, l, g = m.group(("N")), int(m.group(("T"))), int(m.group(("W"))), float(m.group(("L"))), int(m.group("G"))
-
-                    elif self.filetype=="Marburg":
-                        p_marburg = r".*[\/\\](?P<N>[A-Za-z\d]+)_W(?P<W>[\d.]+)[_#]*L(?P<L>[\d.]+).*_T(?P<T>[\d]+).*"
-                        m = re.match(p_marburg, i)
-                        n, t, w, l = m.group(("N")), float(m.group(("T"))), float(m.group(("W"))), float(m.group(("L")))
-                except:
-                    print_exc()
-                    print("The required info (SampleName,ChannelWidth,ChannelLength,Temperature) could not be extracted from filename. Please check the regex pattern!")
+                # goettingen files (renamed to TW convention) additionally contain the gate as G<number> before _T
+                meta = parse_filename_metadata(i)
+                required = ["name", "W", "L", "T"] + (["G"] if self.filetype == "Goettingen" else [])
+                if any(meta[key] is None for key in required):
+                    print(f"The required info (SampleName,ChannelWidth,ChannelLength,Temperature) could not be extracted from filename {os.path.basename(i)}. Please check the naming!")
                     continue
+                t = int(meta["T"]) if self.filetype == "Goettingen" else meta["T"]
 
 
 
-                # assuming sweepme files or goettingen files
-                # the real VDS will be determined from the file
-                if self.VDS is None:
-                    try:
-                        c = pd.read_table(i, nrows=5).columns
-                        file_ext = i.split('.')[-1]
-
-                        if self.filetype == "Custom":
-                            transfer_column_names = self.column_names
-                            skiprows = self.skiprows
-                            print("Use custom data preset on your own risk. Errors in syntax, column names etc can happen!!")
-
-                        elif self.filetype == "SweepMe!":
-                            transfer_column_names = ['time_elapsed', 'timestamp', 'lin_source Voltage', 'lin_source Current',
-                                        'lin_drain Voltage', 'lin_drain Current', 'lin_gate Voltage', 'lin_gate Current']
-                            skiprows = 3
-
-                        elif self.filetype == "Goettingen":
-                            transfer_column_names = ['lin_drain Voltage', 'lin_gate Voltage', 'lin_drain Current',
-                                        'lin_gate Current', 'time_elapsed', 'empty']
-                            skiprows = 4
-
-                        elif self.filetype == "Marburg":
-                            transfer_column_names = {
-                                'lin': ['time_elapsed', 'timestamp', 'lin_drain Voltage', 'lin_drain Current', 'lin_drain Resistance', 'lin_gate Voltage', 'lin_gate Current', 'lin_gate Resistance'],
-                                'sat': ['time_elapsed', 'timestamp', 'sat_drain Voltage', 'sat_drain Resistance','sat_drain Current', 'sat_gate Voltage', 'sat_gate Current', 'sat_gate Resistance']} if any(['Resistance' in i for i in c]) else {
-                                'lin': ['time_elapsed', 'timestamp', 'lin_drain Voltage', 'lin_drain Current', 'lin_gate Voltage', 'lin_gate Current'],
-                                'sat': ['time_elapsed', 'timestamp', 'sat_drain Voltage', 'sat_drain Current', 'sat_gate Voltage', 'sat_gate Current']}
-                            skiprows = 3
-                            sep = "\t"
-
-
-                        elif self.filetype == "LabVIEW":
-                            transfer_column_names = ['lin_gate Voltage', 'time', 'lin_drain Current', 'lin_gate Current',
-                            'abs_lin_drain_current', 'abs_lin_gate_current', 'sqrt_lin_drain_current', '1stderiv_lin_drain_current',
-                            '2ndderiv_lin_drain_current']
-                            skiprows = 2
-
-                        elif self.filetype == "ParameterAnalyzer":
-                            transfer_column_names = ['idx', 'lin_drain Voltage', 'lin_gate Voltage', 'lin_drain Current', 'lin_gate Current']
-                            skiprows = 5
-
-                        else: raise TypeError
-
-
-
-                        if self.filetype == "Marburg":
-                            d = pd.read_table(i)
-                            self.VDS = float(d.filter(regex='V').filter(regex='(drain)|(DS)|(_D)').iloc[3:].astype(
-                                'float').mean().iloc[0])
-
-                        else:
-                            d = pd.read_table(i, skiprows=skiprows,
-                                              names=transfer_column_names, header=None, index_col=None)
-                            self.VDS = np.round(float(d['lin_drain Voltage'].mean()), 3)
-
-                        print(f"VDS for use in Arrhenius analysis was determined to be {self.VDS} V")
-
-                    except:
-                        print_exc()
-                        print("V_DS was not set and could not be determined from file name. Please set V_DS.")
-                        pass
+                # if VDS is not given, it is determined by each TLM from the data it reads anyway (see
+                # TLM_Analysis.determine_VDS()), so the files are not opened here just for that
 
                 if t not in self.measurements.keys(): self.measurements[t] = {"files":[]}
                 self.measurements[t]["files"].append(i)
@@ -1545,26 +3837,56 @@ class Arrhenius():
                 print_exc()
 
 
-    def analyze_temperatureDependent_TLM(self):
-        # arrays of data that is to be plotted in the GUI
-        ts, terrs, rcws, mu0s, rcwerrs, mu0errs, TLMfitdata = [], [], [], [], [], [], {}
-
-        # for each available temperature there should be one TLM
-        for t in self.measurements:
-            files_for_single_temp_tlm = self.measurements[t]["files"]
+    # the analyses of the single temperatures are independent of each other, so they are run in parallel worker processes
+    # (workers=None: one per CPU core, workers=1: sequential in this process). progress_callback(t, n_done, n_total) is
+    # called in this process whenever one temperature is finished, e.g. to update the GUI.
+    # worker(t, tlm_settings) has to be a module level function; returns {t: worker result}
+    def run_temperatures(self, worker, workers=None, progress_callback=None):
+        tlm_settings = {t: dict(C_ox=self.capacitance_oxide, filenames=self.measurements[t]["files"], filetype=self.filetype,
+                                carrier_type=self.carrier_type, smoothing=self.smoothing, V_DS=self.VDS,
+                                fd=self.first_deriv_limit, sd=self.second_deriv_limit, manualFitRange=self.manualFitRanges,
+                                fitRestriction=self.fitRestriction, column_settings=self.column_settings,
+                                L_correct=self.L_correct, regression=self.regression,
+                                reject_outliers=self.reject_outliers, archive=self.archive, prefetch=self.prefetch)
+                        for t in self.measurements}
+        results = {}
+
+        def collect(t, result):
+            results[t] = result
+            if progress_callback is not None:
+                try: progress_callback(t, len(results), len(tlm_settings))
+                except: print_exc()
+
+        if workers is None: workers = os.cpu_count() or 1
+        workers = min(workers, len(tlm_settings))
+        if workers > 1:
             try:
-                print(f"Analyzing T={int(t):03d} K ...")
-                tlm = TLM_Analysis(
-                self.capacitance_oxide,
-                filenames=files_for_single_temp_tlm,filetype=self.filetype,carrier_type=self.carrier_type,smoothing=self.smoothing,
-                V_DS=self.VDS,fd=self.first_deriv_limit,sd=self.second_deriv_limit,manualFitRange=self.manualFitRanges,
-                fitRestriction=self.fitRestriction,L_correct=self.L_correct)
+                with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = {pool.submit(worker, t, tlm_settings[t]): t for t in tlm_settings}
+                    for future in concurrent.futures.as_completed(futures):
+                        collect(futures[future], future.result())
             except:
+                # e.g. if worker processes cannot be started. whatever is missing is done sequentially below
                 print_exc()
+                print("Parallel Arrhenius analysis failed, continuing sequentially.")
+
+        for t in tlm_settings:
+            if t not in results: collect(t, worker(t, tlm_settings[t]))
 
-            o, r, err, bestfitdata, allRWs, l_0, Rc0W, mu0, mu0err, rs_sheet, rs_sheet_err, all_Vths, all_SSws = tlm.contactresistance()
+        return results
 
-            #transferdata = tlm.get_transfer_curves()
+
+    @traced()
+    def analyze_temperatureDependent_TLM(self, workers=None, progress_callback=None):
+        # arrays of data that is to be plotted in the GUI
+        ts, terrs, rcws, mu0s, rcwerrs, mu0errs, TLMfitdata = [], [], [], [], [], [], {}
+
+        # for each available temperature there should be one TLM
+        results = self.run_temperatures(_temperature_TLM, workers=workers, progress_callback=progress_callback)
+
+        for t in self.measurements:
+            if results[t] is None: continue
+            r, err, mu0, mu0err, self.measurements[t]["VDS"] = results[t]
 
             self.measurements[t]["RcW"] = 1e2*np.mean(np.array(r)[-4:-1])   # in Ohm*cm
             self.measurements[t]["RcWerr"] = 1e2*np.mean(np.array(err)[-4:-1])   # in Ohm*cm
@@ -1598,3 +3920,122 @@ class Arrhenius():
 
 
         return self.measurements, (ts, terrs), (rcws,rcwerrs), (mu0s,mu0errs), (xfit, yfit, popt ,fiterror)
+
+
+    # joint fit of all devices at all temperatures, instead of one TLM per temperature and an exponential fit to a few
+    # averaged mu0 values. model for every single RW data point:
+    #   RW(T, L, V_g) = L / (C_ox * mu0(T) * |V_g - V_th(T)|) + RcW(T)      with      mu0(T) = mu_inf * exp(-E_a/kT)
+    # E_a and mu_inf are shared by all temperatures. V_th is one per temperature (shared by all channel lengths, the Vth
+    # of the single devices is shifted by the contact resistance), and so is the contact term. with
+    # contact_per_gate_voltage, there is one contact term per temperature and gate voltage step instead (closer to the
+    # TLM, but V_th and RcW are then much less well separated). each point only depends on a few parameters, so the
+    # jacobian is sparse and everything is solved as one least-squares problem, which also gives the full covariance.
+    # the same problem is solved first with a free mu0 for each temperature; those mobilities (with errors) are the data
+    # points of the Arrhenius plot and the starting values of the joint fit.
+    # only the upper part of the overdrive voltage range is used (above min_overdrive_fraction of the largest overdrive
+    # voltage that is reached by all devices), like the averaging over the highest overdrive voltages in the TLM version
+    @traced()
+    def analyze_temperatureDependent_joint(self, min_overdrive_fraction=.5, contact_per_gate_voltage=False, workers=None,
+                                           progress_callback=None):
+        k = 8.6173e-2  # boltzmann constant in meV/K
+        C = 1e-6 * self.capacitance_oxide  # F/cm², so mu comes out in cm²/Vs
+
+        results = self.run_temperatures(_temperature_RW_data, workers=workers, progress_callback=progress_callback)
+        results = {t: r_ for t, r_ in results.items() if (r_ is not None) and (len(r_[0]) > 0)}
+        if len(results) < 2:
+            print("At least two temperatures are needed for the Arrhenius analysis.")
+            return None
+
+        # overdrive voltage window common to all devices at all temperatures
+        ov_max = np.min([np.nanmax(self.f * (vg - vth)) for devices, VDS in results.values() for l, vg, rw, step, vth in devices])
+        ov_min = min_overdrive_fraction * ov_max
+
+        # flat arrays of all data points: temperature (index), L/C, V_g, RW and the index of the contact term
+        ts = np.array(sorted(results.keys()))
+        vth0 = np.zeros(len(ts))
+        t_idx, x_, vg_, rw_, bins_ = [], [], [], [], []
+        for i, t in enumerate(ts):
+            devices, self.measurements[t]["VDS"] = results[t]
+            step = np.median([step for l, vg, rw, step, vth in devices])
+            vth0[i] = np.median([vth for l, vg, rw, step, vth in devices])
+            for l, vg, rw, _, vth in devices:
+                o = self.f * (vg - vth)
+                sel = (o >= ov_min) & (o <= ov_max) & np.isfinite(rw)
+                t_idx.append(np.full(sel.sum(), i))
+                x_.append(np.full(sel.sum(), l / C))
+                vg_.append(vg[sel])
+                rw_.append(rw[sel])
+                bins_.append(np.round(vg[sel] / step).astype(int) if contact_per_gate_voltage else np.zeros(sel.sum(), int))
+        t_idx, x_, vg_, rw_, bins_ = [np.concatenate(a_) for a_ in (t_idx, x_, vg_, rw_, bins_)]
+        contact_keys, contact_idx = np.unique(np.column_stack((t_idx, bins_)), axis=0, return_inverse=True)
+        contact_idx = contact_idx.ravel()
+        n_t, n_c, n_p = len(ts), len(contact_keys), len(rw_)
+        kT = k * ts[t_idx]
+
+        # parameter vector: [mobility parameters, Vth(T)..., contact terms...]
+        # mobility parameters are [ln(mu_inf), E_a] for the joint fit or [ln(mu0(T))...] for the free fit
+        rows = np.arange(n_p)
+        jac_t = sparse.csr_matrix((np.ones(n_p), (rows, t_idx)), shape=(n_p, n_t))
+        jac_c = sparse.csr_matrix((np.ones(n_p), (rows, contact_idx)), shape=(n_p, n_c))
+
+        def solve(joint, x0):
+            n_m = 2 if joint else n_t
+
+            def sheet(p):
+                ln_mu = (p[0] - p[1] / kT) if joint else p[:n_t][t_idx]
+                u = self.f * (vg_ - p[n_m:n_m + n_t][t_idx])
+                return x_ * np.exp(-ln_mu) / u, u
+
+            def residuals(p):
+                return sheet(p)[0] + p[n_m + n_t:][contact_idx] - rw_
+
+            def jacobian(p):
+                s_, u = sheet(p)
+                d_mu = sparse.csr_matrix(np.column_stack((-s_, s_ / kT))) if joint else jac_t.multiply(-s_[:, None])
+                return sparse.hstack((d_mu, jac_t.multiply((self.f * s_ / u)[:, None]), jac_c), format='csr')
+
+            res = least_squares(residuals, x0, jac=jacobian, x_scale='jac', method='trf')
+            J = jacobian(res.x)
+            s_sq = 2 * res.cost / max(n_p - len(res.x), 1)
+            return res, s_sq * np.linalg.pinv((J.T @ J).toarray())
+
+        # starting values: per temperature linear fit with Vth = median of the device Vths
+        u0 = self.f * (vg_ - vth0[t_idx])
+        A = sparse.hstack((jac_t.multiply((x_ / u0)[:, None]), jac_c), format='csr')
+        p0 = sparse.linalg.lsqr(A, rw_)[0]
+        res_free, cov_free = solve(False, np.concatenate((-np.log(p0[:n_t]), vth0, p0[n_t:])))
+        mu_T = np.exp(res_free.x[:n_t])
+        mu_T_err = mu_T * np.sqrt(np.diag(cov_free)[:n_t])
+
+        slope, intercept = np.polyfit(1 / (k * ts), res_free.x[:n_t], 1)
+        res, cov = solve(True, np.concatenate(([intercept, -slope], res_free.x[n_t:])))
+        p = res.x
+
+        mu_inf, E_a = np.exp(p[0]), p[1]
+        mu_inf_err, E_a_err = mu_inf * np.sqrt(cov[0, 0]), np.sqrt(cov[1, 1])
+
+        # per temperature: mean contact term (and its error from the covariance) in Ohm cm
+        rcws, rcwerrs = np.zeros(n_t), np.zeros(n_t)
+        for i, t in enumerate(ts):
+            w = np.zeros(len(p))
+            w[2 + n_t + np.where(contact_keys[:, 0] == i)[0]] = 1
+            w /= w.sum()
+            rcws[i] = 1e2 * w @ p
+            rcwerrs[i] = 1e2 * np.sqrt(w @ cov @ w)
+
+            self.measurements[t]["RcW"], self.measurements[t]["RcWerr"] = rcws[i], rcwerrs[i]
+            self.measurements[t]["mu0"], self.measurements[t]["mu0err"] = mu_T[i], mu_T_err[i]
+            self.measurements[t]["mu0_joint"] = mu_inf * np.exp(-E_a / (k * t))
+            self.measurements[t]["Vth"] = p[2 + i]
+
+        labels = ['ln(mu_inf)', 'E_a'] + [f'Vth(T={t:.0f}K)' for t in ts] + \
+                 [f'RcW(T={ts[i]:.0f}K, V_g={b}*step)' if contact_per_gate_voltage else f'RcW(T={ts[i]:.0f}K)' for i, b in contact_keys]
+        self.joint_fit = {'parameters': p, 'labels': labels, 'covariance': cov, 'E_a': (E_a, E_a_err),
+                          'mu_inf': (mu_inf, mu_inf_err), 'n_points': n_p, 'overdrive_range': (self.f * ov_min, self.f * ov_max),
+                          'success': res.success}
+
+        xfit = np.linspace(ts.min(), ts.max(), 1000)
+        yfit = mu_inf * np.exp(-E_a / (k * xfit))
+
+        return self.measurements, (ts, np.full(n_t, 5)), (rcws, rcwerrs), (mu_T, mu_T_err), \
+               (xfit, yfit, np.array([mu_inf, E_a]), np.array([mu_inf_err, E_a_err]))
@@ -0,0 +1,44 @@
+import os
+import sys
+import contextlib
+import io
+import numpy as np
+import pytest
+
+# the modules are imported from the repository directory, as the GUI does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark as bm
+from python_analysis_skript import TLM_Analysis
+
+
+# the analysis prints a lot, the tests only look at the results
+@pytest.fixture
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# synthetic TLM of 12 devices (2 per channel length) with symmetric fwd/back sweeps of 121 datapoints, written as
+# SweepMe! files. tests/data/TLM_symmetric_baseline.json holds the results of these files from the analysis as it
+# was before the turning point detection (fwd/back split at len//2)
+@pytest.fixture(scope="session")
+def TLM_files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("TLM")
+    devices = bm.write_devices(str(directory), "SweepMe!", bm.TLM_lengths(12), 121, np.random.default_rng(5),
+                               sample="SY01")
+    return sorted(f["lin"] for L, f in devices)
+
+
+# TLM of synthetic SweepMe! files as the tests use it
+def TLM(filenames, fitRestriction="fwd", C_ox=bm.C_OX, **kwargs):
+    return TLM_Analysis(C_ox, filenames=filenames, filetype="SweepMe!", fitRestriction=fitRestriction, **kwargs)
+
+
+# compares the arrays of two contactresistance()/contactresistance_mTLM() results, exactly unless rtol is given.
+# the dicts in between (best overdrive voltage etc.) are left out
+def same_results(a, b, rtol=0.):
+    for x, y in zip(a, b):
+        if isinstance(x, dict): continue
+        np.testing.assert_allclose(np.asarray(x, dtype=float), np.asarray(y, dtype=float), rtol=rtol, atol=0,
+                                   equal_nan=True)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import benchmark as bm
+from python_analysis_skript import Arrhenius, _temperature_RW_data
+from conftest import TLM
+
+
+# TLMs of 12 devices at four temperatures, with a mobility that is thermally activated with 30 meV
+@pytest.fixture(scope="module")
+def temperature_files(tmp_path_factory):
+    directory, rng = str(tmp_path_factory.mktemp("arrhenius")), np.random.default_rng(29)
+    return {T: sorted(f["lin"] for L, f in bm.write_devices(directory, "SweepMe!", bm.TLM_lengths(12), 121, rng,
+                                                            sample="AR01", T=T, activation_energy=30.))
+            for T in (200, 250, 300, 350)}
+
+
+def arrhenius(files):
+    return Arrhenius(c_ox=bm.C_OX, filenames=files, filetype="SweepMe!", fitRestriction="fwd")
+
+
+def test_joint_fit_recovers_activation_energy(temperature_files, quiet):
+    a = arrhenius([f_ for files in temperature_files.values() for f_ in files])
+    measurements, (ts, _), (rcws, rcwerrs), (mu0s, mu0errs), (xfit, yfit, popt, errors) = \
+        a.analyze_temperatureDependent_joint(workers=1)
+    E_a, E_a_err = a.joint_fit["E_a"]
+    assert a.joint_fit["success"] and ts.tolist() == [200, 250, 300, 350]
+    assert 0 < E_a_err < 3 and abs(E_a - 30.) < 3 * E_a_err
+    assert (popt[1], errors[1]) == (E_a, E_a_err)
+    assert np.all(np.diff(mu0s) > 0) and np.all(mu0errs > 0)  # thermally activated
+
+
+# the devices are fitted as in the TLM of each temperature (common derivative thresholds), just without the TLM
+def test_device_data_as_in_the_TLM(temperature_files, quiet):
+    files = temperature_files[250]
+    settings = dict(C_ox=bm.C_OX, filenames=files, filetype="SweepMe!", carrier_type="p", smoothing=.25, V_DS=None,
+                    fd=None, sd=None, manualFitRange={'lin': False, 'sat': False, 'ssw': False}, fitRestriction="fwd",
+                    column_settings={"names": None, "skiprows": None}, L_correct=None, regression="ols",
+                    reject_outliers=False, archive=None, prefetch=None)
+    devices, VDS = _temperature_RW_data(250, settings)
+    tlm = TLM(files)
+    assert VDS == tlm.VDS and len(devices) == len(files)
+    for (l, vg, rw, step, vth), (L, t) in zip(devices, tlm.devices.values()):
+        ov_, rw_, vg_ = t.overdrive_arrays("fwd")
+        assert (l, step, vth) == (t.channel_length, t.Vg_stepsize, t.Vth)
+        np.testing.assert_array_equal(vg, vg_)
+        np.testing.assert_array_equal(rw, rw_)
+
+
+# a single temperature can't give an activation energy
+def test_joint_fit_needs_two_temperatures(temperature_files, quiet):
+    assert arrhenius(temperature_files[300]).analyze_temperatureDependent_joint(workers=1) is None
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import benchmark as bm
+from python_analysis_skript import DevicePopulation
+from conftest import TLM
+
+
+# three samples: A with a planted outlier (in x and in the relation of x and y), B with more than half of x equal (MAD
+# of zero) and C with too few devices for robust statistics
+@pytest.fixture
+def population():
+    x = {"A": [1., 1.1, .9, 1.05, .95, 5.], "B": [10., 10., 10., 10., 12.], "C": [1., 2.]}
+    y = {"A": [3., 3.2, 2.8, 3.1, 2.9, 0.], "B": [1., 2., 3., 4., 5.], "C": [1., 2.]}
+    table = pd.DataFrame({"sample": [s for s in x for _ in x[s]], "x": sum(x.values(), []), "y": sum(y.values(), [])})
+    return DevicePopulation(table, by="sample")
+
+
+# modified z-score 0.6745*|x - median|/MAD per group, with the mean absolute deviation if the MAD is zero
+def test_z_scores_per_group(population):
+    x = population.table.x.to_numpy()
+    A, B = x[:6], x[6:11]
+    z = population.z_scores("x")["x"].to_numpy()
+    np.testing.assert_allclose(z[:6], .6745 * np.abs(A - np.median(A)) / np.median(np.abs(A - np.median(A))))
+    np.testing.assert_allclose(z[6:11], np.abs(B - 10) / (1.253314 * np.mean(np.abs(B - 10))))
+    assert np.isnan(z[11:]).all()
+
+    flags = population.outliers()
+    assert flags.index[flags["any"]].tolist() == [5, 10]
+    assert flags.x.tolist() == [False] * 5 + [True] + [False] * 4 + [True, False, False]
+    assert flags.y.tolist() == [False] * 5 + [True] + [False] * 7
+    # the whole population in one group: the spread between the samples hides the outlier of A
+    assert not population.outliers("x", by=()).x[5] and population.outliers("x", by=()).x[6:11].all()
+
+
+# robust statistics per group, the mean without the outliers is the one of the other devices of A
+def test_summary(population):
+    summary = population.summary()
+    A = population.table.x[:6].to_numpy()
+    a = summary.loc[("x", "A")]
+    assert (a.n, a.outliers) == (6, 1)
+    MAD = np.median(np.abs(A - np.median(A)))
+    np.testing.assert_allclose(a[["mean", "std", "median", "MAD", "robust_std", "inlier_mean", "p5", "p95", "min", "max"]],
+                               [A.mean(), A.std(ddof=1), np.median(A), MAD, 1.4826 * MAD, A[:5].mean(),
+                                *np.percentile(A, [5, 95]), A.min(), A.max()])
+    within = (A >= np.quantile(A, .1)) & (A <= np.quantile(A, .9))
+    np.testing.assert_allclose(a.trimmed_mean, A[within].mean())
+    assert summary.loc[("x", "B")].outliers == 1 and summary.loc[("x", "B")].MAD == 0
+    assert summary.loc[("x", "C")].n == 2 and summary.loc[("x", "C")].outliers == 0
+
+
+# x and y are proportional in A apart from the outlier, in B the ranks of y follow x
+def test_correlations(population):
+    pearson = population.correlations()
+    assert pearson.loc[("A", "x"), "y"] < 0
+    np.testing.assert_allclose(population.correlations(threshold=3.5).loc[("A", "x"), "y"], 1)
+    assert np.isnan(pearson.loc[("C", "x"), "y"])  # fewer than min_devices
+    spearman = population.correlations(method="spearman")
+    np.testing.assert_allclose(spearman.loc[("B", "x"), "y"], pd.Series([10, 10, 10, 10, 12.]).rank().corr(
+        pd.Series([1, 2, 3, 4, 5.])))
+    with pytest.raises(ValueError): population.correlations(method="kendall")
+
+
+# the devices of a TLM with one device of a much lower mobility: only this device is an outlier of mu_lin, the mean
+# without the outliers is the one of the other devices
+def test_population_of_TLM(tmp_path, quiet):
+    rng = np.random.default_rng(3)
+    files = [f["lin"] for L, f in bm.write_devices(str(tmp_path), "SweepMe!", bm.TLM_lengths(18), 121, rng,
+                                                   sample="DP01")]
+    bad = files[4]
+    bm.write_transfer(bad, "SweepMe!", "lin", *bm.synthetic_transfer(80, mu=.4, n_points=121, rng=rng))
+
+    population = DevicePopulation.from_TLM(TLM(files))
+    assert len(population) == len(files) and set(population.table["sample"]) == {"DP01"}
+    flags = population.outliers("mu_lin", by="sample")
+    assert population.table.source[flags.mu_lin].tolist() == [bad]
+
+    summary = population.summary("mu_lin", by="sample").loc[("mu_lin", "DP01")]
+    mu = population.table.mu_lin[population.table.source != bad]
+    assert summary.outliers == 1
+    np.testing.assert_allclose(summary.inlier_mean, mu.mean())
+    assert summary["median"] > summary["mean"]  # pulled down by the outlier
@@ -0,0 +1,53 @@
+import io
+import threading
+import time
+import pytest
+
+from python_analysis_skript import FilePrefetcher
+from conftest import TLM, same_results
+
+
+def test_contents_and_sources(tmp_path):
+    files = []
+    for k in range(5):
+        files.append(str(tmp_path / f"file{k}.txt"))
+        with open(files[-1], "wb") as file_: file_.write(f"content {k}\n".encode() * (k + 1))
+    prefetch = FilePrefetcher(files + [str(tmp_path / "missing.txt")], parallel=2)
+
+    assert sorted(prefetch.as_completed(timeout=5)) == sorted(files + [str(tmp_path / "missing.txt")])
+    for k, f_ in enumerate(files):
+        assert prefetch.content(f_) == f"content {k}\n".encode() * (k + 1)
+        assert isinstance(prefetch.source(f_), io.BytesIO)
+    with pytest.raises(FileNotFoundError): prefetch.content(str(tmp_path / "missing.txt"))
+    assert prefetch.source("other.txt") == "other.txt"  # not prefetched: read from disk as usual
+    prefetch.release(files[0])
+    assert prefetch.source(files[0]) == files[0]
+
+
+# files that are still waiting for one of the `parallel` slots are not read after close()
+def test_close_stops_waiting_files(tmp_path, monkeypatch):
+    files = [str(tmp_path / f"file{k}.txt") for k in range(20)]
+    for f_ in files: open(f_, "w").close()
+    started, reads = threading.Event(), []
+
+    def slow_read(filename):
+        reads.append(filename)
+        started.set()
+        time.sleep(.2)
+        return b""
+
+    monkeypatch.setattr(FilePrefetcher, "read_bytes", staticmethod(slow_read))
+    prefetch = FilePrefetcher(files, parallel=2)
+    assert started.wait(5)
+    prefetch.close()
+    assert prefetch.wait(5)
+    assert len(reads) <= 2
+    assert prefetch.content(files[-1]) is None
+
+
+# the devices are added in the order of the filenames, the result does not depend on the order the files arrive in
+def test_TLM_with_prefetch_is_unchanged(TLM_files, quiet):
+    reference = TLM(TLM_files)
+    tlm = TLM(TLM_files, prefetch=4)
+    assert list(tlm.devices) == list(reference.devices) and tlm.prefetch is None
+    same_results(tlm.contactresistance(), reference.contactresistance())
@@ -0,0 +1,16 @@
+from python_analysis_skript import parse_filename_metadata
+
+
+def test_metadata_of_filename():
+    meta = parse_filename_metadata("C:/data/TW001_W100_L10_Vds-0.1_lin_die3_G2_T300.txt")
+    assert meta == {"name": "TW001", "W": 100., "L": 10., "VDS": -.1, "T": 300., "G": 2, "die": "3", "regime": "lin"}
+    assert parse_filename_metadata("noise.s2p")["L"] is None
+
+
+# the results are cached, but every caller gets its own dict
+def test_metadata_is_not_shared():
+    meta = parse_filename_metadata("TW002_W100_L20_sat.txt")
+    meta["L"] = None
+    meta["extra"] = 1
+    assert parse_filename_metadata("TW002_W100_L20_sat.txt") == {"name": "TW002", "W": 100., "L": 20., "VDS": None,
+                                                                  "T": None, "G": None, "die": None, "regime": "sat"}
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import benchmark as bm
+import python_analysis_skript
+from python_analysis_skript import TransistorAnalysis
+
+
+@pytest.fixture(scope="module")
+def sat_devices(tmp_path_factory):
+    return bm.write_devices(str(tmp_path_factory.mktemp("sat")), "SweepMe!", [10, 40, 160], 201,
+                            np.random.default_rng(11), sample="SA01", sat=True)
+
+
+def fit(files, L, refine):
+    t = TransistorAnalysis(100., L, bm.C_OX, filenames=files, filetype="SweepMe!", V_DS=-.1, sat_refine=refine)
+    return t, t.fit_mobility_sat()
+
+
+# the window is chosen from the lines through sqrt(|Id|) with and without refinement, only this window is refined
+# (one curve_fit for the fwd and one for the back sweep)
+def test_refinement_of_the_chosen_window(sat_devices, quiet, monkeypatch):
+    calls = []
+    curve_fit = python_analysis_skript.curve_fit
+    monkeypatch.setattr(python_analysis_skript, "curve_fit",
+                        lambda *args, **kwargs: calls.append(1) or curve_fit(*args, **kwargs))
+    for L, files in sat_devices:
+        fits = {}
+        for refine in (True, False):
+            calls.clear()
+            t, fits[refine] = fit(files, L, refine)
+            assert len(calls) == (2 if refine else 0)
+            assert t.fit_diagnostics["fit_mobility_sat"]["attempts"] == 1
+        (popts, _, thresholds, fit_data, _, _), (lines, _, thresholds_, fit_data_, _, _) = fits[True], fits[False]
+        assert thresholds[:2] == thresholds_[:2]
+        for x, y in zip(fit_data, fit_data_): np.testing.assert_array_equal(x, y)
+        for direction in ("fwd", "back", "mean"):
+            np.testing.assert_allclose(popts[direction], lines[direction], rtol=1e-2)
+
+
+# if the quadratic model does not converge, the lines of the chosen window are the result
+def test_lines_are_kept_if_refinement_fails(sat_devices, quiet, monkeypatch):
+    def fail(*args, **kwargs): raise RuntimeError("Optimal parameters not found")
+    L, files = sat_devices[0]
+    lines = fit(files, L, False)[1]
+    monkeypatch.setattr(python_analysis_skript, "curve_fit", fail)
+    t, popts = fit(files, L, True)
+    for direction in ("fwd", "back", "mean"): np.testing.assert_array_equal(popts[0][direction], lines[0][direction])
+    assert sum(t.fit_diagnostics["fit_mobility_sat"]["failures"].values()) == 1
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import benchmark as bm
+from python_analysis_skript import InverterFamilyAnalysis, butterfly_noise_margins
+
+
+# ideal symmetric VTC: V_DD up to V_in = a, then linearly down to 0 at V_in = V_DD - a (gain V_DD / (V_DD - 2a)).
+# mirrored onto itself, both eyes of the butterfly are bounded by the supply rails and the steep parts, and the largest
+# square in each of them has the side a: upper left eye from (0, V_DD - a) to (a, V_DD), lower right from (V_DD - a, 0)
+def ideal_VTC(V_DD, a, n_points=201):
+    V_in = np.linspace(0, V_DD, n_points)
+    return V_in, np.clip(V_DD * (V_DD - a - V_in) / (V_DD - 2 * a), 0, V_DD)
+
+
+# the same VTC measured up and back down, in the columns of benchmark.write_inverter
+def write_ideal_inverter(filename, V_DD, a):
+    V_in, V_out = ideal_VTC(V_DD, a)
+    V_in, V_out = np.concatenate((V_in, V_in[::-1])), np.concatenate((V_out, V_out[::-1]))
+    t, zeros = .1 * np.arange(len(V_in)), np.zeros(len(V_in))
+    bm.write_table(filename, ["\t".join(["Time elapsed", "Timestamp", "gnd Voltage", "gnd Current", "dd Voltage",
+                                         "dd Current", "out Voltage", "out Current", "in Voltage", "in Current"]),
+                              "\t".join(["s", "", "V", "A", "V", "A", "V", "A", "V", "A"]), "\t" * 9],
+                   [t, 1.6e9 + t, zeros, zeros, zeros + V_DD, zeros + 1e-9, V_out, zeros, V_in, zeros])
+    return filename
+
+
+@pytest.mark.parametrize("V_DD, a", [(2., .8), (2., .5), (5., 2.2)])
+def test_largest_square_of_ideal_VTC(V_DD, a):
+    V_in, V_out = ideal_VTC(V_DD, a)
+    r = butterfly_noise_margins([V_in], [V_out], n_grid=4001)
+    np.testing.assert_allclose([r["nm_upper"][0], r["nm_lower"][0], r["snm"][0]], a, rtol=1e-3)
+    (corner_upper, side_upper), (corner_lower, side_lower) = r["square_upper"], r["square_lower"]
+    np.testing.assert_allclose(corner_upper[0], [0, V_DD - a], atol=2e-3 * V_DD)
+    np.testing.assert_allclose(corner_lower[0], [V_DD - a, 0], atol=2e-3 * V_DD)
+
+    # the same VTC as second curve gives the same butterfly, several curves are evaluated at once
+    r2 = butterfly_noise_margins(np.vstack((V_in, V_in)), np.vstack((V_out, V_out)), [V_in, V_in], [V_out, V_out],
+                                  n_grid=4001)
+    np.testing.assert_allclose(r2["snm"], r["snm"][0])
+
+
+# a VTC with a gain below 1 crosses its mirror image only once: no eyes, no static noise margin
+def test_no_bistability():
+    V_in = np.linspace(0, 2, 201)
+    r = butterfly_noise_margins([V_in], [1.5 - .5 * V_in])
+    assert r["snm"][0] == 0
+
+
+# inverters with different V_DD, sorted by V_DD; the noise margin relative to V_DD/2
+def test_family_snm_perc(tmp_path, quiet):
+    files = [write_ideal_inverter(str(tmp_path / f"INV_{V_DD:.0f}V_inverter.txt"), V_DD, .4 * V_DD) for V_DD in (3., 1., 2.)]
+    family = InverterFamilyAnalysis(filenames=files, filetype="SweepMe!")
+    np.testing.assert_array_equal(family.supply_voltage, [1., 2., 3.])
+    for direction in ("fwd", "bwd"):
+        r = family.get_butterfly_noise_margins(direction, n_grid=4001)
+        np.testing.assert_allclose(r["snm"], .4 * family.supply_voltage, rtol=1e-3)
+        np.testing.assert_allclose(r["snm_perc"], r["snm"] / (family.supply_voltage / 2))
+        np.testing.assert_allclose(r["snm_perc"], .8, rtol=1e-3)
+
+    # VTC of the 1 V inverter with the mirrored one of the 3 V inverter
+    r = family.get_butterfly_noise_margins(pairs=[(0, 2)])
+    assert r["V_DD"].tolist() == [1.] and r["snm_perc"][0] == r["snm"][0] / .5
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import benchmark as bm
+from analysis_function_definitions import one_side_gradient
+from python_analysis_skript import InverterAnalysis, inverter_characteristics
+
+
+# the per-point loop of InverterAnalysis.get_characteristics before it was vectorized
+def one_side_gradient_loop(y, x):
+    l = len(x)
+    dydx = np.abs( np.array([(y[i] - y[i + 1]) / (x[i] - x[i + 1]) for i in range(l - 1)]) )
+    dydx[dydx == np.inf] = np.nan  # np.max() will treat inf as highest value - replace with nan
+    return np.append(dydx, np.nan)  # need to add one value to keep shape of arrays
+
+
+# characteristics of one sweep direction as the loop found them, with the unity gain point after the trip point no
+# longer 5 points too far (u2 is indexed from the trip point)
+def characteristics_loop(x, y, V_DD, fwd):
+    dV = one_side_gradient_loop(y, x)
+    tp = np.nanargmax(dV)
+    trip_point, gain = (x[tp], y[tp]), dV[tp]
+    if (len(dV[5:tp]) != 0) and (len(dV[tp:-5]) != 0):
+        u1 = np.abs(dV[5:tp] - 1).argmin() + 5
+        u2 = np.abs(dV[tp:-5] - 1).argmin() + tp
+        before, after = (x[u1], y[u1]), (x[u2], y[u2])
+    else: before, after = (np.nan, np.nan), (np.nan, np.nan)
+    if fwd: nm_low, nm_high = before[0] - after[1], before[1] - after[0]
+    else: nm_low, nm_high = after[0] - before[1], after[1] - before[0]
+    nm_eff = min(nm_low, nm_high)
+    return {"max_gain": gain, "trip_point": trip_point, "unity_gain_points": (before, after), "nm_low": nm_low,
+            "nm_high": nm_high, "nm_eff": nm_eff, "nm_eff_perc": nm_eff / (1/2 * V_DD), "gradient": dV}
+
+
+# VTC up and back down, where the instrument recorded some input voltages twice: with a different output voltage
+# (dV_out/0 = inf) and with the same one (0/0), both have to end up as nan
+def repeated_VTC(n_points, V_DD, rng, repeated=(.05, .2, .3, .6, .75, .85)):
+    V_in = bm.gate_sweep(n_points, V_off=0., V_on=V_DD)
+    repeated = (np.array(repeated) * len(V_in)).astype(int)
+    V_in = np.insert(V_in, repeated, V_in[repeated])
+    repeated += np.arange(len(repeated))  # positions of the first of each pair after the insertion
+    shift = .05 * V_DD * (np.arange(len(V_in)) >= len(V_in) // 2)
+    V_out = V_DD / (1 + np.exp(20 / V_DD * (V_in - .45 * V_DD - shift))) + rng.normal(0, 1e-3, len(V_in))
+    V_out[repeated[[1, 4]] + 1] = V_out[repeated[[1, 4]]]
+    return V_in, V_out
+
+
+@pytest.fixture(scope="module")
+def curves():
+    rng = np.random.default_rng(30)
+    V_DD = [1., 2., 2., 5.]
+    V_in, V_out = zip(*[repeated_VTC(n, V_DD_, rng) for n, V_DD_ in zip((41, 61, 81, 121), V_DD)])
+    # one curve per sweep direction
+    split = [len(x) // 2 for x in V_in]
+    return ([x[:k] for x, k in zip(V_in, split)] + [x[k:] for x, k in zip(V_in, split)],
+            [y[:k] for y, k in zip(V_out, split)] + [y[k:] for y, k in zip(V_out, split)], V_DD + V_DD)
+
+
+def test_one_side_gradient(curves):
+    V_in, V_out, V_DD = curves
+    for x, y in zip(V_in, V_out):
+        dV = one_side_gradient(y, x)
+        assert np.isnan(dV[:-1]).any() and not np.isinf(dV).any()
+        np.testing.assert_array_equal(dV, one_side_gradient_loop(y, x))
+
+    # one curve per row gives the same as every curve on its own
+    x, y = np.vstack([x[:20] for x in V_in]), np.vstack([y[:20] for y in V_out])
+    np.testing.assert_array_equal(one_side_gradient(y, x), [one_side_gradient_loop(y_, x_) for x_, y_ in zip(x, y)])
+
+
+# all curves (of different length, fwd and bwd) in one call, exactly as the loop for each curve
+def test_inverter_characteristics_as_loop(curves):
+    V_in, V_out, V_DD = curves
+    c = inverter_characteristics(V_in, V_out, V_DD)
+    for k, (x, y, V_DD_) in enumerate(zip(V_in, V_out, V_DD)):
+        loop = characteristics_loop(x, y, V_DD_, fwd=x[0] < x[-1])
+        np.testing.assert_array_equal(c["gradient"][k, :len(x)], loop["gradient"])
+        for key in ("max_gain", "trip_point", "unity_gain_points", "nm_low", "nm_high", "nm_eff", "nm_eff_perc"):
+            np.testing.assert_array_equal(c[key][k], loop[key], err_msg=key)
+        assert np.isfinite(c["nm_eff"][k])
+
+
+# the same through InverterAnalysis, read from a file
+def test_inverter_analysis_as_loop(tmp_path, quiet):
+    V_in, V_out = repeated_VTC(81, 2., np.random.default_rng(31))
+    t_, zeros = .1 * np.arange(len(V_in)), np.zeros(len(V_in))
+    filename = str(tmp_path / "INV_2V_inverter.txt")
+    bm.write_table(filename, ["\t".join(["Time elapsed", "Timestamp", "gnd Voltage", "gnd Current", "dd Voltage",
+                                         "dd Current", "out Voltage", "out Current", "in Voltage", "in Current"]),
+                              "\t".join(["s", "", "V", "A", "V", "A", "V", "A", "V", "A"]), "\t" * 9],
+                   [t_, 1.6e9 + t_, zeros, zeros, zeros + 2., zeros + 1e-9, V_out, zeros, V_in, zeros])
+    inverter = InverterAnalysis(filename=filename, filetype="SweepMe!")
+    results = inverter.get_characteristics()
+    for direction, x, y, fwd in (("fwd", inverter.V_in_fwd, inverter.V_out_fwd, True),
+                                 ("bwd", inverter.V_in_bwd, inverter.V_out_bwd, False)):
+        loop = characteristics_loop(x, y, 2., fwd)
+        assert results["max_gain"][direction] == loop["max_gain"]
+        assert results["trip_point"][direction] == loop["trip_point"]
+        assert results["unity_gain_points"][direction] == loop["unity_gain_points"]
+        assert results["nm_eff_" + direction] == (loop["nm_eff"], loop["nm_eff_perc"])
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from python_analysis_skript import ResultsStore
+
+
+def insert(store, quantity, sample, values, created=0.):
+    rows = [{"run": sample, "analysis": "TLM", "quantity": quantity, "value": float(v), "sample": sample,
+             "created": created + k} for k, v in enumerate(values)]
+    columns = list(rows[0])
+    with store.connection:
+        store.connection.executemany(f"INSERT INTO results ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                                     [tuple(row[c] for c in columns) for row in rows])
+
+
+# values with a spread that is small compared to their magnitude, where sum(x²) - n·mean² loses all digits
+@pytest.mark.parametrize("offset, spread", [(1e6, 1e-3), (1e-3, 1e-12), (1e8, 1.)])
+def test_trend_std_without_cancellation(tmp_path, offset, spread):
+    rng = np.random.default_rng(4)
+    values = {"S1": offset + spread * rng.standard_normal(50), "S2": offset + 3 * spread * rng.standard_normal(20)}
+    with ResultsStore(str(tmp_path / "results.sqlite")) as store:
+        insert(store, "RcW", "S1", values["S1"], created=0.)
+        insert(store, "RcW", "S2", values["S2"], created=100.)
+        insert(store, "RcW", "S3", [offset], created=200.)
+        trend = store.trend("RcW")
+
+    assert trend.index.tolist() == ["S1", "S2", "S3"]
+    for sample in ("S1", "S2"):
+        assert trend.loc[sample, "n"] == len(values[sample])
+        np.testing.assert_allclose(trend.loc[sample, "mean"], values[sample].mean(), rtol=1e-12)
+        np.testing.assert_allclose(trend.loc[sample, "std"], values[sample].std(ddof=1), rtol=1e-6)
+    assert np.isnan(trend.loc["S3", "std"])  # a single value has no standard deviation
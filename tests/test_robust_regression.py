@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import benchmark as bm
+from conftest import TLM
+
+
+# 18 devices of which one (L = 80 µm) has a much lower mobility, e.g. a damaged channel
+@pytest.fixture(scope="module")
+def planted_outlier(tmp_path_factory):
+    rng = np.random.default_rng(3)
+    devices = bm.write_devices(str(tmp_path_factory.mktemp("outlier")), "SweepMe!", bm.TLM_lengths(18), 121, rng,
+                               sample="RB01")
+    files = [f["lin"] for L, f in devices]
+    bad = files[4]
+    bm.write_transfer(bad, "SweepMe!", "lin", *bm.synthetic_transfer(80, mu=.4, n_points=121, rng=rng))
+    return files, bad
+
+
+# RcW at the highest overdrive voltages, where the TLM is most reliable
+def RcW(result):
+    return np.median(result[1][-20:])
+
+
+def test_outlier_device_is_rejected(planted_outlier, quiet):
+    files, bad = planted_outlier
+    clean = TLM([f_ for f_ in files if f_ != bad]).contactresistance()
+
+    tlm = TLM(files, reject_outliers=True)
+    fractions = tlm.device_outlier_fractions()
+    assert max(fractions, key=fractions.get) == bad
+    result = tlm.contactresistance()
+    assert list(tlm.rejected_devices) == [bad]
+    assert tlm.regression_diagnostics["TLM"]["rejected devices"] == 1
+    np.testing.assert_allclose(RcW(result), RcW(clean), rtol=1e-9)
+    np.testing.assert_allclose(tlm.contactresistance()[1], result[1])  # evaluated again without refitting
+
+
+# without rejecting the device, the robust fits are pulled away from the clean result less than least squares
+@pytest.mark.parametrize("regression", ["huber", "theilsen", "ransac"])
+def test_robust_fits_resist_outlier(planted_outlier, quiet, regression):
+    files, bad = planted_outlier
+    reference = RcW(TLM([f_ for f_ in files if f_ != bad]).contactresistance())
+    ols = RcW(TLM(files).contactresistance())
+
+    tlm = TLM(files, regression=regression)
+    robust = RcW(tlm.contactresistance())
+    assert tlm.regression_diagnostics["TLM"]["method"] == regression and not tlm.rejected_devices
+    assert abs(robust / reference - 1) < abs(ols / reference - 1) / 2
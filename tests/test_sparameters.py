@@ -0,0 +1,48 @@
+import numpy as np
+
+import benchmark as bm
+from python_analysis_skript import SparameterAnalysis, find_decay_window
+
+# the synthetic 2-port of the benchmark
+gm, C_gs, C_gd = 1e-4, 1e-12, 2e-13
+
+
+# -20 dB/dec up to the knee, then flat (an amplifier) or -40 dB/dec (a second pole), several curves at once. the window
+# starts at the first point and ends at the knee, at most as far behind it as the rms tolerance allows
+def test_window_ends_at_the_knee():
+    log_f = np.linspace(5, 9, 161)
+    for knee in (6.5, 7., 7.5):
+        decay = 60 - 20 * (log_f - 5)
+        gain_dB = np.vstack((np.where(log_f < knee, decay, 60 - 20 * (knee - 5)),
+                             np.where(log_f < knee, decay, decay - 20 * (log_f - knee))))
+        window = find_decay_window(log_f, gain_dB)
+        assert window["found"].all() and (window["start"] == 0).all()
+        assert np.all((log_f[window["stop"] - 1] >= knee - .05) & (log_f[window["stop"] - 1] <= knee + .2))
+        assert np.all(np.abs(window["a"] + 20) <= 2) and np.all(window["rms"] <= .5)
+
+
+# no -20 dB/dec region, or one that is too short: nothing found
+def test_no_decay():
+    log_f = np.linspace(5, 9, 161)
+    window = find_decay_window(log_f, np.vstack((np.full(161, 10.), 60 - 20 * np.clip(log_f - 5, 0, .2))))
+    assert not window["found"].any() and (window["start"] == -1).all() and np.isnan(window["a"]).all()
+
+
+# h21 of the benchmark 2-port decays with -20 dB/dec from gm/(2π(C_gs+C_gd)) at 0 dB, until the feed-through over C_gd
+# takes over at gm/(2π C_gd) and h21 levels off. the window is fitted like the fixed bounds, f_T is where the line
+# crosses 1 dB (10**(-1/20) of the 0 dB crossing)
+def test_auto_fT(tmp_path, quiet):
+    filename = str(tmp_path / "2port.s2p")
+    bm.write_touchstone(filename, 201, gm=gm, C_gs=C_gs, C_gd=C_gd)
+    fT = gm / (2 * np.pi * (C_gs + C_gd)) * 10**(-1 / 20)
+
+    auto = SparameterAnalysis(filename=filename, fTbounds="auto").calculate_fT()
+    f_min, f_max = auto["fitbounds"]
+    assert f_min == 1e5 and 1e7 < f_max <= gm / (2 * np.pi * C_gd)
+    assert abs(auto["fitslope"] + 20) <= 2
+    np.testing.assert_allclose(auto["fT"], fT, rtol=.1)
+
+    # fixed bounds in the clean part of the decay
+    fixed = SparameterAnalysis(filename=filename, fTbounds=[1e5, 1e6]).calculate_fT()
+    np.testing.assert_allclose(fixed["fitslope"], -20, rtol=1e-3)
+    np.testing.assert_allclose(fixed["fT"], fT, rtol=1e-3)
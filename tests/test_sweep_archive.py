@@ -0,0 +1,84 @@
+import os
+import pickle
+import numpy as np
+import pytest
+
+import benchmark as bm
+from python_analysis_skript import SweepArchive, TransistorAnalysis
+from conftest import TLM, same_results
+
+
+def write_sweep(filename, L=20, seed=1, mu=1.):
+    bm.write_transfer(filename, "SweepMe!", "lin",
+                      *bm.synthetic_transfer(L, mu=mu, n_points=121, rng=np.random.default_rng(seed)))
+    return filename
+
+
+# the sweeps come back exactly as the data files are read, and a TLM from the archive is the TLM from the files
+def test_round_trip(TLM_files, tmp_path, quiet):
+    archive = SweepArchive.convert(str(tmp_path / "lot.tsa"), TLM_files)
+    assert len(archive) == len(TLM_files) and all(f_ in archive for f_ in TLM_files)
+
+    from_files = TransistorAnalysis(100, 5, bm.C_OX, filenames={"lin": TLM_files[0], "sat": None})
+    from_archive = TransistorAnalysis(100, 5, bm.C_OX, filenames={"lin": TLM_files[0], "sat": None}, archive=archive)
+    for a in ("Vg", "Id", "Ig", "Vd"):
+        np.testing.assert_array_equal(getattr(from_archive.linear_sweep, a), getattr(from_files.linear_sweep, a))
+    assert from_archive.filetype == "SweepMe!"
+
+    reference = TLM(TLM_files)
+    tlm = TLM(TLM_files, archive=archive)
+    same_results(tlm.contactresistance(), reference.contactresistance())
+
+    # the worker processes of Arrhenius get the archive pickled
+    assert pickle.loads(pickle.dumps(archive)).entries == archive.entries
+
+
+# converting again keeps the unchanged sweeps and only parses new or changed files
+def test_update(tmp_path, quiet, monkeypatch):
+    files = [write_sweep(str(tmp_path / f"UP01_W100_L{L}_lin.txt"), L, seed=L) for L in (10, 20, 40)]
+    path = str(tmp_path / "lot.tsa")
+    SweepArchive.convert(path, files[:2]).close()
+
+    parsed = []
+    read_file = SweepArchive.read_file
+    monkeypatch.setattr(SweepArchive, "read_file",
+                        staticmethod(lambda f_, *args: parsed.append(os.path.basename(f_)) or read_file(f_, *args)))
+    write_sweep(files[1], 20, seed=99)
+    archive = SweepArchive.convert(path, files)
+    assert sorted(parsed) == ["UP01_W100_L20_lin.txt", "UP01_W100_L40_lin.txt"]
+    assert len(archive) == 3
+    Vg, Id, Ig, Vd = archive.arrays(files[1])
+    np.testing.assert_array_equal(Id, SweepArchive.read_file(files[1])[1][1])
+
+
+# a file that has been measured again is read from disk, not taken from the (stale) archive
+def test_changed_file_is_not_taken_from_archive(tmp_path, quiet):
+    filename = write_sweep(str(tmp_path / "ST01_W100_L20_lin.txt"))
+    archive = SweepArchive.convert(str(tmp_path / "lot.tsa"), [filename])
+    assert archive.entry(filename) is not None
+    write_sweep(filename, seed=2, mu=2.)
+    assert archive.entry(filename) is None and filename not in archive
+    with pytest.raises(KeyError): archive.arrays(filename)
+
+    t = TransistorAnalysis(100, 20, bm.C_OX, filenames={"lin": filename, "sat": None}, archive=archive)
+    np.testing.assert_array_equal(t.linear_sweep.Id, TransistorAnalysis(100, 20, bm.C_OX, filenames={
+        "lin": filename, "sat": None}).linear_sweep.Id)
+
+
+# files are found by their path; by their name only on request and only if the name is unique in the archive
+def test_name_matching(tmp_path, quiet):
+    os.makedirs(tmp_path / "A"); os.makedirs(tmp_path / "B")
+    a = write_sweep(str(tmp_path / "A" / "L10_lin.txt"), 10, seed=1)
+    b = write_sweep(str(tmp_path / "B" / "L10_lin.txt"), 10, seed=2)
+    unique = write_sweep(str(tmp_path / "A" / "L20_lin.txt"), 20, seed=3)
+    path = str(tmp_path / "lot.tsa")
+    archive = SweepArchive.convert(path, [a, b, unique])
+
+    elsewhere = str(tmp_path / "C" / "L20_lin.txt")  # e.g. the same file on another computer
+    assert archive.entry(a)["file"] == os.path.abspath(a) and archive.entry(b)["file"] == os.path.abspath(b)
+    assert archive.entry(elsewhere) is None
+
+    by_name = SweepArchive(path, match_names=True)
+    assert by_name.entry(elsewhere)["file"] == os.path.abspath(unique)
+    assert by_name.entry(str(tmp_path / "C" / "L10_lin.txt")) is None  # two archived files have this name
+    assert pickle.loads(pickle.dumps(by_name)).match_names
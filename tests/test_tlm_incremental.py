@@ -0,0 +1,38 @@
+import os
+import numpy as np
+
+import benchmark as bm
+from python_analysis_skript import parse_filename_metadata
+from conftest import TLM, same_results
+
+
+# adding and removing devices one by one updates the running sums to what a TLM of the same files gives from scratch
+# (up to the rounding of summing in another order)
+def test_add_and_remove_match_rebuild(TLM_files, quiet):
+    tlm = TLM(TLM_files[:8])
+    tlm.contactresistance()
+    for f_ in TLM_files[8:]: assert tlm.add_device(f_)
+    assert set(tlm.devices) == set(TLM_files)
+    same_results(tlm.contactresistance(), TLM(TLM_files).contactresistance(), rtol=1e-9)
+
+    for f_ in (TLM_files[1], TLM_files[6]): assert tlm.remove_device(f_)
+    assert not tlm.remove_device(TLM_files[1])  # not part of the TLM anymore
+    kept = [f_ for f_ in TLM_files if f_ not in (TLM_files[1], TLM_files[6])]
+    same_results(tlm.contactresistance(), TLM(kept).contactresistance(), rtol=1e-9)
+
+
+# a file that was measured again replaces its old data
+def test_add_replaces_remeasured_file(TLM_files, tmp_path, quiet):
+    files = []
+    for f_ in TLM_files:
+        files.append(str(tmp_path / os.path.basename(f_)))
+        with open(f_, "rb") as source, open(files[-1], "wb") as copy: copy.write(source.read())
+    tlm = TLM(files)
+    tlm.contactresistance()
+
+    L = parse_filename_metadata(files[3])["L"]  # in µm, as the benchmark takes it
+    bm.write_transfer(files[3], "SweepMe!", "lin", *bm.synthetic_transfer(L, mu=.5, n_points=121,
+                                                                          rng=np.random.default_rng(8)))
+    assert tlm.add_device(files[3])
+    assert len(tlm.devices) == len(files) and tlm.filenames.count(files[3]) == 1
+    same_results(tlm.contactresistance(), TLM(files).contactresistance(), rtol=1e-9)
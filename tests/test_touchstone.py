@@ -0,0 +1,61 @@
+import numpy as np
+
+import benchmark as bm
+from python_analysis_skript import read_touchstone
+
+
+# the synthetic 2-port of the benchmark as touchstone 1.0 file (GHz, S, RI), read back as reference
+def reference(tmp_path, n_points=21):
+    filename = str(tmp_path / "reference.s2p")
+    bm.write_touchstone(filename, n_points)
+    return read_touchstone(filename)
+
+
+# network data lines in MA format, the 2-port parameters in the order 11 21 12 22 or 11 12 21 22
+def data_lines(ts, f_scale=1e-9, order_12_21=False):
+    pairs = [(0, 0), (0, 1), (1, 0), (1, 1)] if order_12_21 else [(0, 0), (1, 0), (0, 1), (1, 1)]
+    lines = []
+    for f, S in zip(ts["f"], ts["S"]):
+        values = [f * f_scale]
+        for i, j in pairs: values += [abs(S[i, j]), np.rad2deg(np.angle(S[i, j]))]
+        lines.append(" ".join(f"{v:.15g}" for v in values))
+    return lines
+
+
+# noise parameters: frequency, minimum noise figure (dB), |Γopt|, angle(Γopt), normalized noise resistance
+def noise_lines(f_scale=1e-9):
+    return [f"{f * f_scale:.15g} 1.5 0.3 45 0.2" for f in (1e8, 5e8, 1e9)]
+
+
+def test_touchstone_1_0(tmp_path):
+    ts = reference(tmp_path)
+    assert ts["options"] == {"frequency_unit": "ghz", "parameter": "s", "format": "ri", "Z0": 50.}
+    assert ts["comments"] == ["synthetic 2-port"]
+    assert ts["S"].shape == (21, 2, 2)
+    np.testing.assert_allclose(ts["f"], np.logspace(5, 9, 21))
+    # at low frequencies only gm is left: S11 = S22 = 1, S21 = -2·gm·Z0 (gm = 1e-4 S) and S12 = 0
+    np.testing.assert_allclose(ts["S"][0], [[1, 0], [-2 * 1e-4 * 50, 1]], atol=1e-3)
+    assert abs(ts["S"][-1, 1, 0]) > abs(ts["S"][-1, 0, 1])
+
+    # the same data in MHz and MA format, with a noise block after the network data
+    filename = str(tmp_path / "noise.s2p")
+    with open(filename, "w") as datafile:
+        datafile.write("\n".join(["! with noise", "# MHz S MA R 50"] + data_lines(ts, 1e-6) + noise_lines(1e-6)) + "\n")
+    noisy = read_touchstone(filename)
+    np.testing.assert_allclose(noisy["f"], ts["f"])
+    np.testing.assert_allclose(noisy["S"], ts["S"], rtol=1e-9, atol=1e-14)
+
+
+def test_touchstone_2_0(tmp_path):
+    ts = reference(tmp_path)
+    filename = str(tmp_path / "v2.ts")  # no .sNp extension, the number of ports is given by the keyword
+    header = ["! touchstone 2.0", "[Version] 2.0", "# GHz S MA R 50", "[Number of Ports] 2",
+              "[Two-Port Data Order] 12_21", f"[Number of Frequencies] {len(ts['f'])}",
+              "[Number of Noise Frequencies] 3", "[Reference] 50 50", "[Network Data]"]
+    with open(filename, "w") as datafile:
+        datafile.write("\n".join(header + data_lines(ts, order_12_21=True) + ["[Noise Data]"] + noise_lines()
+                                 + ["[End]"]) + "\n")
+    v2 = read_touchstone(filename)
+    assert v2["options"]["format"] == "ma" and v2["comments"] == ["touchstone 2.0"]
+    np.testing.assert_allclose(v2["f"], ts["f"])
+    np.testing.assert_allclose(v2["S"], ts["S"], rtol=1e-9, atol=1e-14)
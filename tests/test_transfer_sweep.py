@@ -0,0 +1,80 @@
+import json
+import os
+import numpy as np
+import pytest
+
+import benchmark as bm
+from python_analysis_skript import TransferSweep, TransistorAnalysis, sweep_turning_points
+from conftest import TLM
+
+
+def symmetric_sweep(n_points, V_off=1., V_on=-3.):
+    fwd = np.linspace(V_off, V_on, (n_points + 1) // 2)
+    # odd: the turning point is measured once, even: it is measured twice
+    return np.concatenate((fwd, fwd[::-1][n_points % 2:]))
+
+
+# for symmetric sweeps the turning point detection gives the same fwd/back split as the old len//2
+@pytest.mark.parametrize("n_points", [40, 41, 120, 121])
+def test_symmetric_split_is_half(n_points):
+    V = symmetric_sweep(n_points)
+    sweep = TransferSweep(V, np.exp(-V))
+    assert len(V) == n_points
+    assert sweep.split == n_points // 2
+    assert np.array_equal(sweep.fwd.Vg, V[:n_points // 2])
+    assert np.array_equal(sweep.back.Vg, V[n_points // 2:])
+    assert sweep.shared_turning_point() == (n_points % 2 == 1)
+
+
+def test_turning_points_ignore_holds_and_find_cycles():
+    V = np.concatenate((np.linspace(0, -3, 31), np.full(5, -3.) + 1e-4 * np.arange(5), np.linspace(-3, 0, 31)[1:]))
+    assert sweep_turning_points(V).tolist() == [35]
+    cycle = symmetric_sweep(41)
+    assert len(sweep_turning_points(np.concatenate((cycle, cycle[1:])))) == 3
+    assert len(sweep_turning_points(np.linspace(0, -3, 31))) == 0
+
+
+# fwd and back slices run from the off to the on state and cover the same datapoints as the two halves
+@pytest.mark.parametrize("n_points", [120, 121])
+def test_direction_slices_match_halves(tmp_path, quiet, n_points):
+    filename = bm.transfer_filename(str(tmp_path), "SweepMe!", "DS01", 100, 20, "lin")
+    V_g, V_d, I_d, I_g = bm.synthetic_transfer(20, n_points=n_points, rng=np.random.default_rng(1))
+    V_g = symmetric_sweep(n_points)
+    bm.write_transfer(filename, "SweepMe!", "lin", V_g, V_d[:n_points], I_d[:n_points], I_g[:n_points])
+    t = TransistorAnalysis(100, 20, bm.C_OX, filenames={"lin": filename, "sat": None}, filetype="SweepMe!")
+    fwd, back = t.direction_slices('lin')
+    index = np.arange(n_points)
+    assert index[fwd].tolist() == list(range(n_points // 2))
+    assert index[back].tolist() == list(range(n_points - 1, n_points // 2 - 1, -1))
+
+
+# fwd/back TLM data are the first/last half of the datapoints above threshold, as before the turning point detection
+# (a turning point that is measured only once belongs to neither)
+def test_overdrive_arrays_match_halves(TLM_files, quiet):
+    tlm = TLM(TLM_files, "back")
+    for l, t in tlm.devices.values():
+        ov, rw, vg = t.overdrive_arrays()
+        half = len(ov) // 2
+        assert np.array_equal(t.overdrive_arrays("fwd")[0], ov[:half])
+        assert np.array_equal(t.overdrive_arrays("back")[0], ov[len(ov) - half:])
+        assert np.array_equal(t.overdrive_arrays("back")[1], rw[len(rw) - half:])
+
+
+# the TLM and mTLM results of symmetric sweeps are those of the analysis before the turning point detection. the
+# tolerance covers the small differences of the later fit changes (warm started curve_fit etc.)
+@pytest.mark.parametrize("direction", ["fwd", "back", "mean"])
+def test_TLM_matches_baseline(TLM_files, quiet, direction):
+    with open(os.path.join(os.path.dirname(__file__), "data", "TLM_symmetric_baseline.json")) as file_:
+        reference = json.load(file_)[direction]
+    tlm = TLM(TLM_files, direction, C_ox=.56)
+    r = tlm.contactresistance()
+    m = tlm.contactresistance_mTLM()
+
+    np.testing.assert_allclose(r[0], reference["TLM"]["overdrive_voltage"], rtol=1e-12)
+    np.testing.assert_allclose(r[1], reference["TLM"]["RcW"], rtol=1e-3)
+    np.testing.assert_allclose(r[2], reference["TLM"]["RcW_error"], rtol=1e-3)
+    np.testing.assert_allclose(r[9], reference["TLM"]["Rsh"], rtol=1e-3)
+    assert r[3]["ov"] == reference["TLM"]["best_overdrive_voltage"]
+    np.testing.assert_allclose(m[0], reference["mTLM"]["overdrive_voltage"], rtol=1e-12)
+    np.testing.assert_allclose(m[1], reference["mTLM"]["RcW"], rtol=1e-3)
+    np.testing.assert_allclose(m[7], reference["mTLM"]["Rsh"], rtol=1e-3)